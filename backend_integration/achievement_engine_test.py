@@ -0,0 +1,96 @@
+import sys, os, tempfile, random, time
+sys.path.append('edu-game-backend')
+sys.path.append('edu-game-backend/data')
+tmp = tempfile.mkdtemp(prefix='achievements_')
+os.environ['PROGRESS_DB'] = os.path.join(tmp, 'student_progress.db')
+from services.achievement_engine import AchievementEngine
+
+# 1. Rules fire once, exactly when their counter crosses the threshold
+engine = AchievementEngine()
+engine.rule('ten', 'xp', 10)
+engine.rule('hundred', 'xp', 100)
+engine.rule('three_lessons', 'lessons', 3)
+counters, earned = {}, []
+assert engine.record(counters, earned, values={'xp': 9}) == []
+assert engine.record(counters, earned, values={'xp': 150}) == ['ten', 'hundred']
+assert engine.record(counters, earned, values={'xp': 400}) == []
+assert [engine.record(counters, earned, increments={'lessons': 1}) for _ in range(4)] == [[], [], ['three_lessons'], []]
+assert earned == ['ten', 'hundred', 'three_lessons'] and counters == {'xp': 400, 'lessons': 4}
+
+# 2. Event cost follows the counters touched, not the number of definitions
+def event_cost(n_rules):
+    e = AchievementEngine()
+    for i in range(n_rules):
+        e.rule(f'r{i}', f'counter{i % 50}', 1000 + i)
+    counters, earned = {}, []
+    t = time.perf_counter()
+    for i in range(20000):
+        e.record(counters, earned, increments={'counter0': 1})
+    return (time.perf_counter() - t) / 20000
+small, large = event_cost(50), event_cost(5000)
+assert large < small * 3, (small, large)
+print(f'event cost {small * 1e6:.1f} us with 50 rules, {large * 1e6:.1f} us with 5000 rules')
+
+# 3. Quiz and game rules give the same answers as the old hand-written checks
+from services.quiz_service import QuizService
+from routes import game_routes
+
+def old_quiz(stats):
+    out = []
+    if stats.get('total_score', 0) >= 1000:
+        out.append('Scholar')
+    if stats.get('current_streak', 0) >= 5:
+        out.append('On Fire')
+    for subject in ['Science', 'Mathematics', 'History']:
+        if stats.get(f'{subject.lower()}_score', 0) >= 500:
+            out.append(f'{subject} Expert')
+    return out
+
+def old_game(score, streak, questions):
+    out = []
+    out += ['High Scorer'] if score >= 1000 else ['Good Player'] if score >= 500 else ['Getting Started'] if score >= 100 else []
+    out += ['Unstoppable'] if streak >= 10 else ['On Fire'] if streak >= 5 else []
+    out += ['Knowledge Seeker'] if questions >= 50 else []
+    return out
+
+rng = random.Random(3)
+quiz = QuizService()
+for _ in range(2000):
+    stats = {'total_score': rng.randrange(1500), 'current_streak': rng.randrange(8),
+             'science_score': rng.randrange(800), 'history_score': rng.randrange(800), 'name': 'x'}
+    assert [a['name'] for a in quiz.get_achievement_status(stats)] == old_quiz(stats), stats
+    score, streak, questions = rng.randrange(1500), rng.randrange(15), rng.randrange(80)
+    got = game_routes.GAME_ACHIEVEMENTS.evaluate(
+        {'score': score, 'correct_streak': streak, 'questions_answered': questions}, highest_only=True)
+    assert [a['name'] for a in got] == old_game(score, streak, questions), (score, streak, questions)
+
+# 4. Progress events award the duolingo achievements
+from app import create_app
+from routes import duolingo_api as api
+client = create_app().test_client()
+science = list(api.SCIENCE_QUESTIONS)[:5]
+awarded = []
+for i, lesson_id in enumerate(science):
+    r = client.post('/api/duolingo/progress/update', json={
+        'student_id': 'explorer', 'lesson_id': lesson_id, 'score': 10 if i == 0 else 7, 'total_questions': 10})
+    awarded.append(r.json['new_achievements'])
+assert awarded == [['first_lesson', 'perfect_score'], [], [], [], ['science_explorer']], awarded
+r = client.post('/api/duolingo/progress/update', json={
+    'student_id': 'explorer', 'lesson_id': science[0], 'score': 10, 'total_questions': 60})
+assert r.json['new_achievements'] == ['knowledge_seeker'], r.json  # repeat lesson doesn't count twice
+assert r.json['progress']['achievement_counters']['science_lessons'] == 5
+for _ in range(40):
+    api.update_student_progress('explorer', 25, 3, None)
+api.REWARDS.flush()
+earned = client.get('/api/duolingo/achievements/explorer').json
+assert earned['earned_achievements'] == ['first_lesson', 'perfect_score', 'science_explorer', 'knowledge_seeker', 'xp_collector'], earned
+assert [a['id'] for a in earned['all_achievements']][-1] == 'class_topper' and len(earned['all_achievements']) == 8
+
+# 5. Students stored before counters existed are backfilled on their next event
+with api.PROGRESS.transaction('veteran', api.new_student_progress) as doc:
+    doc['xp'] = 1200
+    doc['lessons_completed'] = {m: {'accuracy': 80} for m in list(api.MATHEMATICS_QUESTIONS)[:5]}
+    doc['achievements'] = ['first_lesson']
+r = client.post('/api/duolingo/progress/update', json={'student_id': 'veteran', 'score': 3, 'total_questions': 5})
+assert r.json['new_achievements'] == ['math_wizard', 'xp_collector'], r.json
+print('Achievements OK')
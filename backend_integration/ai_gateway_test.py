@@ -0,0 +1,75 @@
+import sys, time, threading
+sys.path.append('edu-game-backend')
+from llm_stub_server import LLMStub
+from services.ai_gateway import AIGateway
+from services.ai_service import AIService
+from utils.response_cache import ResponseCache
+
+MESSAGES = [{'role': 'user', 'content': 'hello'}]
+stub = LLMStub(delay=0.02).start()
+
+# 1. Keep-alive: sequential calls reuse one connection
+gateway = AIGateway(stub.url, 'test-key', 'stub-model', max_concurrency=4, pool_size=4, backoff=0.01)
+for _ in range(20):
+    assert gateway.chat(MESSAGES)['success']
+assert stub.requests == 20 and stub.connections == 1, (stub.requests, stub.connections)
+assert stub.payloads[0]['model'] == 'stub-model'
+
+# 2. A burst of 40 concurrent calls never has more than max_concurrency upstream
+stub.max_in_flight = 0
+results = []
+threads = [threading.Thread(target=lambda i=i: results.append(gateway.chat([{'role': 'user', 'content': 'hello %d' % i}])))
+           for i in range(40)]   # distinct prompts: identical ones would be coalesced
+for t in threads: t.start()
+for t in threads: t.join()
+assert all(r['success'] for r in results) and len(results) == 40
+assert stub.max_in_flight <= 4, stub.max_in_flight
+assert stub.connections <= 4, stub.connections
+
+# 3. 5xx / 429 are retried (jittered backoff); other errors are not
+stub.fail_next(2)
+assert gateway.chat(MESSAGES) == {'success': True, 'content': 'stub reply (5 chars)'}
+stub.fail_next(1, status=429, retry_after=0)
+assert gateway.chat(MESSAGES)['success']
+stub.fail_next(3)
+before = stub.requests
+assert gateway.chat(MESSAGES) == {'success': False, 'error': 'AI API returned 503'}
+assert stub.requests - before == 3   # 1 attempt + 2 retries
+stub.fail_next(1, status=400)
+before = stub.requests
+assert gateway.chat(MESSAGES) == {'success': False, 'error': 'AI API returned 400'}
+assert stub.requests - before == 1
+
+# 4. The deadline bounds the whole call, including waiting for a slot
+stub.delay = 0.5
+start = time.monotonic()
+result = gateway.chat(MESSAGES, deadline=0.1)
+assert not result['success'] and time.monotonic() - start < 0.4, result
+single = AIGateway(stub.url, 'test-key', 'stub-model', max_concurrency=1)
+holder = threading.Thread(target=single.chat, args=(MESSAGES,))
+holder.start()
+time.sleep(0.05)
+start = time.monotonic()
+assert single.chat([{'role': 'user', 'content': 'other'}], deadline=0.1) == {'success': False, 'error': 'AI gateway busy'}
+assert time.monotonic() - start < 0.3
+holder.join()
+stub.delay = 0.02
+
+# 5. AIService goes through the gateway; without an API key it stays local
+service = AIService(gateway, cache=ResponseCache(None))
+question = {'text': 'What is the boiling point of water?', 'options': ['50 C', '100 C', '0 C', '25 C'],
+            'correct': 1, 'concept': 'Heat', 'explanation': 'Water boils at 100 C at sea level.'}
+before = stub.requests
+rich = service.get_rich_hint(question, selected_option=0)
+assert rich['source'] == 'ai' and rich['hint'] == 'stub hint', rich
+assert stub.payloads[-1]['response_format'] == {'type': 'json_object'}
+assert service.get_wrong_answer_analysis(question, 0)['source'] == 'ai'
+assert service.get_hint(question)['source'] == 'ai'
+assert stub.requests - before == 3
+offline = AIService(AIGateway(stub.url, None, 'stub-model'), cache=ResponseCache(None))
+before = stub.requests
+assert offline.get_rich_hint(question)['source'] == 'fallback'
+assert offline.get_hint(question)['source'] == 'fallback'
+assert stub.requests == before
+stub.stop()
+print('AI gateway OK: 20 sequential calls on 1 connection, 40 concurrent capped at 4 in flight, retries and deadlines bounded')
@@ -0,0 +1,75 @@
+import sys, os, tempfile, time
+sys.path.append('edu-game-backend')
+sys.path.append('edu-game-backend/data')
+tmp = tempfile.mkdtemp(prefix='answer_batch_')
+os.environ['PROGRESS_DB'] = os.path.join(tmp, 'student_progress.db')
+import ncert_questions as nq
+nq.STATE_FILE = os.path.join(tmp, 'question_state.snap')
+nq.JOURNAL_FILE = os.path.join(tmp, 'question_state.journal')
+nq.LEGACY_STATE_FILE = os.path.join(tmp, 'question_state.json')
+nq.USER_STATE = nq._open_user_state(os.path.join(tmp, 'user_state.db'), 100)
+from app import create_app
+from routes import duolingo_api as api
+client = create_app().test_client()
+
+LESSON = 'heat-class7'
+questions = [nq.find_question(i, LESSON)[1] for i in range(1, 6)]
+def submission(wrong=(), **extra):
+    answers = [{'question_id': q['id'], 'selected_option': q['correct'] + (1 if i in wrong else 0)}
+               for i, q in enumerate(questions)]
+    return dict({'student_id': 'batch', 'lesson_id': LESSON, 'answers': answers}, **extra)
+
+def journal_lines():
+    with open(nq.JOURNAL_FILE) as f:
+        return f.readlines()
+
+# 1. One request grades the lesson and applies XP, completion, achievements and tracking
+revision = api.PROGRESS.changes_since(10 ** 9)[0]
+lines = len(journal_lines()) if os.path.exists(nq.JOURNAL_FILE) else 0
+r = client.post('/api/duolingo/answer/check-batch', json=submission(wrong=(1, 3), submission_id='lesson-1'))
+body = r.json
+assert body['success'] and body['checked'] == 5 and body['score'] == 3, body
+assert [x['correct'] for x in body['results']] == [True, False, True, False, True]
+expected_xp = sum(nq.DIFFICULTY_LEVELS[q['difficulty']]['xp'] for i, q in enumerate(questions) if i not in (1, 3))
+assert body['xp_earned'] == expected_xp and body['progress']['xp'] == expected_xp
+assert body['new_achievements'] == ['first_lesson'], body['new_achievements']
+assert body['progress']['lessons_completed'][LESSON]['score'] == 3
+assert api.PROGRESS.changes_since(10 ** 9)[0] == revision + 1   # one progress transaction
+assert len(journal_lines()) == lines + 1                          # one tracking event
+review = nq.get_review_items('batch', LESSON, wrong_only=True)
+assert sorted(item['id'] for item in review) == [2, 4], review
+
+# 2. Same results as grading each answer through /answer/check
+single = [client.post('/api/duolingo/answer/check', json=dict(a, student_id='single', lesson_id=LESSON)).json
+          for a in submission(wrong=(1, 3))['answers']]
+for one, batched in zip(single, body['results']):
+    assert {k: one[k] for k in one} == {k: batched[k] for k in one}, (one, batched)
+
+# 3. A resend of the same submission is graded but not applied twice
+r = client.post('/api/duolingo/answer/check-batch', json=submission(wrong=(1, 3), submission_id='lesson-1'))
+assert r.json['duplicate'] and r.json['xp_earned'] == 0 and r.json['progress']['xp'] == expected_xp
+assert len(journal_lines()) == lines + 1 + 5 and r.json['progress']['total_questions_answered'] == 5
+
+# 4. Unknown questions are reported per answer; bad requests are rejected
+r = client.post('/api/duolingo/answer/check-batch', json={'student_id': 'batch', 'lesson_id': LESSON, 'complete_lesson': False,
+    'answers': [{'question_id': 999, 'selected_option': 0}, {'question_key': questions[0]['key'], 'selected_option': questions[0]['correct']}]})
+assert [x['success'] for x in r.json['results']] == [False, True] and r.json['checked'] == 1
+assert r.json['progress']['total_questions_answered'] == 5   # not a lesson completion
+assert client.post('/api/duolingo/answer/check-batch', json={'student_id': 'batch'}).status_code == 400
+
+# 5. Journal replay restores the batched tracking
+expected = nq.USER_STATE.peek('batch')['wrong']
+nq.USER_STATE = nq._open_user_state(os.path.join(tmp, 'fresh.db'), 100)
+nq._replay_journal()
+assert nq.USER_STATE.peek('batch')['wrong'] == expected
+
+# 6. One round trip vs one per question
+def timed(fn, n=30):
+    t = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - t) / n
+per_answer = timed(lambda i: [client.post('/api/duolingo/answer/check', json=dict(a, student_id=f'p{i}', lesson_id=LESSON))
+                              for a in submission()['answers']])
+batched = timed(lambda i: client.post('/api/duolingo/answer/check-batch', json=submission(student_id=f'b{i}')))
+print(f'Answer batch OK: 5-question lesson {per_answer * 1000:.1f} ms as 5 calls, {batched * 1000:.1f} ms as one batch')
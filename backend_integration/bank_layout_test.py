@@ -0,0 +1,77 @@
+import sys, os, json, subprocess, tempfile
+# Student history is stored by global question index. Rebuilding the bank
+# with questions added in front must carry every student's answers, SM-2 cards
+# and untouched lesson rotations over to the new indices.
+sys.path.append('edu-game-backend')
+sys.path.append('edu-game-backend/data')
+
+def open_bank(phase):
+    """Import ncert_questions over the real bank ('old') or over one with a
+    new lesson in front and a question inserted into heat-class7 ('new')."""
+    import build_question_bank as bqb
+    from utils.question_bank import QuestionBank, compile_question_bank
+    if phase != 'old':
+        lessons = bqb._source_lessons()
+        lessons = [(lid, subject, list(qs)) for lid, subject, qs in lessons]
+        heat = next(qs for lid, _, qs in lessons if lid == 'heat-class7')
+        heat.insert(0, dict(heat[0], id=99, difficulty='hard'))
+        new_lesson = [dict(lessons[0][2][0], id=i) for i in (1, 2, 3)]
+        lessons.insert(0, ('magnets-class6', 'science', new_lesson))
+        bqb.load_question_bank = lambda path=None: QuestionBank(compile_question_bank(lessons))
+    import ncert_questions as nq
+    return nq
+
+def observe(nq):
+    due, _ = nq.get_due_reviews('a', 50, now=4e9)
+    return {
+        'review': sorted((q['key'], q['was_wrong']) for q in nq.get_review_items('a')),
+        'review_b': sorted(q['key'] for q in nq.get_review_items('b')),
+        'due': sorted((q['key'], q['repetitions'], q['ease']) for q in due),
+        'light_remaining': nq.get_user_lesson_status('a', 'light-class6')['remaining'],
+        'heat_remaining': nq.get_user_lesson_status('a', 'heat-class7')['remaining'],
+        'mixed_remaining': nq.get_user_mixed_status('a')['remaining'],
+        'mixed_total': nq.get_user_mixed_status('a')['total'],
+        'global_light_remaining': nq.get_lesson_status('light-class6')['remaining'],
+    }
+
+if len(sys.argv) > 2:
+    phase, tmp = sys.argv[1], sys.argv[2]
+    nq = open_bank(phase)
+    nq.STATE_FILE = os.path.join(tmp, 'question_state.snap')
+    nq.JOURNAL_FILE = os.path.join(tmp, 'question_state.journal')
+    nq.LEGACY_STATE_FILE = os.path.join(tmp, 'question_state.json')
+    nq._LESSON_ROTATIONS.clear(); nq._SUBJECT_CLASS_ROTATIONS.clear(); nq._MIXED_ROTATION.clear()
+    nq.USER_STATE = nq._open_user_state(os.path.join(tmp, 'user_state.db'), 2)
+    nq.load_question_state()
+    if phase == 'old':
+        nq.get_user_lesson_questions('a', 'light-class6', 3)
+        nq.get_user_lesson_questions('a', 'heat-class7', 2)
+        nq.get_user_mixed_questions('a', 5)
+        nq.get_questions_by_lesson('light-class6', 2)
+        nq.update_answer_tracking_batch('a', [('light-class6', 1, False), ('light-class6', 2, True),
+                                              ('heat-class7', 3, False), ('light-class6', 2, True)])
+        for i in range(5):
+            nq.get_user_mixed_questions(f'filler{i}', 1)   # evict 'a' to SQLite
+        nq.save_question_state()
+        nq.update_answer_tracking('b', 'heat-class7', 2, False)   # journal only: dies before compaction
+    print(json.dumps(observe(nq)))
+    sys.stdout.flush()
+    os._exit(0)
+
+def run(phase, tmp):
+    out = subprocess.run([sys.executable, __file__, phase, tmp], capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+tmp = tempfile.mkdtemp(prefix='bank_layout_')
+old = run('old', tmp)
+new = run('new', tmp)
+again = run('new', tmp)   # stored records are already remapped; nothing moves twice
+assert old['review'] and old['due'] and old['review_b'] == ['heat-class7:2'], old
+for field in ('review', 'review_b', 'due', 'light_remaining', 'global_light_remaining'):
+    assert new[field] == old[field] == again[field], (field, old[field], new[field], again[field])
+assert new['mixed_total'] == old['mixed_total'] + 4
+assert new['mixed_remaining'] == new['mixed_total'], new   # the mixed pool changed: fresh cycle
+assert new['heat_remaining'] == old['heat_remaining'] + 3, (old, new)   # heat-class7 changed: fresh cycle
+assert again == new, (new, again)
+print(f"Bank layout OK: {len(old['review'])} answers and {len(old['due'])} SM-2 cards kept across a rebuild "
+      f"that shifted every index; unchanged lesson rotations kept")
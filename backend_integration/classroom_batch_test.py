@@ -0,0 +1,80 @@
+import sys, os, tempfile, time
+sys.path.append('edu-game-backend')
+sys.path.append('edu-game-backend/data')
+import ncert_questions as nq
+
+tmp = tempfile.mkdtemp(prefix='classroom_batch_')
+nq.STATE_FILE = os.path.join(tmp, 'question_state.snap')
+nq.JOURNAL_FILE = os.path.join(tmp, 'question_state.journal')
+nq.LEGACY_STATE_FILE = os.path.join(tmp, 'question_state.json')
+nq.USER_STATE = nq._open_user_state(os.path.join(tmp, 'user_state.db'), 1000)
+from app import create_app
+client = create_app().test_client()
+
+CLASS = [f'student{i}' for i in range(40)]
+LESSON = 'light-class6'
+LESSON_TOTAL = nq.get_lesson_status(LESSON)['total']
+
+# 1. Batch draws match what each student would get from their own call
+twins = [f'twin{i}' for i in range(40)]
+for uid, twin in zip(CLASS, twins):
+    state = nq._new_rotation_state()  # same permutation for the student and their twin
+    nq.USER_STATE.get(uid)['lesson'][LESSON] = dict(state, cursors={})
+    nq.USER_STATE.get(twin)['lesson'][LESSON] = dict(state, cursors={})
+batches = nq.get_classroom_questions(CLASS, lesson_id=LESSON, count=3)
+assert list(batches) == CLASS
+for uid, twin in zip(CLASS, twins):
+    assert [q['key'] for q in batches[uid]] == [q['key'] for q in nq.get_user_lesson_questions(twin, LESSON, 3)], uid
+
+# 2. Repeated batches never repeat a question for any student within a cycle
+seen = {uid: [q['key'] for q in qs] for uid, qs in batches.items()}
+while True:
+    r = client.post('/api/duolingo/questions/classroom', json={'student_ids': CLASS, 'lesson_id': LESSON, 'count': 3})
+    assert r.json['success'] and r.json['count'] == len(CLASS), r.json
+    assert list(r.json['students']) == CLASS   # request order, not sorted
+    if not any(r.json['students'].values()):
+        break
+    for uid, qs in r.json['students'].items():
+        seen[uid].extend(q['key'] for q in qs)
+        assert all('correct' not in q for q in qs)
+for uid, keys in seen.items():
+    assert len(keys) == len(set(keys)) == LESSON_TOTAL, (uid, keys)
+
+# 3. Subject/class and mixed scopes, difficulty filter, bad input
+r = client.post('/api/duolingo/questions/classroom',
+                json={'student_ids': CLASS[:5], 'subject': 'maths', 'class': 7, 'difficulties': 'easy', 'count': 2})
+assert all(q['difficulty'] == 'easy' for qs in r.json['students'].values() for q in qs), r.json
+status = nq.get_user_subject_class_status(CLASS[0], 'maths', 7)
+assert status['total'] - status['remaining'] == len(r.json['students'][CLASS[0]]), status
+r = client.post('/api/duolingo/questions/classroom', json={'student_ids': ['m1', 'm1', 'm2'], 'count': 4})
+assert list(r.json['students']) == ['m1', 'm2'] and len(r.json['students']['m2']) == 4
+assert client.post('/api/duolingo/questions/classroom', json={'lesson_id': LESSON}).status_code == 400
+
+# Unknown lessons/subjects/classes serve nothing and leave no state behind
+assert not nq.get_user_subject_class_questions('ghost', 'x' * 500, 6, 3)
+assert not nq.get_user_subject_class_questions('ghost', 'maths', 99, 3)
+assert not nq.get_questions_by_subject_class('astrology', 6, 3)
+assert not nq.get_user_lesson_questions('ghost', 'nope-class6', 3)
+assert nq.get_classroom_questions(['ghost'], subject='astrology', class_level=6) == {'ghost': []}
+assert not nq.adaptive_reset_user_lesson(CLASS[0], 'nope-class6')
+assert nq.USER_STATE.peek('ghost') is None
+assert 'nope-class6' not in nq.USER_STATE.peek(CLASS[0])['lesson']
+assert not any('astrology' in key for key in nq._SUBJECT_CLASS_ROTATIONS)
+
+# 4. Classroom start: one batch call vs one request per student
+def per_student(prefix):
+    for i in range(40):
+        client.post('/api/duolingo/questions/user/lesson', json={'student_id': f'{prefix}{i}', 'lesson_id': LESSON, 'count': 5})
+
+def batched(prefix):
+    client.post('/api/duolingo/questions/classroom',
+                json={'student_ids': [f'{prefix}{i}' for i in range(40)], 'lesson_id': LESSON, 'count': 5})
+
+timings = {}
+for name, fn in (('per-student', per_student), ('batched', batched)):
+    t = time.perf_counter()
+    for rep in range(20):
+        fn(f'{name}{rep}-')
+    timings[name] = (time.perf_counter() - t) / 20
+print(f"Classroom OK: 40 students, per-student calls {timings['per-student'] * 1000:.1f} ms, "
+      f"one batch call {timings['batched'] * 1000:.1f} ms")
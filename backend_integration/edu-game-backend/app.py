@@ -45,6 +45,9 @@ def create_app():
                 "ai_mnemonics": "/api/ai/mnemonic", 
                 "ai_solutions": "/api/ai/solution-steps",
                 "ai_encouragement": "/api/ai/encouragement",
+                "ai_hints_stream": "/api/ai/hint/stream",
+                "ai_solutions_stream": "/api/ai/solution-steps/stream",
+                "ai_encouragement_stream": "/api/ai/encouragement/stream",
                 "quiz_questions": "/api/quiz/questions",
                 "quiz_submit": "/api/quiz/submit",
                 "game_start": "/api/game/start",
@@ -63,7 +66,13 @@ def create_app():
                 "duolingo_user_lesson": "/api/duolingo/questions/user/lesson",
                 "duolingo_user_subject": "/api/duolingo/questions/user/subject",
                 "duolingo_user_mixed": "/api/duolingo/questions/user/mixed",
-                "duolingo_user_reset": "/api/duolingo/questions/user/reset"
+                "duolingo_user_reset": "/api/duolingo/questions/user/reset",
+                "duolingo_review_due": "/api/duolingo/review/due",
+                "duolingo_classroom": "/api/duolingo/questions/classroom",
+                "duolingo_leaderboard_rank": "/api/duolingo/leaderboard/rank/<student_id>",
+                "duolingo_answer_check_batch": "/api/duolingo/answer/check-batch",
+                "duolingo_tutoring": "/api/duolingo/tutoring/<ticket>",
+                "duolingo_tutoring_stream": "/api/duolingo/tutoring/<ticket>/stream"
             }
         })
     
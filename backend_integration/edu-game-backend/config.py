@@ -10,7 +10,22 @@ class Config:
     
     # AI Service Config
     GROQ_API_KEY = os.environ.get('GROQ_API_KEY')
-    GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+    GROQ_API_URL = os.environ.get('GROQ_API_URL') or "https://api.groq.com/openai/v1/chat/completions"
+    GROQ_MODEL = os.environ.get('GROQ_MODEL') or "llama-3.1-8b-instant"
+
+    # Shared AI gateway (services/ai_gateway.py)
+    AI_MAX_CONCURRENCY = int(os.environ.get('AI_MAX_CONCURRENCY', 8))   # upstream calls in flight
+    AI_POOL_SIZE = int(os.environ.get('AI_POOL_SIZE', 16))              # keep-alive connections
+    AI_DEADLINE = float(os.environ.get('AI_DEADLINE', 20.0))            # seconds per call, retries included
+    AI_RETRIES = int(os.environ.get('AI_RETRIES', 2))
+
+    # Generated rich hints / wrong-answer analyses (utils/response_cache.py)
+    HINT_CACHE_DB = os.environ.get('HINT_CACHE_DB') or os.path.join(os.path.dirname(__file__), 'data', 'ai_cache.db')
+    HINT_CACHE_SIZE = int(os.environ.get('HINT_CACHE_SIZE', 4096))           # entries in the in-process LRU
+    HINT_CACHE_TTL = int(os.environ.get('HINT_CACHE_TTL', 30 * 86400))       # seconds
+    HINT_CACHE_VERSION = int(os.environ.get('HINT_CACHE_VERSION', 1))        # bump to drop every cached entry
+    # Tutoring generated ahead of time for the whole bank (data/precompute_tutoring.py)
+    TUTORING_ARTIFACT = os.environ.get('TUTORING_ARTIFACT') or os.path.join(os.path.dirname(__file__), 'data', 'tutoring_precomputed.json.gz')
     
     # Alternative OpenAI Config (if using OpenAI instead)
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
@@ -0,0 +1,62 @@
+"""
+Compile the NCERT question bank (ncert_bank_source.py) into the binary file
+that ncert_questions.py memory-maps.
+
+Run after editing the source bank:
+    python data/build_question_bank.py [output path]
+
+ncert_questions.py also calls load_question_bank() on import, which rebuilds
+the file when it is missing, from an older format, or older than the source.
+"""
+import os
+import sys
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(DATA_DIR, '..'))
+from utils.question_bank import QuestionBank, compile_question_bank, write_question_bank
+
+SOURCE_FILE = os.path.join(DATA_DIR, 'ncert_bank_source.py')
+BANK_FILE = os.path.join(DATA_DIR, 'ncert_questions.qbank')
+
+
+def _source_stamp():
+    st = os.stat(SOURCE_FILE)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def _source_lessons():
+    """(lesson_id, subject, questions) in bank order: science, then maths."""
+    if DATA_DIR not in sys.path:
+        sys.path.insert(0, DATA_DIR)
+    from ncert_bank_source import SCIENCE_QUESTIONS, MATHEMATICS_QUESTIONS
+    lessons = [(lesson_id, 'science', qs) for lesson_id, qs in SCIENCE_QUESTIONS.items()]
+    lessons += [(lesson_id, 'maths', qs) for lesson_id, qs in MATHEMATICS_QUESTIONS.items()]
+    return lessons
+
+
+def build_question_bank(path=BANK_FILE):
+    write_question_bank(_source_lessons(), path, source=_source_stamp())
+    return path
+
+
+def load_question_bank(path=BANK_FILE):
+    """Open the compiled bank, rebuilding it first if it is stale."""
+    try:
+        bank = QuestionBank.open(path)
+        if not os.path.exists(SOURCE_FILE) or bank.meta.get('source') == _source_stamp():
+            return bank
+        bank.close()
+    except (OSError, ValueError):
+        pass
+    try:
+        return QuestionBank.open(build_question_bank(path))
+    except OSError:
+        # Read-only deployment without a usable compiled file: compile in memory
+        return QuestionBank(compile_question_bank(_source_lessons(), source=_source_stamp()))
+
+
+if __name__ == '__main__':
+    out = build_question_bank(sys.argv[1] if len(sys.argv) > 1 else BANK_FILE)
+    bank = QuestionBank.open(out)
+    print(f"Compiled {len(bank)} questions in {len(bank.lessons)} lessons -> {out} "
+          f"({os.path.getsize(out)} bytes)")
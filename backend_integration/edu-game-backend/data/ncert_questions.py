@@ -2,714 +2,141 @@
 NCERT Science and Mathematics Question Database
 Classes 6-10 with real sample paper questions and textbook content
 """
+import os, sys
 
-# Science Questions Database - NCERT Based
-SCIENCE_QUESTIONS = {
-    # Class 6 Science Questions
-    'light-class6': [
-        {
-            "id": 1,
-            "text": "Which of the following objects is luminous?",
-            "options": ["Moon", "Planet", "Sun", "Mirror"],
-            "correct": 2,
-            "explanation": "The Sun produces its own light and heat, making it a luminous object. Moon and planets reflect sunlight.",
-            "concept": "Light sources and luminous objects",
-            "difficulty": "easy",
-            "source": "NCERT Class 6 Chapter 11"
-        },
-        {
-            "id": 2,
-            "text": "A shadow is formed when:",
-            "options": ["Light passes through an object", "Light is reflected by an object", "Light is blocked by an opaque object", "Light bends around an object"],
-            "correct": 2,
-            "explanation": "Shadows are formed when opaque objects block light rays, creating a dark area behind them.",
-            "concept": "Shadow formation",
-            "difficulty": "easy",
-            "source": "NCERT Class 6 Chapter 11"
-        },
-        {
-            "id": 3,
-            "text": "The image formed in a plane mirror is:",
-            "options": ["Real and inverted", "Virtual and erect", "Real and erect", "Virtual and inverted"],
-            "correct": 1,
-            "explanation": "Plane mirrors always form virtual (cannot be captured on screen) and erect (same orientation) images.",
-            "concept": "Reflection in mirrors",
-            "difficulty": "medium",
-            "source": "NCERT Class 6 Chapter 11"
-        },
-        {
-            "id": 4,
-            "text": "Which of the following materials allows light to pass through completely?",
-            "options": ["Wood", "Frosted glass", "Clear glass", "Cardboard"],
-            "correct": 2,
-            "explanation": "Clear glass is transparent and allows light to pass through completely.",
-            "concept": "Transparent, translucent, and opaque objects",
-            "difficulty": "easy",
-            "source": "NCERT Class 6 Chapter 11"
-        },
-        {
-            "id": 5,
-            "text": "Which of these is NOT a property of a shadow?",
-            "options": ["It is always black", "It is formed on the opposite side of the light source", "It shows the color of the object", "It changes size depending on the distance from the source"],
-            "correct": 2,
-            "explanation": "A shadow does not show the color of the object; it is always dark or black.",
-            "concept": "Properties of shadows",
-            "difficulty": "medium",
-            "source": "NCERT Class 6 Chapter 11"
-        },
-        {
-            "id": 6,
-            "text": "What happens to the size of a shadow when the object is moved closer to the light source?",
-            "options": ["It becomes smaller", "It becomes larger", "It disappears", "It stays the same"],
-            "correct": 1,
-            "explanation": "Moving the object closer makes the shadow larger because it blocks a greater portion of the diverging light.",
-            "concept": "Shadow size variation",
-            "difficulty": "easy",
-            "source": "NCERT Class 6 Chapter 11"
-        },
-        {
-            "id": 7,
-            "text": "Which device forms an inverted real image on a screen using a small hole?",
-            "options": ["Plane mirror", "Convex mirror", "Pinhole camera", "Magnifying glass"],
-            "correct": 2,
-            "explanation": "A pinhole camera forms an inverted real image of the object on the screen opposite the hole.",
-            "concept": "Pinhole camera principle",
-            "difficulty": "hard",
-            "source": "NCERT Class 6 Chapter 11"
-        }
-    ],
-    
-    'electricity-class6': [
-        {
-            "id": 1,
-            "text": "In which of the following circuits will the bulb glow?",
-            "options": ["Open circuit with battery", "Closed circuit with battery", "Open circuit without battery", "Circuit with only wires"],
-            "correct": 1,
-            "explanation": "A bulb will only glow in a closed circuit with a battery, allowing current to flow continuously.",
-            "concept": "Electric circuits",
-            "difficulty": "easy",
-            "source": "NCERT Class 6 Chapter 12"
-        },
-        {
-            "id": 2,
-            "text": "Which material is a good conductor of electricity?",
-            "options": ["Plastic", "Rubber", "Copper", "Wood"],
-            "correct": 2,
-            "explanation": "Copper is a metal and metals are good conductors of electricity due to free electrons.",
-            "concept": "Conductors and insulators",
-            "difficulty": "easy",
-            "source": "NCERT Class 6 Chapter 12"
-        },
-        {
-            "id": 3,
-            "text": "What is the function of a switch in an electric circuit?",
-            "options": ["To increase current", "To break or complete the circuit", "To store electricity", "To reduce voltage"],
-            "correct": 1,
-            "explanation": "A switch is used to open (break) or close (complete) an electric circuit.",
-            "concept": "Electric circuit components",
-            "difficulty": "easy",
-            "source": "NCERT Class 6 Chapter 12"
-        },
-        {
-            "id": 4,
-            "text": "Which of the following is an insulator?",
-            "options": ["Iron", "Aluminium", "Glass", "Silver"],
-            "correct": 2,
-            "explanation": "Glass does not allow electricity to pass through and is an insulator.",
-            "concept": "Conductors and insulators",
-            "difficulty": "easy",
-            "source": "NCERT Class 6 Chapter 12"
-        },
-        {
-            "id": 5,
-            "text": "What happens if the filament of a bulb breaks?",
-            "options": ["Bulb glows brighter", "Bulb glows dim", "Bulb does not glow", "Bulb explodes"],
-            "correct": 2,
-            "explanation": "If the filament breaks, the circuit is incomplete and the bulb does not glow.",
-            "concept": "Electric circuit continuity",
-            "difficulty": "medium",
-            "source": "NCERT Class 6 Chapter 12"
-        },
-        {
-            "id": 6,
-            "text": "What does the symbol of a long and a short line pair represent in a circuit diagram?",
-            "options": ["Switch", "Battery cell", "Bulb", "Resistor"],
-            "correct": 1,
-            "explanation": "A single cell is represented by one long (positive) and one short (negative) line.",
-            "concept": "Circuit symbols",
-            "difficulty": "easy",
-            "source": "NCERT Class 6 Chapter 12"
-        },
-        {
-            "id": 7,
-            "text": "Two bulbs are connected in series. If one bulb fuses, the other:",
-            "options": ["Glows brighter", "Glows dimmer", "Continues to glow normally", "Stops glowing"],
-            "correct": 3,
-            "explanation": "In a series circuit an open at any point breaks the entire path; no current flows.",
-            "concept": "Series circuit behavior",
-            "difficulty": "hard",
-            "source": "NCERT Class 6 Chapter 12"
-        }
-    ],
-
-    # Class 7 Science Questions
-    'heat-class7': [
-        {
-            "id": 1,
-            "text": "Heat flows from:",
-            "options": ["Cold object to hot object", "Hot object to cold object", "Objects at same temperature", "It doesn't flow"],
-            "correct": 1,
-            "explanation": "Heat always flows from a hotter object to a colder object until thermal equilibrium is reached.",
-            "concept": "Heat transfer direction",
-            "difficulty": "easy",
-            "source": "NCERT Class 7 Chapter 4"
-        },
-        {
-            "id": 2,
-            "text": "Which method of heat transfer does NOT require a medium?",
-            "options": ["Conduction", "Convection", "Radiation", "All require medium"],
-            "correct": 2,
-            "explanation": "Radiation can transfer heat through vacuum (space), while conduction and convection need matter.",
-            "concept": "Methods of heat transfer",
-            "difficulty": "medium",
-            "source": "NCERT Class 7 Chapter 4"
-        },
-        {
-            "id": 3,
-            "text": "Which material is the best conductor of heat among the following?",
-            "options": ["Copper", "Glass", "Wood", "Plastic"],
-            "correct": 0,
-            "explanation": "Metals like copper allow heat to pass rapidly making them good conductors.",
-            "concept": "Conductors vs insulators",
-            "difficulty": "easy",
-            "source": "NCERT Class 7 Chapter 4"
-        },
-        {
-            "id": 4,
-            "text": "Which process primarily causes sea breeze?",
-            "options": ["Conduction from sand", "Radiation from water", "Convection due to differential heating", "Evaporation of seawater"],
-            "correct": 2,
-            "explanation": "Unequal heating of land and sea sets up convection currents causing sea breeze.",
-            "concept": "Convection in fluids",
-            "difficulty": "medium",
-            "source": "NCERT Class 7 Chapter 4"
-        },
-        {
-            "id": 5,
-            "text": "Why are cooking utensils often given handles made of wood or plastic?",
-            "options": ["They are cheaper", "They conduct heat to hands", "They are bad conductors of heat", "They look shiny"],
-            "correct": 2,
-            "explanation": "Wood and plastic are insulators preventing heat transfer to hands for safe handling.",
-            "concept": "Application of insulators",
-            "difficulty": "hard",
-            "source": "NCERT Class 7 Chapter 4"
-        }
-    ],
-
-    # Class 8 Science Questions  
-    'motion-class8': [
-        {
-            "id": 1,
-            "text": "A ball rolling on the ground slows down due to:",
-            "options": ["Gravitational force", "Magnetic force", "Frictional force", "Nuclear force"],
-            "correct": 2,
-            "explanation": "Friction between the ball and ground opposes motion, causing the ball to slow down.",
-            "concept": "Friction and motion",
-            "difficulty": "easy",
-            "source": "NCERT Class 8 Chapter 11"
-        },
-        {
-            "id": 2,
-            "text": "Which of the following is an example of uniform motion?",
-            "options": ["A car starting from rest", "A ball thrown upward", "A train moving at constant speed", "A pendulum swinging"],
-            "correct": 2,
-            "explanation": "Uniform motion occurs when an object covers equal distances in equal time intervals.",
-            "concept": "Types of motion",
-            "difficulty": "medium",
-            "source": "NCERT Class 8 Chapter 11"
-        },
-        {
-            "id": 3,
-            "text": "Speed is defined as:",
-            "options": ["Distance × Time", "Time / Distance", "Distance / Time", "Acceleration / Time"],
-            "correct": 2,
-            "explanation": "Speed = Distance travelled divided by Time taken.",
-            "concept": "Speed formula",
-            "difficulty": "easy",
-            "source": "NCERT Class 8 Chapter 11"
-        },
-        {
-            "id": 4,
-            "text": "The SI unit of speed is:",
-            "options": ["m", "m/s", "km/h", "s/m"],
-            "correct": 1,
-            "explanation": "Standard SI unit of speed is metres per second (m/s).",
-            "concept": "Units of physical quantities",
-            "difficulty": "medium",
-            "source": "NCERT Class 8 Chapter 11"
-        },
-        {
-            "id": 5,
-            "text": "Which graph indicates uniform motion?",
-            "options": ["Curved distance-time graph", "Straight line with constant slope", "Horizontal speed-time graph at zero", "Zig-zag line"],
-            "correct": 1,
-            "explanation": "Uniform motion gives a straight line distance-time graph with constant slope.",
-            "concept": "Graphical representation of motion",
-            "difficulty": "hard",
-            "source": "NCERT Class 8 Chapter 11"
-        }
-    ],
-
-    # Class 9 Science Questions
-    'gravitation-class9': [
-        {
-            "id": 1,
-            "text": "The value of acceleration due to gravity (g) on Earth is approximately:",
-            "options": ["9.8 m/s", "9.8 m/s²", "98 m/s²", "0.98 m/s²"],
-            "correct": 1,
-            "explanation": "Acceleration due to gravity on Earth is 9.8 m/s², where m/s² is the unit for acceleration.",
-            "concept": "Gravitational acceleration",
-            "difficulty": "easy",
-            "source": "NCERT Class 9 Chapter 10"
-        },
-        {
-            "id": 2,
-            "text": "Weight of an object on moon is _____ its weight on Earth:",
-            "options": ["Equal to", "6 times", "1/6th of", "36 times"],
-            "correct": 2,
-            "explanation": "Moon's gravity is 1/6th of Earth's gravity, so weight (W = mg) is also 1/6th on moon.",
-            "concept": "Weight vs mass",
-            "difficulty": "medium",
-            "source": "NCERT Class 9 Chapter 10"
-        },
-        {
-            "id": 3,
-            "text": "Which quantity remains constant for an object everywhere in the universe?",
-            "options": ["Weight", "Mass", "Apparent weight", "Gravitational force"],
-            "correct": 1,
-            "explanation": "Mass is intrinsic and does not change with location, while weight depends on g.",
-            "concept": "Mass vs weight",
-            "difficulty": "easy",
-            "source": "NCERT Class 9 Chapter 10"
-        },
-        {
-            "id": 4,
-            "text": "Force of gravitation between two bodies depends directly on:",
-            "options": ["Product of their masses", "Sum of their masses", "Difference of masses", "Square of sum of masses"],
-            "correct": 0,
-            "explanation": "Newton's law: F = G m1 m2 / r^2, directly proportional to product m1 m2.",
-            "concept": "Newton's law of gravitation",
-            "difficulty": "medium",
-            "source": "NCERT Class 9 Chapter 10"
-        },
-        {
-            "id": 5,
-            "text": "An object is thrown upwards. At the top of its path its acceleration is:",
-            "options": ["Zero", "9.8 m/s^2 downward", "9.8 m/s^2 upward", "Decreasing to zero"],
-            "correct": 1,
-            "explanation": "Acceleration due to gravity acts downward throughout the motion, including at the highest point.",
-            "concept": "Projectile motion under gravity",
-            "difficulty": "hard",
-            "source": "NCERT Class 9 Chapter 10"
-        }
-    ],
-
-    # Class 10 Science Questions
-    'carbon-class10': [
-        {
-            "id": 1,
-            "text": "The molecular formula of methane is:",
-            "options": ["CH₂", "CH₃", "CH₄", "C₂H₄"],
-            "correct": 2,
-            "explanation": "Methane has one carbon atom bonded to four hydrogen atoms, giving formula CH₄.",
-            "concept": "Hydrocarbon formulas",
-            "difficulty": "easy",
-            "source": "NCERT Class 10 Chapter 4"
-        },
-        {
-            "id": 2,
-            "text": "Which gas is produced when ethanoic acid reacts with sodium carbonate?",
-            "options": ["Hydrogen", "Carbon dioxide", "Oxygen", "Methane"],
-            "correct": 1,
-            "explanation": "Ethanoic acid (vinegar) reacts with sodium carbonate to produce carbon dioxide gas with effervescence.",
-            "concept": "Acid reactions",
-            "difficulty": "medium",
-            "source": "NCERT Class 10 Chapter 4"
-        },
-        {
-            "id": 3,
-            "text": "The general formula for alkanes is:",
-            "options": ["C_nH_{2n}", "C_nH_{2n+2}", "C_nH_{2n-2}", "C_nH_{n}"],
-            "correct": 1,
-            "explanation": "Alkanes are saturated hydrocarbons following general formula CnH2n+2.",
-            "concept": "Homologous series",
-            "difficulty": "easy",
-            "source": "NCERT Class 10 Chapter 4"
-        },
-        {
-            "id": 4,
-            "text": "Which functional group is present in ethanol?",
-            "options": ["-COOH", "-CHO", "-OH", "-NH2"],
-            "correct": 2,
-            "explanation": "Ethanol is an alcohol containing the hydroxyl (-OH) functional group.",
-            "concept": "Functional groups",
-            "difficulty": "medium",
-            "source": "NCERT Class 10 Chapter 4"
-        },
-        {
-            "id": 5,
-            "text": "Substitution reactions are characteristic of:",
-            "options": ["Alkanes", "Alkenes", "Alkynes", "Carboxylic acids"],
-            "correct": 0,
-            "explanation": "Saturated alkanes undergo substitution reactions (e.g., halogenation).",
-            "concept": "Types of organic reactions",
-            "difficulty": "hard",
-            "source": "NCERT Class 10 Chapter 4"
-        }
-    ]
-}
+# The bank itself is authored in ncert_bank_source.py and compiled by
+# build_question_bank.py into a columnar binary file that is memory-mapped
+# here. Questions are decoded into dicts only when accessed, so importing this
+# module costs O(#lessons) and every worker shares the mapped pages.
+sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from build_question_bank import load_question_bank
 
-# Mathematics Questions Database - NCERT Based  
-MATHEMATICS_QUESTIONS = {
-    # Class 6 Mathematics Questions
-    'integers-class6': [
-        {
-            "id": 1,
-            "text": "What is (-15) + (+8)?",
-            "options": ["-23", "-7", "+7", "+23"],
-            "correct": 1,
-            "explanation": "When adding integers with different signs, subtract the smaller absolute value from larger and keep the sign of larger absolute value: 15 - 8 = 7, with negative sign.",
-            "concept": "Addition of integers",
-            "difficulty": "easy",
-            "source": "NCERT Class 6 Chapter 6"
-        },
-        {
-            "id": 2,
-            "text": "Which of the following is the correct order on number line?",
-            "options": ["-5 > -3", "-8 < -10", "-2 > -7", "-1 < -4"],
-            "correct": 2,
-            "explanation": "On number line, numbers increase from left to right. -2 is to the right of -7, so -2 > -7.",
-            "concept": "Ordering integers",
-            "difficulty": "medium",
-            "source": "NCERT Class 6 Chapter 6"
-        },
-        {
-            "id": 3,
-            "text": "The additive inverse of -9 is:",
-            "options": ["-9", "9", "0", "1/9"],
-            "correct": 1,
-            "explanation": "The additive inverse of a number is the number that gives 0 when added to it. (-9) + 9 = 0.",
-            "concept": "Additive inverse",
-            "difficulty": "easy",
-            "source": "NCERT Class 6 Chapter 6"
-        },
-        {
-            "id": 4,
-            "text": "What is (-4) × (-6)?",
-            "options": ["-24", "24", "-10", "12"],
-            "correct": 1,
-            "explanation": "Product of two negative integers is positive: 4 × 6 = 24.",
-            "concept": "Multiplication of integers",
-            "difficulty": "easy",
-            "source": "NCERT Class 6 Chapter 6"
-        },
-        {
-            "id": 5,
-            "text": "Simplify: (-20) - (-5)",
-            "options": ["-25", "-15", "-5", "-10"],
-            "correct": 1,
-            "explanation": "Subtracting a negative is adding: -20 + 5 = -15.",
-            "concept": "Subtraction of integers",
-            "difficulty": "medium",
-            "source": "NCERT Class 6 Chapter 6"
-        },
-        {
-            "id": 6,
-            "text": "Value of (-2)³ is:",
-            "options": ["-6", "6", "-8", "8"],
-            "correct": 2,
-            "explanation": "(-2)³ = (-2)×(-2)×(-2) = 4 × (-2) = -8.",
-            "concept": "Powers of integers",
-            "difficulty": "hard",
-            "source": "NCERT Class 6 Chapter 6"
-        }
-    ],
-
-    'fractions-class6': [
-        {
-            "id": 1,
-            "text": "Which of the following fractions is in its simplest form?",
-            "options": ["6/8", "9/12", "5/7", "4/6"],
-            "correct": 2,
-            "explanation": "5/7 cannot be simplified further as 5 and 7 have no common factors other than 1.",
-            "concept": "Simplifying fractions",
-            "difficulty": "easy",
-            "source": "NCERT Class 6 Chapter 7"
-        },
-        {
-            "id": 2,
-            "text": "What is 3/4 + 1/6?",
-            "options": ["4/10", "11/12", "3/6", "5/8"],
-            "correct": 1,
-            "explanation": "To add fractions, find LCM of denominators: LCM(4,6) = 12. Then 9/12 + 2/12 = 11/12.",
-            "concept": "Addition of fractions",
-            "difficulty": "medium",
-            "source": "NCERT Class 6 Chapter 7"
-        },
-        {
-            "id": 3,
-            "text": "Which fraction is greater: 5/8 or 3/5?",
-            "options": ["5/8", "3/5", "They are equal", "Cannot be compared"],
-            "correct": 0,
-            "explanation": "Convert to common denominator 40: 5/8=25/40, 3/5=24/40 → 25/40 > 24/40.",
-            "concept": "Comparing fractions",
-            "difficulty": "easy",
-            "source": "NCERT Class 6 Chapter 7"
-        },
-        {
-            "id": 4,
-            "text": "Simplify: (2/3) × (9/4)",
-            "options": ["18/12", "3/2", "2/4", "9/6"],
-            "correct": 1,
-            "explanation": "(2×9)/(3×4) = 18/12 = 3/2 after simplification.",
-            "concept": "Multiplication of fractions",
-            "difficulty": "medium",
-            "source": "NCERT Class 6 Chapter 7"
-        },
-        {
-            "id": 5,
-            "text": "What is the reciprocal of 7/9?",
-            "options": ["9/7", "7/9", "-7/9", "1/7"],
-            "correct": 0,
-            "explanation": "Reciprocal flips numerator and denominator: 7/9 → 9/7.",
-            "concept": "Reciprocals",
-            "difficulty": "hard",
-            "source": "NCERT Class 6 Chapter 7"
-        }
-    ],
-
-    # Class 7 Mathematics Questions
-    'algebra-class7': [
-        {
-            "id": 1,
-            "text": "Solve for x: 2x + 5 = 15",
-            "options": ["x = 5", "x = 10", "x = 7.5", "x = 2.5"],
-            "correct": 0,
-            "explanation": "2x + 5 = 15 → 2x = 15 - 5 → 2x = 10 → x = 10/2 = 5",
-            "concept": "Solving linear equations",
-            "difficulty": "easy",
-            "source": "NCERT Class 7 Chapter 4"
-        },
-        {
-            "id": 2,
-            "text": "If the perimeter of a square is 4x, then its side is:",
-            "options": ["4x", "x", "x/4", "16x"],
-            "correct": 1,
-            "explanation": "Perimeter of square = 4 × side. So 4x = 4 × side, therefore side = x.",
-            "concept": "Algebraic expressions in geometry",
-            "difficulty": "medium",
-            "source": "NCERT Class 7 Chapter 4"
-        },
-        {
-            "id": 3,
-            "text": "Simplify: 3(2x + 1) - (x - 5)",
-            "options": ["5x + 8", "6x + 1", "5x + 2", "6x - 4"],
-            "correct": 0,
-            "explanation": "3(2x+1)=6x+3; minus (x-5)= -x+5 ⇒ 6x+3 - x + 5 = 5x + 8.",
-            "concept": "Distributive property",
-            "difficulty": "easy",
-            "source": "NCERT Class 7 Chapter 4"
-        },
-        {
-            "id": 4,
-            "text": "If 5y - 7 = 3y + 9, then y = ?",
-            "options": ["1", "8", "-8", "-1"],
-            "correct": 1,
-            "explanation": "5y - 7 = 3y + 9 ⇒ 5y-3y = 9 + 7 ⇒ 2y = 16 ⇒ y = 8.",
-            "concept": "Solving linear equations",
-            "difficulty": "medium",
-            "source": "NCERT Class 7 Chapter 4"
-        },
-        {
-            "id": 5,
-            "text": "If A = x^2 and B = 2x, what is A - B when x = 3?",
-            "options": ["9", "3", "-3", "15"],
-            "correct": 3,
-            "explanation": "A - B = x^2 - 2x = 9 - 6 = 3.",
-            "concept": "Substitution in expressions",
-            "difficulty": "hard",
-            "source": "NCERT Class 7 Chapter 4"
-        }
-    ],
-
-    # Class 8 Mathematics Questions
-    'rational-class8': [
-        {
-            "id": 1,
-            "text": "Which of the following is a rational number?",
-            "options": ["π", "√2", "0.333...", "√5"],
-            "correct": 2,
-            "explanation": "0.333... = 1/3, which can be expressed as p/q where p and q are integers, making it rational.",
-            "concept": "Identifying rational numbers",
-            "difficulty": "easy",
-            "source": "NCERT Class 8 Chapter 1"
-        },
-        {
-            "id": 2,
-            "text": "What is (-3/4) × (8/9)?",
-            "options": ["-2/3", "-6/7", "-11/13", "-24/36"],
-            "correct": 0,
-            "explanation": "(-3/4) × (8/9) = (-3×8)/(4×9) = -24/36 = -2/3 (simplified form)",
-            "concept": "Multiplication of rational numbers",
-            "difficulty": "medium",
-            "source": "NCERT Class 8 Chapter 1"
-        },
-        {
-            "id": 3,
-            "text": "The reciprocal of (-5/7) is:",
-            "options": ["5/7", "-7/5", "7/5", "-5/7"],
-            "correct": 1,
-            "explanation": "Reciprocal flips and keeps sign: (-5/7) → -7/5.",
-            "concept": "Reciprocals of rationals",
-            "difficulty": "easy",
-            "source": "NCERT Class 8 Chapter 1"
-        },
-        {
-            "id": 4,
-            "text": "Add: (-2/3) + (5/6)",
-            "options": ["1/6", "-1/6", "7/9", "-7/9"],
-            "correct": 0,
-            "explanation": "LCM 6: (-4/6 + 5/6) = 1/6.",
-            "concept": "Addition of rational numbers",
-            "difficulty": "medium",
-            "source": "NCERT Class 8 Chapter 1"
-        },
-        {
-            "id": 5,
-            "text": "Which property is illustrated: (a/b) × (c/d) = (c/d) × (a/b)?",
-            "options": ["Associative", "Closure", "Commutative", "Distributive"],
-            "correct": 2,
-            "explanation": "Changing order without changing product is commutative property.",
-            "concept": "Properties of multiplication",
-            "difficulty": "hard",
-            "source": "NCERT Class 8 Chapter 1"
-        }
-    ],
-
-    # Class 9 Mathematics Questions
-    'polynomials-class9': [
-        {
-            "id": 1,
-            "text": "The degree of polynomial 3x⁴ + 2x² - 5 is:",
-            "options": ["2", "3", "4", "5"],
-            "correct": 2,
-            "explanation": "The degree of a polynomial is the highest power of the variable, which is 4 in this case.",
-            "concept": "Degree of polynomial",
-            "difficulty": "easy",
-            "source": "NCERT Class 9 Chapter 2"
-        },
-        {
-            "id": 2,
-            "text": "If p(x) = x² - 3x + 2, then p(1) equals:",
-            "options": ["0", "1", "2", "6"],
-            "correct": 0,
-            "explanation": "p(1) = (1)² - 3(1) + 2 = 1 - 3 + 2 = 0",
-            "concept": "Value of polynomial",
-            "difficulty": "medium",
-            "source": "NCERT Class 9 Chapter 2"
-        },
-        {
-            "id": 3,
-            "text": "Coefficient of x² in 7x² - 5x + 4 is:",
-            "options": ["7", "-5", "4", "2"],
-            "correct": 0,
-            "explanation": "The coefficient multiplying x² term is 7.",
-            "concept": "Coefficients",
-            "difficulty": "easy",
-            "source": "NCERT Class 9 Chapter 2"
-        },
-        {
-            "id": 4,
-            "text": "Zeros of polynomial x(x-3) are:",
-            "options": ["x = 3 only", "x = 0 only", "x = 0, 3", "None"],
-            "correct": 2,
-            "explanation": "x(x-3)=0 ⇒ x=0 or x=3.",
-            "concept": "Zeros / roots",
-            "difficulty": "medium",
-            "source": "NCERT Class 9 Chapter 2"
-        },
-        {
-            "id": 5,
-            "text": "A polynomial of degree 1 is called:",
-            "options": ["Linear", "Quadratic", "Cubic", "Constant"],
-            "correct": 0,
-            "explanation": "Degree 1 polynomials are linear (ax + b).",
-            "concept": "Classification by degree",
-            "difficulty": "hard",
-            "source": "NCERT Class 9 Chapter 2"
-        }
-    ],
-
-    # Class 10 Mathematics Questions  
-    'trigonometry-class10': [
-        {
-            "id": 1,
-            "text": "The value of sin 30° is:",
-            "options": ["1/2", "√3/2", "1/√2", "√3"],
-            "correct": 0,
-            "explanation": "sin 30° = 1/2 is a standard trigonometric value that should be memorized.",
-            "concept": "Trigonometric ratios",
-            "difficulty": "easy",
-            "source": "NCERT Class 10 Chapter 8"
-        },
-        {
-            "id": 2,
-            "text": "If tan θ = 1, then θ equals:",
-            "options": ["30°", "45°", "60°", "90°"],
-            "correct": 1,
-            "explanation": "tan 45° = 1, as in a 45-45-90 triangle, opposite and adjacent sides are equal.",
-            "concept": "Trigonometric values",
-            "difficulty": "easy",
-            "source": "NCERT Class 10 Chapter 8"
-        },
-        {
-            "id": 3,
-            "text": "cos 60° equals:",
-            "options": ["1/2", "√3/2", "1", "0"],
-            "correct": 0,
-            "explanation": "cos 60° = 1/2 is a standard value.",
-            "concept": "Trigonometric ratios",
-            "difficulty": "easy",
-            "source": "NCERT Class 10 Chapter 8"
-        },
-        {
-            "id": 4,
-            "text": "If sin θ = 1, θ (0°–90°) is:",
-            "options": ["0°", "30°", "60°", "90°"],
-            "correct": 3,
-            "explanation": "sin 90° = 1.",
-            "concept": "Standard angle values",
-            "difficulty": "medium",
-            "source": "NCERT Class 10 Chapter 8"
-        },
-        {
-            "id": 5,
-            "text": "Which identity is correct?",
-            "options": ["sin²θ + cos²θ = 1", "sinθ + cosθ = 1", "tan²θ + 1 = cos²θ", "sin²θ - cos²θ = 1"],
-            "correct": 0,
-            "explanation": "Fundamental Pythagorean identity: sin²θ + cos²θ = 1.",
-            "concept": "Trigonometric identities",
-            "difficulty": "hard",
-            "source": "NCERT Class 10 Chapter 8"
-        }
-    ]
-}
+QUESTION_BANK = load_question_bank()
+
+# Lesson views over the bank: lesson_id -> questions (decoded on access)
+SCIENCE_QUESTIONS = QUESTION_BANK.lesson_map('science')
+MATHEMATICS_QUESTIONS = QUESTION_BANK.lesson_map('maths')
 
 # Combined database for easy access
-NCERT_QUESTION_DATABASE = {
-    **SCIENCE_QUESTIONS,
-    **MATHEMATICS_QUESTIONS
-}
+NCERT_QUESTION_DATABASE = QUESTION_BANK.lesson_map()
+
+# ------------------- Question Index ---------------------------------------
+# Question ids restart at 1 in every lesson, so a question is only identified
+# by (lesson_id, id), or by a globally unique key "<lesson_id>:<id>" that is
+# stamped on each decoded record as q['key']. Both resolve to a global index
+# through the bank's per-lesson ranges, without any per-question dict.
+from types import MappingProxyType
+
+def question_key(lesson_id, question_id):
+    """Globally unique key for a question in NCERT_QUESTION_DATABASE."""
+    return f"{lesson_id}:{question_id}"
+
+def question_position(lesson_id, question_id):
+    """Global index (into QUESTION_RECORDS) of a question, or None."""
+    try:
+        question_id = int(question_id)
+    except (TypeError, ValueError):
+        return None
+    return QUESTION_BANK.position(lesson_id, question_id)
+
+def _position_from_key(key):
+    lesson_id, _, question_id = str(key).rpartition(':')
+    return question_position(lesson_id, question_id)
+
+def find_question(question_id=None, lesson_id=None, key=None):
+    """Resolve a question to (lesson_id, question) or (None, None).
+
+    Tries the global key, then (lesson_id, question_id), then falls back to the
+    first lesson holding that id for older clients that don't send a lesson."""
+    if key is not None:
+        idx = _position_from_key(key)
+    else:
+        idx = question_position(lesson_id, question_id) if lesson_id is not None else None
+        if idx is None:
+            idx = next((i for i in (question_position(lid, question_id) for lid in QUESTION_BANK.lessons)
+                        if i is not None), None)
+    if idx is None:
+        return None, None
+    return QUESTION_BANK.lesson_of(idx), QUESTION_BANK[idx]
+
+# ------------------- Catalog (inverted index) -----------------------------
+# Lesson ids are parsed once into (subject, class, topic) and every question
+# gets a global index into QUESTION_RECORDS. Posting lists of those indices per
+# subject, class, difficulty, concept and lesson are what pools are built
+# from, so adding subjects or classes never slows down a request. They are
+# built from the bank's columns and stored as compact arrays (lessons as ranges).
+import re
+from array import array
+
+_LESSON_ID_PATTERN = re.compile(r'^(?P<topic>.+?)-class(?P<class>\d+)$')
+_SUBJECT_ALIASES = {'science': 'science', 'maths': 'maths', 'math': 'maths', 'mathematics': 'maths'}
+
+def normalize_subject(subject):
+    """Canonical subject name ('science' / 'maths'); unknown subjects are lower-cased."""
+    subject = (subject or '').strip().lower()
+    return _SUBJECT_ALIASES.get(subject, subject)
+
+def _class_number(class_level):
+    try:
+        return int(class_level)
+    except (TypeError, ValueError):
+        return None
+
+def _parse_lesson_id(lesson_id):
+    match = _LESSON_ID_PATTERN.match(lesson_id)
+    return {
+        'subject': QUESTION_BANK.lessons[lesson_id][0],
+        'class': int(match.group('class')) if match else None,
+        'topic': match.group('topic') if match else lesson_id,
+    }
+
+def _build_catalog():
+    lessons = {}
+    postings = {'subject': {}, 'class': {}, 'difficulty': {}, 'concept': {}, 'lesson': {}}
+    concept_names = {}
+    for lesson_id in QUESTION_BANK.lessons:
+        meta = _parse_lesson_id(lesson_id)
+        lessons[lesson_id] = MappingProxyType(meta)
+        span = QUESTION_BANK.lesson_range(lesson_id)
+        postings['lesson'][lesson_id] = span
+        postings['subject'].setdefault(meta['subject'], array('I')).extend(span)
+        postings['class'].setdefault(meta['class'], array('I')).extend(span)
+        for idx in span:
+            postings['difficulty'].setdefault(QUESTION_BANK.difficulty(idx), array('I')).append(idx)
+            sid = QUESTION_BANK.concept_sid(idx)
+            if sid not in concept_names:
+                concept_names[sid] = QUESTION_BANK.string(sid)
+            postings['concept'].setdefault(concept_names[sid], array('I')).append(idx)
+    frozen = {field: MappingProxyType(lists) for field, lists in postings.items()}
+    return MappingProxyType(lessons), MappingProxyType(frozen)
+
+QUESTION_RECORDS = QUESTION_BANK   # global index -> question (decoded on access), database order
+(LESSON_CATALOG,          # lesson_id -> {'subject', 'class', 'topic'}
+ CATALOG_POSTINGS,        # field -> value -> ascending global indices
+ ) = _build_catalog()
+
+def catalog_indices(subject=None, class_level=None, difficulty=None, concept=None, lesson_id=None):
+    """Ascending global indices matching every given filter (all questions if none)."""
+    filters = []
+    if subject is not None:
+        filters.append(CATALOG_POSTINGS['subject'].get(normalize_subject(subject), ()))
+    if class_level is not None:
+        filters.append(CATALOG_POSTINGS['class'].get(_class_number(class_level), ()))
+    if difficulty is not None:
+        filters.append(CATALOG_POSTINGS['difficulty'].get(difficulty, ()))
+    if concept is not None:
+        filters.append(CATALOG_POSTINGS['concept'].get(concept, ()))
+    if lesson_id is not None:
+        filters.append(CATALOG_POSTINGS['lesson'].get(lesson_id, ()))
+    if not filters:
+        return range(len(QUESTION_RECORDS))
+    filters.sort(key=len)
+    result = tuple(filters[0])
+    for other in filters[1:]:
+        members = set(other)
+        result = tuple(i for i in result if i in members)
+    return result
 
 # Question difficulty levels
 DIFFICULTY_LEVELS = {
@@ -752,270 +179,565 @@ DAILY_CHALLENGES = [
     }
 ]
 
+import heapq
 import random
-
-# Rotation caches to avoid repeats until all questions are cycled
+import threading
+import time
+import zlib
+
+# Rotation caches to avoid repeats until all questions are cycled.
+# A rotation never copies its pool: it is a small state dict
+# {'seed', 'cycle', 'cursors': {difficulty: served}} and the n-th question of a
+# difficulty bucket is bucket[_permute(n, len(bucket), seed)]. Buckets are
+# merged on the fly, so unfiltered and filtered fetches share one no-repeat cycle.
 _LESSON_ROTATIONS = {}
 _SUBJECT_CLASS_ROTATIONS = {}
-_MIXED_ROTATION = []
-
-# Exhaustion trackers for strict no-repeat
-_LESSON_EXHAUSTED = set()
-_SUBJECT_CLASS_EXHAUSTED = set()
-_MIXED_EXHAUSTED = False
+_MIXED_ROTATION = {}
 
 _DEFALT_BATCH_SIZE = 10
 
-def _init_lesson_rotation(lesson_id):
-    questions = NCERT_QUESTION_DATABASE.get(lesson_id, [])
-    _LESSON_ROTATIONS[lesson_id] = random.sample(questions, len(questions)) if questions else []
+# Pools (question list + per-difficulty buckets) are identical for every
+# rotation over the same scope, so build them once
+_POOL_CACHE = {}
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN64 = 0x9E3779B97F4A7C15
+
+def _mix64(x):
+    """SplitMix64 finaliser; cheap, well-distributed 64-bit hash."""
+    x = (x + _GOLDEN64) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+def _permute(index, size, seed):
+    """Map index in range(size) to a unique position in range(size).
+
+    4-round Feistel network over the smallest even-bit domain >= size with
+    cycle walking, so the mapping is a bijection for any size and seed."""
+    if size <= 1:
+        return index
+    half = ((size - 1).bit_length() + 1) // 2
+    mask = (1 << half) - 1
+    x = index
+    while True:
+        left, right = x >> half, x & mask
+        for rnd in range(4):
+            left, right = right, left ^ (_mix64(seed ^ (rnd << 56) ^ right) & mask)
+        x = (left << half) | right
+        if x < size:
+            return x
+
+def _bucket_positions(indices, positions):
+    buckets = {}
+    for pos in positions:
+        buckets.setdefault(QUESTION_BANK.difficulty(indices[pos]), []).append(pos)
+    return buckets
+
+def _build_pool(indices):
+    """Pool = ordered global question indices, positions grouped by difficulty
+    and the per-difficulty totals that status calls read instead of rescanning.
+    Only the bank's difficulty column is read; questions are decoded when served."""
+    buckets = _bucket_positions(indices, range(len(indices)))
+    return {
+        'indices': indices,
+        'buckets': buckets,
+        'totals': {d: len(bucket) for d, bucket in buckets.items()}
+    }
 
-def _next_from_rotation(rotation_list, count):
-    """Pop next 'count' items from a rotation list; if depleted re-shuffle fresh cycle."""
+def _catalog_pool(cache_key, **filters):
+    pool = _POOL_CACHE.get(cache_key)
+    if pool is None:
+        pool = _build_pool(catalog_indices(**filters))
+        if pool['indices']:  # don't let unknown subjects/classes grow the cache
+            _POOL_CACHE[cache_key] = pool
+    return pool
+
+def _lesson_pool(lesson_id):
+    return _catalog_pool(('lesson', lesson_id), lesson_id=lesson_id)
+
+def _subject_class_key(subject, class_level):
+    return f"{normalize_subject(subject)}__class{_class_number(class_level)}"
+
+def _subject_class_pool(subject, class_level):
+    return _catalog_pool(_subject_class_key(subject, class_level), subject=subject, class_level=class_level)
+
+def _mixed_pool():
+    return _catalog_pool('mixed')
+
+def _new_rotation_state():
+    return {'seed': random.getrandbits(64), 'cycle': 0, 'cursors': {}}
+
+def _cycle_seed(state):
+    return _mix64(state['seed'] ^ ((state['cycle'] * _GOLDEN64) & _MASK64))
+
+def _rotation_buckets(state, pool):
+    """Difficulty buckets this rotation walks (already bucketed subset after adaptive reset)."""
+    return state['subset'] if 'subset' in state else pool['buckets']
+
+def _rotation_remaining(state, pool, difficulties=None):
+    """{difficulty: unserved count} for the requested (default: all) buckets.
+    The cursors are the per-difficulty served counters, so this is O(#difficulties)."""
+    buckets = _rotation_buckets(state, pool)
+    cursors = state['cursors']
+    return {d: len(bucket) - cursors.get(d, 0) for d, bucket in buckets.items()
+            if not difficulties or d in difficulties}
+
+def _take_indices(state, pool, count, difficulties=None):
+    """Global indices of up to 'count' unseen questions from the merged difficulty buckets.
+
+    Each pick chooses a bucket weighted by what it has left, then advances only
+    that bucket's cursor. Filtered fetches are O(count) and leave the other
+    difficulties untouched for later calls."""
+    buckets = _rotation_buckets(state, pool)
+    remaining = _rotation_remaining(state, pool, difficulties)
+    left = sum(remaining.values())
+    cursors = state['cursors']
+    seed = _cycle_seed(state)
+    indices = pool['indices']
     batch = []
-    while len(batch) < count and rotation_list:
-        batch.append(rotation_list.pop())
+    while len(batch) < count and left > 0:
+        served = sum(cursors.values())
+        pick = _mix64(seed ^ ((served * _GOLDEN64) & _MASK64)) % left
+        for difficulty, n in remaining.items():
+            if pick < n:
+                break
+            pick -= n
+        bucket = buckets[difficulty]
+        pos = cursors.get(difficulty, 0)
+        bucket_seed = _mix64(seed ^ zlib.crc32(difficulty.encode()))
+        batch.append(indices[bucket[_permute(pos, len(bucket), bucket_seed)]])
+        cursors[difficulty] = pos + 1
+        remaining[difficulty] -= 1
+        left -= 1
     return batch
 
+def _restart_rotation(state):
+    """Begin a fresh cycle (new permutation) over the full pool."""
+    state['cycle'] += 1
+    state['cursors'] = {}
+    state.pop('subset', None)
+
+def _rotation(rotations, key):
+    if key not in rotations:
+        rotations[key] = _new_rotation_state()
+    return rotations[key]
+
+def _mixed_rotation():
+    if not _MIXED_ROTATION:
+        _MIXED_ROTATION.update(_new_rotation_state())
+    return _MIXED_ROTATION
+
 def get_questions_by_lesson(lesson_id, count=10):
     """Strict no-repeat question retrieval for a lesson.
     Returns up to 'count' remaining unique questions. If exhausted, returns []."""
     if lesson_id not in NCERT_QUESTION_DATABASE:
         return []
-    if lesson_id in _LESSON_EXHAUSTED:
-        return []
-    if lesson_id not in _LESSON_ROTATIONS:
-        _init_lesson_rotation(lesson_id)
-    rotation = _LESSON_ROTATIONS.get(lesson_id, [])
-    if not rotation:
-        _LESSON_EXHAUSTED.add(lesson_id)
-        return []
-    batch = _next_from_rotation(rotation, count)
-    if not rotation:  # just exhausted after this call
-        _LESSON_EXHAUSTED.add(lesson_id)
-    return batch
-
-def _subject_class_key(subject, class_level):
-    return f"{subject.lower()}__class{class_level}"
-
-def _init_subject_class_rotation(subject, class_level):
-    key = _subject_class_key(subject, class_level)
-    aggregated = []
-    for lesson_id, qlist in NCERT_QUESTION_DATABASE.items():
-        if subject.lower() in lesson_id and f"class{class_level}" in lesson_id:
-            aggregated.extend(qlist)
-    _SUBJECT_CLASS_ROTATIONS[key] = random.sample(aggregated, len(aggregated)) if aggregated else []
+    return _serve('lesson', lesson_id, _lesson_pool(lesson_id), count)
 
 def get_questions_by_subject_class(subject, class_level, count=10):
     """Strict no-repeat across subject+class aggregated pool."""
-    key = _subject_class_key(subject, class_level)
-    if key in _SUBJECT_CLASS_EXHAUSTED:
-        return []
-    if key not in _SUBJECT_CLASS_ROTATIONS:
-        _init_subject_class_rotation(subject, class_level)
-    rotation = _SUBJECT_CLASS_ROTATIONS.get(key, [])
-    if not rotation:
-        _SUBJECT_CLASS_EXHAUSTED.add(key)
-        return []
-    batch = _next_from_rotation(rotation, count)
-    if not rotation:
-        _SUBJECT_CLASS_EXHAUSTED.add(key)
-    return batch
-
-def _init_mixed_rotation():
-    all_questions = []
-    for qlist in NCERT_QUESTION_DATABASE.values():
-        all_questions.extend(qlist)
-    random.shuffle(all_questions)
-    _MIXED_ROTATION.clear()
-    _MIXED_ROTATION.extend(all_questions)
+    return _serve('subject_class', _subject_class_key(subject, class_level), _subject_class_pool(subject, class_level), count)
 
 def get_mixed_questions(count=10):
     """Strict no-repeat mixed pool; empty list once exhausted until reset."""
-    global _MIXED_EXHAUSTED
-    if _MIXED_EXHAUSTED:
-        return []
-    if not _MIXED_ROTATION:
-        _init_mixed_rotation()
-    if not _MIXED_ROTATION:
-        _MIXED_EXHAUSTED = True
-        return []
-    batch = _next_from_rotation(_MIXED_ROTATION, count)
-    if not _MIXED_ROTATION:
-        _MIXED_EXHAUSTED = True
-    return batch
+    return _serve('mixed', None, _mixed_pool(), count)
 
 def reset_question_rotations(scope='all', lesson_id=None, subject=None, class_level=None):
-    """Reset rotation caches & exhaustion flags."""
-    global _MIXED_EXHAUSTED
-    if scope == 'all':
+    """Reset rotation caches; the next fetch starts a freshly seeded cycle."""
+    with _reset_guard(scope, lesson_id, subject, class_level):
+        _drop_rotations(scope, lesson_id, subject, class_level)
+        _journal({'op': 'reset', 'scope': scope, 'lesson_id': lesson_id, 'subject': subject, 'class_level': class_level})
+
+def _reset_guard(scope, lesson_id=None, subject=None, class_level=None):
+    """Only the reset rotation's stripe for a single scope (exhausted lessons are
+    reset on the request path); every stripe for scope='all'."""
+    if scope == 'lesson' and lesson_id:
+        return _guard('lesson', lesson_id)
+    if scope == 'subject_class' and subject and class_level is not None:
+        return _guard('subject_class', _subject_class_key(subject, class_level))
+    if scope == 'mixed':
+        return _guard('mixed', None)
+    return _ROTATION_LOCKS.all()
+
+def _drop_rotations(scope, lesson_id=None, subject=None, class_level=None):
+    if SHARED_STATE is not None:
+        _drop_shared_rotations(scope, lesson_id, subject, class_level)
+    elif scope == 'all':
         _LESSON_ROTATIONS.clear(); _SUBJECT_CLASS_ROTATIONS.clear(); _MIXED_ROTATION.clear()
-        _LESSON_EXHAUSTED.clear(); _SUBJECT_CLASS_EXHAUSTED.clear(); _MIXED_EXHAUSTED = False
     elif scope == 'lesson' and lesson_id:
-        _LESSON_ROTATIONS.pop(lesson_id, None); _LESSON_EXHAUSTED.discard(lesson_id)
+        _LESSON_ROTATIONS.pop(lesson_id, None)
     elif scope == 'subject_class' and subject and class_level is not None:
-        key = _subject_class_key(subject, class_level)
-        _SUBJECT_CLASS_ROTATIONS.pop(key, None); _SUBJECT_CLASS_EXHAUSTED.discard(key)
+        _SUBJECT_CLASS_ROTATIONS.pop(_subject_class_key(subject, class_level), None)
     elif scope == 'mixed':
-        _MIXED_ROTATION.clear(); _MIXED_EXHAUSTED = False
+        _MIXED_ROTATION.clear()
     else:
         raise ValueError('Invalid reset parameters')
 
-# ---------------- Strict no-repeat per-user adjustments -------------------
-# Track exhaustion per user scope
-_USER_EXHAUSTED = {
-    'lesson': set(),          # (user_id, lesson_id)
-    'subject_class': set(),   # (user_id, subject, class_level)
-    'mixed': set()            # user_id
-}
+def _drop_shared_rotations(scope, lesson_id=None, subject=None, class_level=None):
+    if scope == 'all':
+        for kind in ('lesson', 'subject_class', 'mixed'):
+            SHARED_STATE.delete(kind)
+    elif scope == 'lesson' and lesson_id:
+        SHARED_STATE.delete('lesson', lesson_id)
+    elif scope == 'subject_class' and subject and class_level is not None:
+        SHARED_STATE.delete('subject_class', _subject_class_key(subject, class_level))
+    elif scope == 'mixed':
+        SHARED_STATE.delete('mixed')
+    else:
+        raise ValueError('Invalid reset parameters')
+
+import atexit
+import json
+from contextlib import contextmanager
+
+# Binary snapshot (utils/state_codec); the JSON file is the pre-versioned
+# format, still read once to migrate when no binary snapshot exists yet
+STATE_FILE = os.path.join(os.path.dirname(__file__), 'question_state.snap')
+LEGACY_STATE_FILE = os.path.join(os.path.dirname(__file__), 'question_state.json')
 
-# Ensure user rotations dict exists before any per-user functions
-try:
-    _USER_ROTATIONS
-except NameError:
-    _USER_ROTATIONS = {
-        'lesson': {},
-        'subject_class': {},
-        'mixed': {}
+# ---------------- Strict no-repeat per-user adjustments -------------------
+# Everything we know about a student lives in one record: rotation states per
+# scope (a few integers each) plus the answered/wrong bitmaps. Records are
+# held in a bounded LRU and evicted to SQLite, so memory stays flat however
+# many distinct students (including the 'anonymous'/'default' fallbacks) appear.
+from utils import state_codec
+from utils.shared_state_store import SharedStateStore
+from utils.striped_lock import StripedLock
+from utils.user_state_store import UserStateStore
+
+USER_STATE_DB = os.path.join(os.path.dirname(__file__), 'user_state.db')
+USER_STATE_MAX_RESIDENT = int(os.environ.get('USER_STATE_MAX_RESIDENT', 5000))
+
+def _new_user_record():
+    return {
+        'lesson': {},           # lesson_id -> rotation state
+        'subject_class': {},    # _subject_class_key(subject, class) -> rotation state
+        'mixed': None,          # rotation state
+        'answered': 0,          # bitmap over QUESTION_RECORDS
+        'wrong': 0,
+        'bank': BANK_FINGERPRINT  # layout the indices above refer to
     }
 
-def _init_user_lesson_rotation(user_id, lesson_id):
-    questions = NCERT_QUESTION_DATABASE.get(lesson_id, [])
-    key = (user_id, lesson_id)
-    import random
-    _USER_ROTATIONS['lesson'][key] = random.sample(questions, len(questions)) if questions else []
-
-def _init_user_subject_class_rotation(user_id, subject, class_level):
-    import random
-    aggregated = []
-    for lesson_id, qlist in NCERT_QUESTION_DATABASE.items():
-        if subject.lower() in lesson_id and f'class{class_level}' in lesson_id:
-            aggregated.extend(qlist)
-    key = (user_id, subject.lower(), class_level)
-    _USER_ROTATIONS['subject_class'][key] = random.sample(aggregated, len(aggregated)) if aggregated else []
-
-def _init_user_mixed_rotation(user_id):
-    import random
-    all_questions = []
-    for qlist in NCERT_QUESTION_DATABASE.values():
-        all_questions.extend(qlist)
-    random.shuffle(all_questions)
-    _USER_ROTATIONS['mixed'][user_id] = all_questions
-
-def _pop_batch(rotation_list, count):
-    batch = []
-    while len(batch) < count and rotation_list:
-        batch.append(rotation_list.pop())
+# Bank layout changes. Bitmaps, SM-2 cards and rotation cursors/subsets refer
+# to global question indices, which move when the bank is rebuilt with
+# questions added, removed or reordered. Student records are stamped with the
+# layout fingerprint they were written against and the snapshot keeps that
+# layout (lesson order, per-lesson digests and question ids). A record from
+# another layout is remapped as it is loaded: answers and cards follow their
+# stable "<lesson_id>:<id>" key (questions that are gone are dropped),
+# rotations of lessons whose digest is unchanged are kept and every other
+# rotation restarts a fresh cycle. load_question_state then rewrites the
+# stored records once. Without the old layout, index-based history resets.
+BANK_FINGERPRINT = QUESTION_BANK.layout_fingerprint()
+_LESSON_DIGESTS = {lesson_id: QUESTION_BANK.lesson_digest(lesson_id) for lesson_id in QUESTION_BANK.lessons}
+
+# Layout persisted state was written against, when it differs from the bank:
+# (fingerprint, {lesson_id: digest}, [old index -> new index or None]).
+# Set by load_question_state from the snapshot.
+_STORED_LAYOUT = None
+
+def _bank_layout():
+    """The current layout, as the snapshot stores it."""
+    return BANK_FINGERPRINT, [(lesson_id, _LESSON_DIGESTS[lesson_id], QUESTION_BANK.lesson_ids(lesson_id))
+                              for lesson_id in QUESTION_BANK.lessons]
+
+def _index_layout(layout):
+    bank, lessons = layout
+    remap = []
+    for lesson_id, _, ids in lessons:
+        remap.extend(QUESTION_BANK.position(lesson_id, question_id) for question_id in ids)
+    return bank, {lesson_id: digest for lesson_id, digest, _ in lessons}, remap
+
+def _remapped(remap, idx):
+    return remap[idx] if idx < len(remap) else None
+
+def _remap_bits(mask, remap):
+    moved = [_remapped(remap, idx) for idx in _iter_bits(mask)]
+    return sum(1 << idx for idx in set(moved) if idx is not None)
+
+def _migrate_rotation(state, layout, lesson_id=None):
+    """Keep a lesson rotation whose questions are unchanged; restart anything else."""
+    if state and not (lesson_id and layout and layout[1].get(lesson_id) == _LESSON_DIGESTS.get(lesson_id)):
+        _restart_rotation(state)
+
+def _migrate_record(record, layout):
+    """Remap a student record written against layout (None if unknown) to the bank."""
+    remap = layout[2] if layout else []
+    for lesson_id, state in record['lesson'].items():
+        _migrate_rotation(state, layout, lesson_id)
+    for state in record['subject_class'].values():
+        _migrate_rotation(state, layout)
+    _migrate_rotation(record['mixed'], layout)
+    record['answered'] = _remap_bits(record['answered'], remap)
+    record['wrong'] = _remap_bits(record['wrong'], remap)
+    if 'srs' in record:
+        cards = {}
+        for idx, card in record['srs'].items():
+            moved = _remapped(remap, int(idx))
+            if moved is not None:
+                cards[str(moved)] = card
+        record['srs'] = cards
+        record['srs_queue'] = sorted([card[3], int(idx)] for idx, card in cards.items())
+
+def _load_user_record(data):
+    """USER_STATE decoder; records from another bank layout come back remapped.
+    Unstamped records (older codec versions) belong to the snapshot's layout."""
+    record = state_codec.loads(data)
+    bank = record.get('bank', _STORED_LAYOUT[0] if _STORED_LAYOUT else BANK_FINGERPRINT)
+    if bank != BANK_FINGERPRINT:
+        _migrate_record(record, _STORED_LAYOUT if _STORED_LAYOUT and _STORED_LAYOUT[0] == bank else None)
+    record['bank'] = BANK_FINGERPRINT
+    return record
+
+def _open_user_state(path=USER_STATE_DB, max_resident=USER_STATE_MAX_RESIDENT):
+    return UserStateStore(path, max_resident, factory=_new_user_record,
+                          dumps=state_codec.dumps, loads=_load_user_record)
+
+USER_STATE = _open_user_state()
+
+_USER_SCOPES = {'user_lesson': 'lesson', 'user_subject_class': 'subject_class', 'user_mixed': 'mixed'}
+
+# Concurrency: every rotation is guarded by a stripe of _ROTATION_LOCKS. A
+# student's scopes all share the stripe of their user_id (and keep the record
+# pinned in USER_STATE), global scopes use the stripe of (scope, key). Requests
+# for different students therefore almost never contend. Anything that spans
+# rotations (global resets, snapshots) takes all stripes, in order.
+ROTATION_LOCK_STRIPES = int(os.environ.get('ROTATION_LOCK_STRIPES', 64))
+_ROTATION_LOCKS = StripedLock(ROTATION_LOCK_STRIPES)
+
+# Rotation backend. 'local' (default) keeps state in this process (globals +
+# USER_STATE, persisted by the journal/snapshot below). 'sqlite' keeps every
+# rotation and student record in SHARED_STATE_DB instead, so several worker
+# processes share one no-repeat cycle; each fetch is one write transaction.
+ROTATION_BACKEND = os.environ.get('ROTATION_BACKEND', 'local').lower()
+SHARED_STATE_DB = os.environ.get('SHARED_STATE_DB', os.path.join(os.path.dirname(__file__), 'shared_state.db'))
+SHARED_STATE = (SharedStateStore(SHARED_STATE_DB, dumps=state_codec.dumps, loads=state_codec.loads)
+                if ROTATION_BACKEND == 'sqlite' else None)
+
+@contextmanager
+def _user_guard(user_id):
+    with _ROTATION_LOCKS.for_key(user_id), USER_STATE.hold(user_id):
+        yield
+
+def _guard(scope, key):
+    """Context manager serialising access to the rotation addressed by (scope, key)."""
+    if scope == 'user_mixed':
+        return _user_guard(key)
+    if scope in _USER_SCOPES:
+        return _user_guard(key[0])
+    return _ROTATION_LOCKS.for_key((scope, key))
+
+def _rotation_state(scope, key, create=False):
+    """Local global rotation state ('lesson' / 'subject_class' / 'mixed'), or
+    None if it was never started. Callers hold _guard(scope, key)."""
+    if scope == 'mixed':
+        return _mixed_rotation() if create else (_MIXED_ROTATION or None)
+    if scope == 'lesson':
+        return _rotation(_LESSON_ROTATIONS, key) if create else _LESSON_ROTATIONS.get(key)
+    return _rotation(_SUBJECT_CLASS_ROTATIONS, key) if create else _SUBJECT_CLASS_ROTATIONS.get(key)
+
+def _user_key(scope, key):
+    """Split a user-scope key into (user_id, key inside the student record)."""
+    return (key, None) if scope == 'user_mixed' else key
+
+def _record_rotation(record, scope, key, create=False):
+    """Rotation state for a user scope inside the student's record."""
+    field = _USER_SCOPES[scope]
+    if field == 'mixed':
+        if record['mixed'] is None and create:
+            record['mixed'] = _new_rotation_state()
+        return record['mixed']
+    inner = _user_key(scope, key)[1]
+    return _rotation(record[field], inner) if create else record[field].get(inner)
+
+@contextmanager
+def _user_record(user_id, create=True, write=True):
+    """Yield the student's record for a read-modify-write (None if unknown
+    and not create). write=False promises not to modify it and never creates."""
+    if SHARED_STATE is not None:
+        if write:
+            with SHARED_STATE.transaction('user', user_id, _new_user_record if create else None) as record:
+                yield record
+        else:
+            yield SHARED_STATE.read('user', user_id)
+        return
+    with _user_guard(user_id):
+        if write and create:
+            record = USER_STATE.get(user_id)
+        else:
+            record = USER_STATE.peek(user_id)
+            if write and record is not None:
+                record = USER_STATE.get(user_id)  # marks it dirty
+        yield record
+
+@contextmanager
+def _checkout(scope, key, create=True, write=True):
+    """Yield the rotation state addressed by (scope, key), or None if it was
+    never started and not create.
+
+    Global scopes: ('lesson', lesson_id), ('subject_class', sc_key), ('mixed', None).
+    User scopes: ('user_lesson', (user_id, lesson_id)),
+    ('user_subject_class', (user_id, sc_key)), ('user_mixed', user_id)."""
+    if scope in _USER_SCOPES:
+        with _user_record(_user_key(scope, key)[0], create, write) as record:
+            yield _record_rotation(record, scope, key, create) if record else None
+    elif SHARED_STATE is None:
+        with _guard(scope, key):
+            yield _rotation_state(scope, key, create)
+    elif write:
+        with SHARED_STATE.transaction(scope, key or '', _new_rotation_state if create else None) as state:
+            yield state
+    else:
+        yield SHARED_STATE.read(scope, key or '')
+
+def _set_rotation_state(scope, key, state):
+    """Install a restored rotation state (journal replay / legacy snapshots)."""
+    if scope == 'mixed':
+        _MIXED_ROTATION.clear()
+        _MIXED_ROTATION.update(state)
+    elif scope == 'lesson':
+        _LESSON_ROTATIONS[key] = state
+    elif scope == 'subject_class':
+        _SUBJECT_CLASS_ROTATIONS[key] = state
+    else:
+        user_id, inner = _user_key(scope, key)
+        record = USER_STATE.get(user_id)
+        if scope == 'user_mixed':
+            record['mixed'] = state
+        else:
+            record[_USER_SCOPES[scope]][inner] = state
+
+def _serve_indices(scope, key, pool, count, difficulties=None):
+    """Take from the rotation addressed by (scope, key) and journal its new state.
+    Nothing is created for an empty pool (unknown subject/class, or no question
+    of the requested difficulties), so junk keys cannot grow persisted state."""
+    if not _pool_total(pool, difficulties):
+        return []
+    with _checkout(scope, key) as state:
+        batch = _take_indices(state, pool, count, difficulties)
+        if batch:
+            _journal_rotation(scope, key, state)
     return batch
 
+def _serve(scope, key, pool, count, difficulties=None):
+    return [QUESTION_RECORDS[idx] for idx in _serve_indices(scope, key, pool, count, difficulties)]
+
 # ---------------------- Public Per-User APIs ------------------------------
 
 def get_user_lesson_questions(user_id: str, lesson_id: str, count: int = 10):
     """Return up to 'count' unique questions for this user & lesson.
-    Starts a fresh shuffled cycle when depleted. Ensures no duplicates in a single cycle."""
-    key = (user_id, lesson_id)
-    if key in _USER_EXHAUSTED['lesson']:
-        return []
+    Strict no-repeat within a cycle; returns [] once the cycle is used up until reset."""
     if lesson_id not in NCERT_QUESTION_DATABASE:
         return []
-    if key not in _USER_ROTATIONS['lesson']:
-        _init_user_lesson_rotation(user_id, lesson_id)
-    rotation = _USER_ROTATIONS['lesson'].get(key, [])
-    if not rotation:
-        _USER_EXHAUSTED['lesson'].add(key)
-        return []
-    batch = _pop_batch(rotation, count)
-    if not rotation:
-        _USER_EXHAUSTED['lesson'].add(key)
-    return batch
+    return _serve('user_lesson', (user_id, lesson_id), _lesson_pool(lesson_id), count)
 
 def get_user_subject_class_questions(user_id: str, subject: str, class_level: int, count: int = 10):
     """Return unique aggregated subject/class questions for a user without repeats per cycle."""
-    key = (user_id, subject.lower(), class_level)
-    if key in _USER_EXHAUSTED['subject_class']:
-        return []
-    if key not in _USER_ROTATIONS['subject_class']:
-        _init_user_subject_class_rotation(user_id, subject, class_level)
-    rotation = _USER_ROTATIONS['subject_class'].get(key, [])
-    if not rotation:
-        _USER_EXHAUSTED['subject_class'].add(key)
-        return []
-    batch = _pop_batch(rotation, count)
-    if not rotation:
-        _USER_EXHAUSTED['subject_class'].add(key)
-    return batch
+    key = (user_id, _subject_class_key(subject, class_level))
+    return _serve('user_subject_class', key, _subject_class_pool(subject, class_level), count)
 
 def get_user_mixed_questions(user_id: str, count: int = 10):
     """Return unique mixed pool questions for a user without repeats per cycle."""
-    if user_id in _USER_EXHAUSTED['mixed']:
-        return []
-    if user_id not in _USER_ROTATIONS['mixed']:
-        _init_user_mixed_rotation(user_id)
-    rotation = _USER_ROTATIONS['mixed'].get(user_id, [])
-    if not rotation:
-        _USER_EXHAUSTED['mixed'].add(user_id)
-        return []
-    batch = _pop_batch(rotation, count)
-    if not rotation:
-        _USER_EXHAUSTED['mixed'].add(user_id)
-    return batch
+    return _serve('user_mixed', user_id, _mixed_pool(), count)
+
+def get_classroom_questions(user_ids, lesson_id=None, subject=None, class_level=None, count=10, difficulties=None):
+    """Per-student unique batches for a whole class in one pass.
+
+    Scope is the lesson when lesson_id is given, else subject+class_level, else
+    the mixed pool. The pool is resolved once and each question is decoded once
+    however many students draw it, so the returned dicts may be shared between
+    students; treat them as read-only. Every student still gets their own
+    rotation, exactly as if get_user_*_questions were called for each.
+    Returns {user_id: [questions]} in the order the ids were given (duplicates
+    collapse to one entry)."""
+    if lesson_id is not None:
+        if lesson_id not in NCERT_QUESTION_DATABASE:
+            return {user_id: [] for user_id in user_ids}
+        scope, pool = 'user_lesson', _lesson_pool(lesson_id)
+        key_of = lambda user_id: (user_id, lesson_id)
+    elif subject is not None:
+        sc_key = _subject_class_key(subject, class_level)
+        scope, pool = 'user_subject_class', _subject_class_pool(subject, class_level)
+        key_of = lambda user_id: (user_id, sc_key)
+    else:
+        scope, pool = 'user_mixed', _mixed_pool()
+        key_of = lambda user_id: user_id
+    decoded = {}
+    batches = {}
+    for user_id in dict.fromkeys(user_ids):
+        batch = []
+        for idx in _serve_indices(scope, key_of(user_id), pool, count, difficulties):
+            q = decoded.get(idx)
+            if q is None:
+                q = decoded[idx] = QUESTION_RECORDS[idx]
+            batch.append(q)
+        batches[user_id] = batch
+    return batches
 
 # ------------------- Reset / Maintenance Utilities ------------------------
 
 def reset_user_rotations(user_id: str, scope: str = 'all', lesson_id: str = None, subject: str = None, class_level: int = None):
     if scope == 'all':
-        _USER_ROTATIONS['lesson'] = {k: v for k, v in _USER_ROTATIONS['lesson'].items() if k[0] != user_id}
-        _USER_ROTATIONS['subject_class'] = {k: v for k, v in _USER_ROTATIONS['subject_class'].items() if k[0] != user_id}
-        _USER_ROTATIONS['mixed'].pop(user_id, None)
-        # clear exhausted
-        _USER_EXHAUSTED['lesson'] = {k for k in _USER_EXHAUSTED['lesson'] if k[0] != user_id}
-        _USER_EXHAUSTED['subject_class'] = {k for k in _USER_EXHAUSTED['subject_class'] if k[0] != user_id}
-        _USER_EXHAUSTED['mixed'].discard(user_id)
+        targets = None  # every rotation the student has started
     elif scope == 'lesson' and lesson_id:
-        _USER_ROTATIONS['lesson'].pop((user_id, lesson_id), None)
-        _USER_EXHAUSTED['lesson'].discard((user_id, lesson_id))
+        targets = [('user_lesson', (user_id, lesson_id))]
     elif scope == 'subject_class' and subject and class_level is not None:
-        key = (user_id, subject.lower(), class_level)
-        _USER_ROTATIONS['subject_class'].pop(key, None)
-        _USER_EXHAUSTED['subject_class'].discard(key)
+        targets = [('user_subject_class', (user_id, _subject_class_key(subject, class_level)))]
     elif scope == 'mixed':
-        _USER_ROTATIONS['mixed'].pop(user_id, None)
-        _USER_EXHAUSTED['mixed'].discard(user_id)
+        targets = [('user_mixed', user_id)]
     else:
         raise ValueError('Invalid parameters for reset_user_rotations')
-
-import os, json
-
-STATE_FILE = os.path.join(os.path.dirname(__file__), 'question_state.json')
-
-# User answer tracking for review & adaptive resets
-_USER_TRACKING = {
-    # user_id: {
-    #   'answered': { lesson_id: set(question_ids) },
-    #   'wrong': { lesson_id: set(question_ids) }
-    # }
+    with _user_record(user_id, create=False) as record:
+        if record is None:
+            return
+        if targets is None:
+            targets = [('user_lesson', (user_id, lid)) for lid in record['lesson']]
+            targets += [('user_subject_class', (user_id, sc_key)) for sc_key in record['subject_class']]
+            targets.append(('user_mixed', user_id))
+        for table, key in targets:
+            state = _record_rotation(record, table, key)
+            if state:
+                _restart_rotation(state)
+                _journal_rotation(table, key, state)
+
+# User answer tracking for review & adaptive resets. 'answered' and 'wrong'
+# in each user record are bitmaps (Python ints) over global question indices
+# (QUESTION_RECORDS), so a student costs 2 bits per question in the bank and
+# review/adaptive pools are a few bitwise ops against the lesson masks.
+
+_LESSON_MASKS = {
+    lesson_id: (1 << span.stop) - (1 << span.start) for lesson_id, span in CATALOG_POSTINGS['lesson'].items()
 }
 
-def _get_lesson_total(lesson_id, difficulties=None):
-    questions = NCERT_QUESTION_DATABASE.get(lesson_id, [])
-    if difficulties:
-        ds = set(difficulties)
-        return sum(1 for q in questions if q.get('difficulty') in ds)
-    return len(questions)
+def _iter_bits(mask):
+    """Yield the indices of set bits in ascending order."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
 
-def _remaining_in_rotation(rotation_list, difficulties=None):
+def _pool_total(pool, difficulties=None):
+    totals = pool['totals']
     if not difficulties:
-        return len(rotation_list)
-    ds = set(difficulties)
-    return sum(1 for q in rotation_list if q.get('difficulty') in ds)
+        return sum(totals.values())
+    return sum(totals.get(d, 0) for d in set(difficulties))
+
+def _rotation_status(state, pool, difficulties=None):
+    """(total, remaining, exhausted) from precomputed pool totals and the
+    rotation's cursors; unstarted rotations are full. Cost is independent of
+    the size of the question bank."""
+    total = _pool_total(pool, difficulties)
+    if not state:
+        return total, total, total == 0
+    remaining = sum(_rotation_remaining(state, pool, difficulties).values())
+    return total, remaining, remaining == 0
 
 # ------------------ Status Helper Functions ------------------
 
 def get_lesson_status(lesson_id, difficulties=None):
-    rotation = _LESSON_ROTATIONS.get(lesson_id, [])
-    total = _get_lesson_total(lesson_id, difficulties)
-    remaining = _remaining_in_rotation(rotation, difficulties)
-    exhausted = (lesson_id in _LESSON_EXHAUSTED) or remaining == 0
+    with _checkout('lesson', lesson_id, create=False, write=False) as state:
+        total, remaining, exhausted = _rotation_status(state, _lesson_pool(lesson_id), difficulties)
     progress_percent = ((total - remaining) / total * 100) if total else 0
     return {
         'scope': 'lesson',
@@ -1028,20 +750,8 @@ def get_lesson_status(lesson_id, difficulties=None):
 
 def get_subject_class_status(subject, class_level, difficulties=None):
     key = _subject_class_key(subject, class_level)
-    rotation = _SUBJECT_CLASS_ROTATIONS.get(key, [])
-    # aggregate total
-    aggregated = []
-    for lesson_id, qlist in NCERT_QUESTION_DATABASE.items():
-        if subject.lower() in lesson_id and f'class{class_level}' in lesson_id:
-            aggregated.extend(qlist)
-    if difficulties:
-        ds = set(difficulties)
-        total = sum(1 for q in aggregated if q.get('difficulty') in ds)
-        remaining = sum(1 for q in rotation if q.get('difficulty') in ds)
-    else:
-        total = len(aggregated)
-        remaining = len(rotation)
-    exhausted = (key in _SUBJECT_CLASS_EXHAUSTED) or remaining == 0
+    with _checkout('subject_class', key, create=False, write=False) as state:
+        total, remaining, exhausted = _rotation_status(state, _subject_class_pool(subject, class_level), difficulties)
     progress_percent = ((total - remaining) / total * 100) if total else 0
     return {
         'scope': 'subject_class',
@@ -1054,17 +764,8 @@ def get_subject_class_status(subject, class_level, difficulties=None):
     }
 
 def get_mixed_status(difficulties=None):
-    all_questions = []
-    for qlist in NCERT_QUESTION_DATABASE.values():
-        all_questions.extend(qlist)
-    if difficulties:
-        ds = set(difficulties)
-        total = sum(1 for q in all_questions if q.get('difficulty') in ds)
-        remaining = sum(1 for q in _MIXED_ROTATION if q.get('difficulty') in ds)
-    else:
-        total = len(all_questions)
-        remaining = len(_MIXED_ROTATION)
-    exhausted = _MIXED_EXHAUSTED or remaining == 0
+    with _checkout('mixed', None, create=False, write=False) as state:
+        total, remaining, exhausted = _rotation_status(state, _mixed_pool(), difficulties)
     progress_percent = ((total - remaining) / total * 100) if total else 0
     return {
         'scope': 'mixed',
@@ -1077,11 +778,8 @@ def get_mixed_status(difficulties=None):
 # Per-user status
 
 def get_user_lesson_status(user_id, lesson_id, difficulties=None):
-    key = (user_id, lesson_id)
-    rotation = _USER_ROTATIONS['lesson'].get(key, [])
-    total = _get_lesson_total(lesson_id, difficulties)
-    remaining = _remaining_in_rotation(rotation, difficulties)
-    exhausted = key in _USER_EXHAUSTED['lesson'] or remaining == 0
+    with _checkout('user_lesson', (user_id, lesson_id), create=False, write=False) as state:
+        total, remaining, exhausted = _rotation_status(state, _lesson_pool(lesson_id), difficulties)
     progress_percent = ((total - remaining)/total*100) if total else 0
     return {
         'scope': 'user_lesson', 'user_id': user_id, 'lesson_id': lesson_id,
@@ -1090,21 +788,9 @@ def get_user_lesson_status(user_id, lesson_id, difficulties=None):
     }
 
 def get_user_subject_class_status(user_id, subject, class_level, difficulties=None):
-    key = (user_id, subject.lower(), class_level)
-    rotation = _USER_ROTATIONS['subject_class'].get(key, [])
-    # aggregate total
-    aggregated = []
-    for lesson_id, qlist in NCERT_QUESTION_DATABASE.items():
-        if subject.lower() in lesson_id and f'class{class_level}' in lesson_id:
-            aggregated.extend(qlist)
-    if difficulties:
-        ds = set(difficulties)
-        total = sum(1 for q in aggregated if q.get('difficulty') in ds)
-        remaining = sum(1 for q in rotation if q.get('difficulty') in ds)
-    else:
-        total = len(aggregated)
-        remaining = len(rotation)
-    exhausted = key in _USER_EXHAUSTED['subject_class'] or remaining == 0
+    key = (user_id, _subject_class_key(subject, class_level))
+    with _checkout('user_subject_class', key, create=False, write=False) as state:
+        total, remaining, exhausted = _rotation_status(state, _subject_class_pool(subject, class_level), difficulties)
     progress_percent = ((total - remaining)/total*100) if total else 0
     return {
         'scope': 'user_subject_class', 'user_id': user_id,
@@ -1114,18 +800,8 @@ def get_user_subject_class_status(user_id, subject, class_level, difficulties=No
     }
 
 def get_user_mixed_status(user_id, difficulties=None):
-    rotation = _USER_ROTATIONS['mixed'].get(user_id, [])
-    all_questions = []
-    for qlist in NCERT_QUESTION_DATABASE.values():
-        all_questions.extend(qlist)
-    if difficulties:
-        ds = set(difficulties)
-        total = sum(1 for q in all_questions if q.get('difficulty') in ds)
-        remaining = sum(1 for q in rotation if q.get('difficulty') in ds)
-    else:
-        total = len(all_questions)
-        remaining = len(rotation)
-    exhausted = user_id in _USER_EXHAUSTED['mixed'] or remaining == 0
+    with _checkout('user_mixed', user_id, create=False, write=False) as state:
+        total, remaining, exhausted = _rotation_status(state, _mixed_pool(), difficulties)
     progress_percent = ((total - remaining)/total*100) if total else 0
     return {
         'scope': 'user_mixed', 'user_id': user_id,
@@ -1134,256 +810,428 @@ def get_user_mixed_status(user_id, difficulties=None):
     }
 
 # ------------------- Difficulty-Filtered Fetch Wrappers -------------------
-
-def _pop_filtered(rotation_list, count, difficulties):
-    if not difficulties:
-        return _next_from_rotation(rotation_list, count)
-    ds = set(difficulties)
-    batch = []
-    # We still pop everything (maintain no-repeat globally), only return matching difficulties
-    while len(batch) < count and rotation_list:
-        q = rotation_list.pop()
-        if q.get('difficulty') in ds:
-            batch.append(q)
-    return batch
+# Filtered fetches only advance the requested difficulty buckets, so questions
+# of other difficulties stay available to later (filtered or unfiltered) calls.
 
 # Wrapper functions returning (questions, status_dict)
 
 def fetch_lesson_questions(lesson_id, count=10, difficulties=None):
-    qs = get_questions_by_lesson(lesson_id, 10**9)  # fetch remaining without consuming? (But our get pops) -> Instead, operate directly on rotation
-    # Because get_questions_by_lesson pops, we need direct access; adjust: use internal rotation directly
-    if lesson_id in _LESSON_EXHAUSTED:
-        return [], get_lesson_status(lesson_id, difficulties)
-    if lesson_id not in _LESSON_ROTATIONS:
-        _init_lesson_rotation(lesson_id)
-    rotation = _LESSON_ROTATIONS.get(lesson_id, [])
-    if not rotation:
-        _LESSON_EXHAUSTED.add(lesson_id)
-        return [], get_lesson_status(lesson_id, difficulties)
-    batch = _pop_filtered(rotation, count, difficulties)
-    if not rotation:
-        _LESSON_EXHAUSTED.add(lesson_id)
+    batch = []
+    if lesson_id in NCERT_QUESTION_DATABASE:
+        batch = _serve('lesson', lesson_id, _lesson_pool(lesson_id), count, difficulties)
     return batch, get_lesson_status(lesson_id, difficulties)
 
 def fetch_subject_class_questions(subject, class_level, count=10, difficulties=None):
     key = _subject_class_key(subject, class_level)
-    if key in _SUBJECT_CLASS_EXHAUSTED:
-        return [], get_subject_class_status(subject, class_level, difficulties)
-    if key not in _SUBJECT_CLASS_ROTATIONS:
-        _init_subject_class_rotation(subject, class_level)
-    rotation = _SUBJECT_CLASS_ROTATIONS.get(key, [])
-    if not rotation:
-        _SUBJECT_CLASS_EXHAUSTED.add(key)
-        return [], get_subject_class_status(subject, class_level, difficulties)
-    batch = _pop_filtered(rotation, count, difficulties)
-    if not rotation:
-        _SUBJECT_CLASS_EXHAUSTED.add(key)
+    batch = _serve('subject_class', key, _subject_class_pool(subject, class_level), count, difficulties)
     return batch, get_subject_class_status(subject, class_level, difficulties)
 
 def fetch_mixed_questions(count=10, difficulties=None):
-    global _MIXED_EXHAUSTED
-    if _MIXED_EXHAUSTED:
-        return [], get_mixed_status(difficulties)
-    if not _MIXED_ROTATION:
-        _init_mixed_rotation()
-    if not _MIXED_ROTATION:
-        _MIXED_EXHAUSTED = True
-        return [], get_mixed_status(difficulties)
-    batch = _pop_filtered(_MIXED_ROTATION, count, difficulties)
-    if not _MIXED_ROTATION:
-        _MIXED_EXHAUSTED = True
+    batch = _serve('mixed', None, _mixed_pool(), count, difficulties)
     return batch, get_mixed_status(difficulties)
 
 # Per-user difficulty filtered
 
+# (the guard is re-entrant, so batch and status come from one critical section)
+
 def fetch_user_lesson_questions(user_id, lesson_id, count=10, difficulties=None):
-    key = (user_id, lesson_id)
-    if key in _USER_EXHAUSTED['lesson']:
-        return [], get_user_lesson_status(user_id, lesson_id, difficulties)
-    if key not in _USER_ROTATIONS['lesson']:
-        _init_user_lesson_rotation(user_id, lesson_id)
-    rotation = _USER_ROTATIONS['lesson'].get(key, [])
-    if not rotation:
-        _USER_EXHAUSTED['lesson'].add(key)
-        return [], get_user_lesson_status(user_id, lesson_id, difficulties)
-    batch = _pop_filtered(rotation, count, difficulties)
-    if not rotation:
-        _USER_EXHAUSTED['lesson'].add(key)
-    return batch, get_user_lesson_status(user_id, lesson_id, difficulties)
+    with _user_guard(user_id):
+        batch = []
+        if lesson_id in NCERT_QUESTION_DATABASE:
+            batch = _serve('user_lesson', (user_id, lesson_id), _lesson_pool(lesson_id), count, difficulties)
+        return batch, get_user_lesson_status(user_id, lesson_id, difficulties)
 
 def fetch_user_subject_class_questions(user_id, subject, class_level, count=10, difficulties=None):
-    key = (user_id, subject.lower(), class_level)
-    if key in _USER_EXHAUSTED['subject_class']:
-        return [], get_user_subject_class_status(user_id, subject, class_level, difficulties)
-    if key not in _USER_ROTATIONS['subject_class']:
-        _init_user_subject_class_rotation(user_id, subject, class_level)
-    rotation = _USER_ROTATIONS['subject_class'].get(key, [])
-    if not rotation:
-        _USER_EXHAUSTED['subject_class'].add(key)
-        return [], get_user_subject_class_status(user_id, subject, class_level, difficulties)
-    batch = _pop_filtered(rotation, count, difficulties)
-    if not rotation:
-        _USER_EXHAUSTED['subject_class'].add(key)
-    return batch, get_user_subject_class_status(user_id, subject, class_level, difficulties)
+    with _user_guard(user_id):
+        key = (user_id, _subject_class_key(subject, class_level))
+        batch = _serve('user_subject_class', key, _subject_class_pool(subject, class_level), count, difficulties)
+        return batch, get_user_subject_class_status(user_id, subject, class_level, difficulties)
 
 def fetch_user_mixed_questions(user_id, count=10, difficulties=None):
-    if user_id in _USER_EXHAUSTED['mixed']:
-        return [], get_user_mixed_status(user_id, difficulties)
-    if user_id not in _USER_ROTATIONS['mixed']:
-        _init_user_mixed_rotation(user_id)
-    rotation = _USER_ROTATIONS['mixed'].get(user_id, [])
-    if not rotation:
-        _USER_EXHAUSTED['mixed'].add(user_id)
-        return [], get_user_mixed_status(user_id, difficulties)
-    batch = _pop_filtered(rotation, count, difficulties)
-    if not rotation:
-        _USER_EXHAUSTED['mixed'].add(user_id)
-    return batch, get_user_mixed_status(user_id, difficulties)
+    with _user_guard(user_id):
+        batch = _serve('user_mixed', user_id, _mixed_pool(), count, difficulties)
+        return batch, get_user_mixed_status(user_id, difficulties)
 
 # --------------------- Answer Tracking ------------------------------------
 
 def update_answer_tracking(user_id, lesson_id, question_id, correct):
-    record = _USER_TRACKING.setdefault(user_id, {'answered': {}, 'wrong': {}})
-    answered = record['answered'].setdefault(lesson_id, set())
-    wrong = record['wrong'].setdefault(lesson_id, set())
-    answered.add(question_id)
-    if correct:
-        wrong.discard(question_id)
-    else:
-        wrong.add(question_id)
-    save_question_state()
+    now = time.time()
+    with _user_guard(user_id):
+        cards = _apply_answer(user_id, lesson_id, question_id, correct, now)
+        _journal({'op': 'answer', 'user_id': user_id, 'lesson_id': lesson_id,
+                  'question_id': question_id, 'correct': bool(correct), 'ts': now, 'cards': cards})
+
+def update_answer_tracking_batch(user_id, answers):
+    """Track a whole lesson's answers, [(lesson_id, question_id, correct)] in
+    order, with one record checkout and one journal event."""
+    answers = [(lesson_id, question_id, bool(correct)) for lesson_id, question_id, correct in answers]
+    if not answers:
+        return
+    now = time.time()
+    with _user_guard(user_id):
+        cards = _apply_answers(user_id, answers, now)
+        _journal({'op': 'answers', 'user_id': user_id, 'answers': [list(a) for a in answers],
+                  'ts': now, 'cards': cards})
+
+def _apply_answer(user_id, lesson_id, question_id, correct, now=None, cards=None):
+    return _apply_answers(user_id, [(lesson_id, question_id, correct)], now, cards)
+
+def _apply_answers(user_id, answers, now=None, cards=None):
+    """Mark answers in the student's bitmaps and reschedule their SM-2 cards.
+    Returns the resulting cards by question key, for the journal. Replay
+    passes those back as 'cards' and they are installed as-is, so an event
+    whose effect already reached USER_STATE's database is not applied twice."""
+    # questions outside the bank (e.g. generated fallbacks) have nothing to review later
+    marks = [(question_position(lesson_id, question_id), correct) for lesson_id, question_id, correct in answers]
+    marks = [(idx, correct) for idx, correct in marks if idx is not None]
+    if not marks:
+        return {}
+    now = time.time() if now is None else now
+    with _user_record(user_id) as record:
+        for idx, correct in marks:
+            bit = 1 << idx
+            record['answered'] |= bit
+            if correct:
+                record['wrong'] &= ~bit
+            else:
+                record['wrong'] |= bit
+            if cards is None:
+                _srs_schedule(record, idx, correct, now)
+        if cards is not None:
+            for key, card in cards.items():
+                idx = _position_from_key(key)
+                if idx is not None:
+                    _srs_set(record, idx, card)
+        return {question_key(QUESTION_BANK.lesson_of(idx), QUESTION_BANK.question_id(idx)): record['srs'][str(idx)]
+                for idx, _ in marks}
+
+def _review_item(idx, was_wrong):
+    q = QUESTION_RECORDS[idx]
+    return {
+        'lesson_id': QUESTION_BANK.lesson_of(idx),
+        'id': q['id'],
+        'key': q['key'],
+        'text': q['text'],
+        'options': q['options'],
+        'correct_option': q['correct'],
+        'explanation': q.get('explanation'),
+        'difficulty': q.get('difficulty'),
+        'was_wrong': was_wrong
+    }
 
 def get_review_items(user_id, lesson_id=None, wrong_only=False):
-    record = _USER_TRACKING.get(user_id, {'answered': {}, 'wrong': {}})
-    lessons = [lesson_id] if lesson_id else list(record['answered'].keys())
-    review = []
-    for lid in lessons:
-        answered_ids = record['answered'].get(lid, set())
-        wrong_ids = record['wrong'].get(lid, set())
-        for q in NCERT_QUESTION_DATABASE.get(lid, []):
-            if q['id'] in answered_ids and (not wrong_only or q['id'] in wrong_ids):
-                review.append({
-                    'lesson_id': lid,
-                    'id': q['id'],
-                    'text': q['text'],
-                    'options': q['options'],
-                    'correct_option': q['correct'],
-                    'explanation': q.get('explanation'),
-                    'difficulty': q.get('difficulty'),
-                    'was_wrong': q['id'] in wrong_ids
-                })
-    return review
+    with _user_record(user_id, write=False) as record:
+        record = record or _new_user_record()
+        wrong = record['wrong']
+        mask = wrong if wrong_only else record['answered']
+    if lesson_id:
+        mask &= _LESSON_MASKS.get(lesson_id, 0)
+    return [_review_item(idx, bool(wrong >> idx & 1)) for idx in _iter_bits(mask)]
+
+# Spaced repetition (SM-2). Every answered bank question gets a card in the
+# student record, 'srs': {str(idx): [ease, interval_days, repetitions, due_ts]},
+# and 'srs_queue' is a binary heap of [due_ts, idx] over those cards. A card
+# that is rescheduled just pushes a new entry; superseded entries are skipped
+# when they reach the top and the heap is rebuilt once they pile up.
+
+SRS_START_EASE = 2.5
+SRS_MIN_EASE = 1.3
+SRS_RELEARN_SECONDS = 600   # a failed card comes back later in the same session
+SRS_MAX_INTERVAL_DAYS = 365
+_SECONDS_PER_DAY = 86400
+
+def _sm2(card, quality, now):
+    """Next [ease, interval_days, repetitions, due_ts] for a 0-5 recall grade."""
+    ease, interval, reps = card[0], card[1], card[2]
+    if quality >= 3:
+        interval = 1 if reps == 0 else 6 if reps == 1 else min(SRS_MAX_INTERVAL_DAYS, round(interval * ease))
+        reps += 1
+        due = now + interval * _SECONDS_PER_DAY
+    else:
+        interval, reps = 0, 0
+        due = now + SRS_RELEARN_SECONDS
+    ease = max(SRS_MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return [round(ease, 3), interval, reps, due]
+
+def _srs_schedule(record, idx, correct, now):
+    card = record.setdefault('srs', {}).get(str(idx))
+    if card is not None and correct and now < card[3]:
+        return  # recalled ahead of schedule (e.g. met again in a rotation); keep the interval
+    _srs_set(record, idx, _sm2(card or [SRS_START_EASE, 0, 0, now], 4 if correct else 1, now))
+
+def _srs_set(record, idx, card):
+    cards = record.setdefault('srs', {})
+    queue = record.setdefault('srs_queue', [])
+    if cards.get(str(idx)) == card:
+        return  # unchanged (journal replay); a second live heap entry would repeat the card
+    cards[str(idx)] = card
+    heapq.heappush(queue, [card[3], idx])
+    if len(queue) > 2 * len(cards) + 16:
+        # a sorted list is a valid heap
+        record['srs_queue'] = sorted([c[3], int(i)] for i, c in cards.items())
+
+def _srs_live(cards, entry):
+    card = cards.get(str(entry[1]))
+    return card is not None and card[3] == entry[0]
+
+def get_due_reviews(user_id, count=10, now=None):
+    """(items, next_due_ts): up to 'count' cards due by 'now', most overdue
+    first, plus the due time of the first card not returned (None if none).
+
+    Pops the due entries (dropping superseded ones) and pushes them back, so the
+    cost is O(count log n) in the student's card count."""
+    now = time.time() if now is None else now
+    with _user_record(user_id, create=False) as record:
+        if not record or not record.get('srs_queue'):
+            return [], None
+        cards, queue = record['srs'], record['srs_queue']
+        due = []
+        while queue and len(due) < count and queue[0][0] <= now:
+            entry = heapq.heappop(queue)
+            if _srs_live(cards, entry):
+                due.append(entry)
+        while queue and not _srs_live(cards, queue[0]):
+            heapq.heappop(queue)
+        next_due = queue[0][0] if queue else None
+        for entry in due:
+            heapq.heappush(queue, entry)
+        wrong = record['wrong']
+    items = []
+    for due_ts, idx in due:
+        ease, interval, reps, _ = cards[str(idx)]
+        item = _review_item(idx, bool(wrong >> idx & 1))
+        item.update({'due_at': due_ts, 'overdue_seconds': round(now - due_ts, 1),
+                     'interval_days': interval, 'repetitions': reps, 'ease': ease})
+        items.append(item)
+    return items, next_due
 
 # Adaptive reset: only wrong ones
 
 def adaptive_reset_user_lesson(user_id, lesson_id):
-    record = _USER_TRACKING.get(user_id)
-    if not record:
+    if lesson_id not in NCERT_QUESTION_DATABASE:
         return False
-    wrong_ids = record['wrong'].get(lesson_id, set())
-    pool = [q for q in NCERT_QUESTION_DATABASE.get(lesson_id, []) if q['id'] in wrong_ids]
-    key = (user_id, lesson_id)
-    import random
-    _USER_ROTATIONS['lesson'][key] = random.sample(pool, len(pool)) if pool else []
-    if key in _USER_EXHAUSTED['lesson']:
-        _USER_EXHAUSTED['lesson'].discard(key)
-    save_question_state()
+    with _user_record(user_id, create=False) as record:
+        return record is not None and _adaptive_reset_user_lesson(record, user_id, lesson_id)
+
+def _adaptive_reset_user_lesson(record, user_id, lesson_id):
+    lesson_idxs = CATALOG_POSTINGS['lesson'].get(lesson_id, ())
+    wrong = record['wrong'] & _LESSON_MASKS.get(lesson_id, 0)
+    # A lesson's questions occupy a contiguous run of global indices, in pool order
+    positions = [idx - lesson_idxs[0] for idx in _iter_bits(wrong)]
+    state = _record_rotation(record, 'user_lesson', (user_id, lesson_id), create=True)
+    _restart_rotation(state)
+    state['subset'] = _bucket_positions(_lesson_pool(lesson_id)['indices'], positions)
+    _journal_rotation('user_lesson', (user_id, lesson_id), state)
     return True
 
 # --------------------- Persistence Layer ----------------------------------
+# State lives in a snapshot (STATE_FILE) plus an append-only journal of
+# rotation and answer events. Requests only append one short line to the
+# journal; a background thread periodically folds the journal into a fresh
+# snapshot, and load_question_state replays it on startup. Journal events are
+# idempotent (rotations and SM-2 cards record their full new state), so an
+# event that lands in both the snapshot and the journal is harmless.
+
+JOURNAL_FILE = os.path.join(os.path.dirname(__file__), 'question_state.journal')
+JOURNAL_COMPACT_EVERY = 5000      # events before an early compaction
+JOURNAL_COMPACT_INTERVAL = 60     # seconds between background compactions
+
+_JOURNAL_LOCK = threading.Lock()
+_COMPACT_WAKE = threading.Event()
+_journal_fh = None
+_journal_entries = 0
+_compactor = None
+
+def _journal(event):
+    """Append one event to the journal; cheap enough to call on every request."""
+    global _journal_fh, _journal_entries
+    if SHARED_STATE is not None:
+        return  # the shared store is durable by itself
+    line = json.dumps(event, separators=(',', ':')) + '\n'
+    try:
+        with _JOURNAL_LOCK:
+            if _journal_fh is None:
+                _journal_fh = open(JOURNAL_FILE, 'a')
+            _journal_fh.write(line)
+            _journal_fh.flush()
+            _journal_entries += 1
+            due = _journal_entries >= JOURNAL_COMPACT_EVERY
+    except Exception:
+        return
+    _start_compactor()
+    if due:
+        _COMPACT_WAKE.set()
+
+def _journal_rotation(scope, key, state):
+    _journal({'op': 'rotation', 'scope': scope, 'key': list(key) if isinstance(key, tuple) else key, 'state': state})
+
+def _apply_journal_event(event):
+    op = event.get('op')
+    if op == 'rotation':
+        scope, key = event['scope'], event.get('key')
+        key = tuple(key) if isinstance(key, list) else key
+        if _STORED_LAYOUT is not None:  # journaled before the bank was rebuilt
+            lesson_id = key if scope == 'lesson' else key[1] if scope == 'user_lesson' else None
+            _migrate_rotation(event['state'], _STORED_LAYOUT, lesson_id)
+        _set_rotation_state(scope, key, event['state'])
+    elif op == 'reset':
+        _drop_rotations(event['scope'], event.get('lesson_id'), event.get('subject'), event.get('class_level'))
+    elif op == 'answer':
+        _apply_answer(event['user_id'], event['lesson_id'], event['question_id'], event['correct'],
+                      event.get('ts'), event.get('cards'))
+    elif op == 'answers':
+        _apply_answers(event['user_id'], event['answers'], event.get('ts'), event.get('cards'))
+
+def _replay_journal():
+    """Apply journal events written since the last snapshot; returns how many."""
+    global _journal_entries
+    if not os.path.exists(JOURNAL_FILE):
+        return 0
+    applied = 0
+    with open(JOURNAL_FILE, 'r') as f:
+        for line in f:
+            try:
+                _apply_journal_event(json.loads(line))
+                applied += 1
+            except Exception:
+                continue  # torn tail from a crash mid-write
+    _journal_entries = applied
+    return applied
+
+def _start_compactor():
+    global _compactor
+    if _compactor is not None:
+        return
+    with _JOURNAL_LOCK:
+        if _compactor is None:
+            _compactor = threading.Thread(target=_compactor_loop, name='question-state-compactor', daemon=True)
+            _compactor.start()
+
+def _compactor_loop():
+    while True:
+        _COMPACT_WAKE.wait(JOURNAL_COMPACT_INTERVAL)
+        _COMPACT_WAKE.clear()
+        compact_question_state()
+
+def compact_question_state():
+    """Fold the journal into the snapshot if anything was journaled since the last one."""
+    if _journal_entries:
+        save_question_state()
+
+def _snapshot_state():
+    # Global rotations only; per-user records live in USER_STATE's SQLite file
+    return state_codec.dumps_snapshot(_LESSON_ROTATIONS, _SUBJECT_CLASS_ROTATIONS, _MIXED_ROTATION, _bank_layout())
 
 def save_question_state():
+    """Flush modified user records, write the global snapshot atomically and
+    truncate the journal they supersede."""
+    global _journal_fh, _journal_entries
+    if SHARED_STATE is not None:
+        return  # nothing process-local to save; workers must not race on STATE_FILE
     try:
-        data = {
-            'lesson_rotations': {lid: [q['id'] for q in rot] for lid, rot in _LESSON_ROTATIONS.items()},
-            'lesson_exhausted': list(_LESSON_EXHAUSTED),
-            'subject_class_rotations': {k: [q['id'] for q in rot] for k, rot in _SUBJECT_CLASS_ROTATIONS.items()},
-            'subject_class_exhausted': list(_SUBJECT_CLASS_EXHAUSTED),
-            'mixed_rotation': [q['id'] for q in _MIXED_ROTATION],
-            'mixed_exhausted': _MIXED_EXHAUSTED,
-            'user_rotations': {
-                'lesson': {str(k): [q['id'] for q in rot] for k, rot in _USER_ROTATIONS['lesson'].items()},
-                'subject_class': {str(k): [q['id'] for q in rot] for k, rot in _USER_ROTATIONS['subject_class'].items()},
-                'mixed': {uid: [q['id'] for q in rot] for uid, rot in _USER_ROTATIONS['mixed'].items()}
-            },
-            'user_exhausted': {
-                'lesson': [str(k) for k in _USER_EXHAUSTED['lesson']],
-                'subject_class': [str(k) for k in _USER_EXHAUSTED['subject_class']],
-                'mixed': list(_USER_EXHAUSTED['mixed'])
-            },
-            'user_tracking': {
-                uid: {
-                    'answered': {lid: list(ids) for lid, ids in rec['answered'].items()},
-                    'wrong': {lid: list(ids) for lid, ids in rec['wrong'].items()}
-                } for uid, rec in _USER_TRACKING.items()
-            }
-        }
-        with open(STATE_FILE, 'w') as f:
-            json.dump(data, f)
+        # All stripes first (same order as request paths: stripe, then journal),
+        # so no rotation or user record is mid-update while it is serialised
+        with _ROTATION_LOCKS.all(), _JOURNAL_LOCK:
+            USER_STATE.flush()
+            data = _snapshot_state()
+            tmp_path = STATE_FILE + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, STATE_FILE)
+            if _journal_fh is not None:
+                _journal_fh.close()
+                _journal_fh = None
+            if os.path.exists(JOURNAL_FILE):
+                open(JOURNAL_FILE, 'w').close()
+            _journal_entries = 0
     except Exception:
         pass
 
+def _is_rotation_state(st):
+    return isinstance(st, dict) and isinstance(st.get('cursors'), dict)
+
+def _load_legacy_user_state(data):
+    """Move per-user sections of older snapshots into USER_STATE."""
+    user_rotations = data.get('user_rotations', {})
+    for entry in user_rotations.get('lesson', []):
+        if isinstance(entry, list) and len(entry) == 3 and _is_rotation_state(entry[2]):
+            _set_rotation_state('user_lesson', (entry[0], entry[1]), entry[2])
+    for entry in user_rotations.get('subject_class', []):
+        if isinstance(entry, list) and len(entry) == 4 and _is_rotation_state(entry[3]):
+            _set_rotation_state('user_subject_class', (entry[0], _subject_class_key(entry[1], entry[2])), entry[3])
+    for uid, st in user_rotations.get('mixed', {}).items():
+        if _is_rotation_state(st):
+            _set_rotation_state('user_mixed', uid, st)
+    for uid, rec in data.get('user_tracking', {}).items():
+        if isinstance(rec.get('answered'), str):
+            record = USER_STATE.get(uid)
+            record['answered'] = int(rec['answered'], 16)
+            record['wrong'] = int(rec.get('wrong') or '0', 16)
+            continue
+        # {lesson_id: [question ids]} per set
+        wrong = {(lid, qid) for lid, ids in rec.get('wrong', {}).items() for qid in ids}
+        for lid, ids in rec.get('answered', {}).items():
+            for qid in ids:
+                _apply_answer(uid, lid, qid, (lid, qid) not in wrong)
+
 def load_question_state():
-    if not os.path.exists(STATE_FILE):
-        return
+    """Restore the snapshot, then replay any journal written after it."""
+    global _STORED_LAYOUT
+    if SHARED_STATE is not None:
+        return  # state is read from SHARED_STATE_DB on demand
+    migrated = False
+    _STORED_LAYOUT = None
+    if os.path.exists(STATE_FILE):
+        try:
+            with open(STATE_FILE, 'rb') as f:
+                lessons, subject_classes, mixed, layout = state_codec.loads_snapshot(f.read())
+            if layout and layout[0] != BANK_FINGERPRINT:
+                _STORED_LAYOUT = _index_layout(layout)
+                for lesson_id, state in lessons.items():
+                    _migrate_rotation(state, _STORED_LAYOUT, lesson_id)
+                for state in subject_classes.values():
+                    _migrate_rotation(state, _STORED_LAYOUT)
+                _migrate_rotation(mixed, _STORED_LAYOUT)
+            _LESSON_ROTATIONS.update(lessons)
+            _SUBJECT_CLASS_ROTATIONS.update(subject_classes)
+            if mixed:
+                _MIXED_ROTATION.update(mixed)
+        except Exception:
+            pass
+    elif os.path.exists(LEGACY_STATE_FILE):
+        migrated = _load_legacy_snapshot()
     try:
-        with open(STATE_FILE, 'r') as f:
-            data = json.load(f)
-        # Helpers
-        def _id_map_for_lesson(lid):
-            return {q['id']: q for q in NCERT_QUESTION_DATABASE.get(lid, [])}
-        # Lessons
-        for lid, id_list in data.get('lesson_rotations', {}).items():
-            id_map = _id_map_for_lesson(lid)
-            _LESSON_ROTATIONS[lid] = [id_map[i] for i in id_list if i in id_map]
-        for lid in data.get('lesson_exhausted', []):
-            _LESSON_EXHAUSTED.add(lid)
-        # Subject-class rotations
-        for key, id_list in data.get('subject_class_rotations', {}).items():
-            # key format '{subject}__class{n}' from earlier helper or maybe a tuple string; keep as-is
-            # Rebuild aggregated map
-            aggregated = []
-            for lesson_id, qlist in NCERT_QUESTION_DATABASE.items():
-                aggregated.extend(qlist)
-            id_map = {q['id']: q for q in aggregated}
-            _SUBJECT_CLASS_ROTATIONS[key] = [id_map[i] for i in id_list if i in id_map]
-        for key in data.get('subject_class_exhausted', []):
-            _SUBJECT_CLASS_EXHAUSTED.add(key)
-        # Mixed
-        mixed_ids = data.get('mixed_rotation', [])
-        id_map_all = {q['id']: q for ql in NCERT_QUESTION_DATABASE.values() for q in ql}
-        _MIXED_ROTATION.extend([id_map_all[i] for i in mixed_ids if i in id_map_all])
-        global _MIXED_EXHAUSTED
-        _MIXED_EXHAUSTED = data.get('mixed_exhausted', False)
-        # User rotations
-        for k, id_list in data.get('user_rotations', {}).get('lesson', {}).items():
-            # k is string representation of tuple; we skip safe parsing for now
-            if k.startswith('(') and k.endswith(')'):
-                parts = k.strip('()').split(',')
-                if len(parts) == 2:
-                    user_id = parts[0].strip().strip("'\"")
-                    lesson_id = parts[1].strip().strip("'\"")
-                    id_map = _id_map_for_lesson(lesson_id)
-                    _USER_ROTATIONS['lesson'][(user_id, lesson_id)] = [id_map[i] for i in id_list if i in id_map]
-        # Subject-class user rotations skipped for brevity (can extend similarly)
-        for uid, id_list in data.get('user_rotations', {}).get('mixed', {}).items():
-            _USER_ROTATIONS['mixed'][uid] = [id_map_all[i] for i in id_list if i in id_map_all]
-        # User exhausted
-        for k in data.get('user_exhausted', {}).get('lesson', []):
-            if k.startswith('(') and k.endswith(')'):
-                parts = k.strip('()').split(',')
-                if len(parts) == 2:
-                    user_id = parts[0].strip().strip("'\"")
-                    lesson_id = parts[1].strip().strip("'\"")
-                    _USER_EXHAUSTED['lesson'].add((user_id, lesson_id))
-        # Tracking
-        for uid, rec in data.get('user_tracking', {}).items():
-            _USER_TRACKING[uid] = {
-                'answered': {lid: set(ids) for lid, ids in rec.get('answered', {}).items()},
-                'wrong': {lid: set(ids) for lid, ids in rec.get('wrong', {}).items()}
-            }
+        _replay_journal()
     except Exception:
         pass
+    if _STORED_LAYOUT is not None:
+        # The bank was rebuilt: store every record remapped, then a snapshot
+        # of the new layout (which also retires the old journal)
+        USER_STATE.rewrite_all()
+        migrated = True
+    if migrated:
+        save_question_state()  # legacy JSON is read only once, old layouts are migrated once
+    _STORED_LAYOUT = None
+
+def _load_legacy_snapshot():
+    """Read a pre-versioned JSON snapshot. Older files stored shuffled id lists
+    instead of rotation states; those rotations simply start a fresh cycle."""
+    try:
+        with open(LEGACY_STATE_FILE, 'r') as f:
+            data = json.load(f)
+        for lid, st in data.get('lesson_rotations', {}).items():
+            if _is_rotation_state(st):
+                _LESSON_ROTATIONS[lid] = st
+        for key, st in data.get('subject_class_rotations', {}).items():
+            if _is_rotation_state(st):
+                _SUBJECT_CLASS_ROTATIONS[key] = st
+        if _is_rotation_state(data.get('mixed_rotation')):
+            _MIXED_ROTATION.update(data['mixed_rotation'])
+        _load_legacy_user_state(data)
+        return True
+    except Exception:
+        return False
 
-# Load persisted state on import
-load_question_state()
\ No newline at end of file
+# Load persisted state on import; fold the journal on clean shutdown
+load_question_state()
+atexit.register(compact_question_state)
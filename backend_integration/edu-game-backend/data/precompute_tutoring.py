@@ -0,0 +1,118 @@
+"""
+Generate rich tutoring for the whole NCERT question bank ahead of time.
+
+For every question this produces the get_rich_hint payload for no selection
+and for each option, and the get_wrong_answer_analysis payload for each wrong
+option, and writes them to the artifact the API loads at startup
+(Config.TUTORING_ARTIFACT), keyed exactly like the response cache. Answer
+checks and hint requests for bank questions then become lookups; the LLM is
+only needed for free-text attempts and questions outside the bank.
+
+    python data/precompute_tutoring.py [--out PATH] [--concurrency N]
+
+Needs GROQ_API_KEY (and GROQ_MODEL if not the default). Every payload is
+appended to PATH.partial as soon as it arrives; a rerun after a crash or
+failed calls resumes from there (and from an existing artifact of the same
+version and model) and only generates what is missing. The partial file is
+removed once the artifact is complete.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(DATA_DIR, '..'))
+from config import Config
+from services.ai_service import AIService
+from utils.response_cache import ResponseCache, read_artifact, write_artifact
+
+
+def tutoring_tasks(service, questions):
+    """(key, kind, question, selected_option) for every payload the bank needs."""
+    for question in questions:
+        yield service.tutoring_key('rich_hint', question), 'rich_hint', question, None
+        for option in range(len(question.get('options', []))):
+            yield service.tutoring_key('rich_hint', question, option), 'rich_hint', question, option
+            if option != question.get('correct'):
+                yield service.tutoring_key('wrong_analysis', question, option), 'wrong_analysis', question, option
+
+
+def _load_partial(path):
+    entries = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    key, value = json.loads(line)
+                except ValueError:
+                    continue   # torn last line from a crash
+                entries[key] = value
+    except OSError:
+        pass
+    return entries
+
+
+def precompute(out, service, questions, concurrency=4):
+    """Fill the artifact at out; returns (generated, failed, total)."""
+    partial = out + '.partial'
+    done = {}
+    artifact = read_artifact(out)
+    if artifact and artifact['version'] == service.cache.version and artifact['model'] == service.gateway.model:
+        done.update(artifact['entries'])
+    done.update(_load_partial(partial))
+
+    tasks = {}
+    for key, kind, question, option in tutoring_tasks(service, questions):
+        tasks.setdefault(key, (kind, question, option))
+    pending = [(key, task) for key, task in tasks.items() if key not in done]
+
+    lock = threading.Lock()
+    failed = []
+    with open(partial, 'a', encoding='utf-8') as checkpoint:
+        def run(key, kind, question, option):
+            if kind == 'rich_hint':
+                result = service._generate_rich_hint(question, None, option)
+            else:
+                result = service._generate_wrong_answer_analysis(question, option)
+            with lock:
+                if result.get('source') != 'ai':
+                    failed.append(key)   # fallback content: retried on the next run
+                    return
+                done[key] = result
+                checkpoint.write(json.dumps([key, result], separators=(',', ':')) + '\n')
+                checkpoint.flush()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for future in [pool.submit(run, key, *task) for key, task in pending]:
+                future.result()
+
+    entries = {key: done[key] for key in tasks if key in done}
+    write_artifact(out, entries, service.cache.version, service.gateway.model)
+    if not failed:
+        os.remove(partial)
+    return len(pending) - len(failed), len(failed), len(tasks)
+
+
+def bank_questions():
+    if DATA_DIR not in sys.path:
+        sys.path.insert(0, DATA_DIR)
+    from ncert_questions import QUESTION_RECORDS
+    return QUESTION_RECORDS
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Precompute rich tutoring for the question bank')
+    parser.add_argument('--out', default=Config.TUTORING_ARTIFACT)
+    parser.add_argument('--concurrency', type=int, default=Config.AI_MAX_CONCURRENCY)
+    args = parser.parse_args()
+    # Compute against the live provider only: no cache reads, nothing written to the cache DB
+    service = AIService(cache=ResponseCache(None, max_entries=0, version=Config.HINT_CACHE_VERSION))
+    if not service.groq_api_key:
+        sys.exit('GROQ_API_KEY is not set')
+    generated, failed, total = precompute(args.out, service, bank_questions(), args.concurrency)
+    print(f"{total - failed}/{total} tutoring payloads in {args.out} "
+          f"({generated} generated now, {failed} failed; rerun to resume)")
+    sys.exit(1 if failed else 0)
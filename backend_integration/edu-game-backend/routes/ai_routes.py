@@ -1,10 +1,10 @@
-from flask import Blueprint, request, jsonify
-from services.ai_service import AIService
+from flask import Blueprint, Response, request, jsonify
+from services.ai_service import get_ai_service
 from utils.data_loader import DataLoader
 import json
 
 ai_bp = Blueprint('ai', __name__)
-ai_service = AIService()
+ai_service = get_ai_service()
 data_loader = DataLoader()
 
 @ai_bp.route('/hint', methods=['POST'])
@@ -155,3 +155,47 @@ def get_encouragement():
             "error": str(e),
             "success": False
         }), 500
+
+# ---------------- Streaming variants (server-sent events) -----------------
+def _sse_response(frames):
+    """Relay (event, data) frames from the AIService stream_* methods as SSE"""
+    def events():
+        for event, data in frames:
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return Response(events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def _streamed_question():
+    data = request.get_json() or {}
+    question_id = data.get('question_id')
+    if not question_id:
+        return data, None, (jsonify({"success": False, "error": "question_id required"}), 400)
+    question_data = data_loader.get_question_by_id(question_id)
+    if not question_data:
+        return data, None, (jsonify({"success": False, "error": "Question not found"}), 404)
+    return data, question_data, None
+
+@ai_bp.route('/hint/stream', methods=['POST'])
+def stream_hint():
+    """Streaming /hint: a 'fallback' frame with local tutoring at once, 'token' frames
+    as the model writes, then 'done' (or 'error'). Payload as /hint."""
+    data, question_data, error = _streamed_question()
+    if error:
+        return error
+    return _sse_response(ai_service.stream_hint(question_data, data.get('user_attempt')))
+
+@ai_bp.route('/solution-steps/stream', methods=['POST'])
+def stream_solution_steps():
+    """Streaming /solution-steps (same frames as /hint/stream)"""
+    data, question_data, error = _streamed_question()
+    if error:
+        return error
+    return _sse_response(ai_service.stream_step_by_step_solution(question_data))
+
+@ai_bp.route('/encouragement/stream', methods=['POST'])
+def stream_encouragement():
+    """Streaming /encouragement (same frames as /hint/stream)"""
+    data, question_data, error = _streamed_question()
+    if error:
+        return error
+    return _sse_response(ai_service.stream_gamified_encouragement(question_data, data.get('is_correct', False)))
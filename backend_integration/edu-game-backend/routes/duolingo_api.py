@@ -2,10 +2,12 @@
 Duolingo-Style Learning API Routes
 Handles questions, progress, achievements, and AI integration
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
+import atexit
 import json
 import os
 import sys
+import threading
 from datetime import datetime
 import random
 
@@ -15,6 +17,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'data'))
 try:
     from ncert_questions import (
         NCERT_QUESTION_DATABASE, 
+        SCIENCE_QUESTIONS, MATHEMATICS_QUESTIONS,
         get_questions_by_lesson,
         get_questions_by_subject_class,
         get_mixed_questions,
@@ -31,36 +34,102 @@ try:
         fetch_user_lesson_questions, fetch_user_subject_class_questions, fetch_user_mixed_questions,
         get_lesson_status, get_subject_class_status, get_mixed_status,
         get_user_lesson_status, get_user_subject_class_status, get_user_mixed_status,
-        update_answer_tracking, get_review_items, adaptive_reset_user_lesson
+        update_answer_tracking, update_answer_tracking_batch, get_review_items, adaptive_reset_user_lesson,
+        get_due_reviews,
+        get_classroom_questions,
+        # O(1) question lookup by (lesson_id, id) or global key
+        find_question
     )
 except ImportError:
     # Fallback if import fails (reduced capability)
     NCERT_QUESTION_DATABASE = {}
+    SCIENCE_QUESTIONS = MATHEMATICS_QUESTIONS = {}
     DAILY_CHALLENGES = []
     DIFFICULTY_LEVELS = {'easy': {'xp': 10, 'tokens': 1}, 'medium': {'xp': 15, 'tokens': 2}, 'hard': {'xp': 25, 'tokens': 3}}
 
+from services.achievement_engine import AchievementEngine
+from services.tutoring_jobs import TutoringJobs
+from utils.leaderboard_index import LeaderboardIndex
+from utils.progress_store import ProgressStore
+from utils.write_behind import WriteBehindBuffer
+
 duolingo_api = Blueprint('duolingo_api', __name__)
 
 # Data storage paths
-PROGRESS_DB = "data/student_progress.json"
-ACHIEVEMENTS_DB = "data/achievements.json"
-SESSIONS_DB = "data/learning_sessions.json"
-
-def load_data(file_path):
-    """Load data from JSON file"""
-    if not os.path.exists(file_path):
-        return {}
-    try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
-    except:
-        return {}
-
-def save_data(file_path, data):
-    """Save data to JSON file"""
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    with open(file_path, 'w') as f:
-        json.dump(data, f, indent=2)
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+PROGRESS_DB = os.environ.get('PROGRESS_DB', os.path.join(DATA_DIR, 'student_progress.db'))
+LEGACY_PROGRESS_FILE = os.path.join(DATA_DIR, 'student_progress.json')  # imported into PROGRESS_DB once
+
+PROGRESS = ProgressStore(PROGRESS_DB, legacy_json=LEGACY_PROGRESS_FILE)
+
+# XP/tokens earned per answer are coalesced in memory and written in batches
+PROGRESS_FLUSH_INTERVAL = float(os.environ.get('PROGRESS_FLUSH_INTERVAL', 2.0))      # seconds
+PROGRESS_FLUSH_MAX_PENDING = int(os.environ.get('PROGRESS_FLUSH_MAX_PENDING', 500))  # students
+
+# Achievement rules, evaluated on progress events (see record_achievements)
+ACHIEVEMENTS = AchievementEngine()
+ACHIEVEMENTS.rule('first_lesson', 'lessons_completed', 1,
+                  name='First Steps', description='Complete your first lesson', icon='🌟')
+ACHIEVEMENTS.rule('science_explorer', 'science_lessons', 5,
+                  name='Science Explorer', description='Complete 5 science lessons', icon='🧪')
+ACHIEVEMENTS.rule('math_wizard', 'maths_lessons', 5,
+                  name='Math Wizard', description='Complete 5 math lessons', icon='📊')
+ACHIEVEMENTS.rule('perfect_score', 'perfect_lessons', 1,
+                  name='Perfectionist', description='Get 100% in any lesson', icon='💯')
+ACHIEVEMENTS.rule('streak_master', 'streak', 7,
+                  name='Streak Master', description='7 day learning streak', icon='🔥')
+ACHIEVEMENTS.rule('xp_collector', 'xp', 1000,
+                  name='XP Collector', description='Earn 1000 XP', icon='⭐')
+ACHIEVEMENTS.rule('knowledge_seeker', 'questions_answered', 100,
+                  name='Knowledge Seeker', description='Answer 100 questions', icon='🎯')
+ACHIEVEMENTS.define('class_topper', name='Class Topper', description='Rank #1 on leaderboard', icon='🏆')
+
+def _apply_rewards(batch):
+    """Write one batch of buffered {student_id: {'xp', 'tokens'}} deltas"""
+    def apply(student_id, student_data):
+        earned = batch[student_id]
+        student_data['xp'] += earned.get('xp', 0)
+        student_data['tokens'] += earned.get('tokens', 0)
+        student_data['level'] = calculate_level_from_xp(student_data['xp'])
+        record_achievements(student_data, values={'xp': student_data['xp']})
+    PROGRESS.update_many(batch, apply, new_student_progress)
+
+REWARDS = WriteBehindBuffer(_apply_rewards, PROGRESS_FLUSH_INTERVAL, PROGRESS_FLUSH_MAX_PENDING,
+                            name='progress-write-behind')
+atexit.register(REWARDS.flush)
+
+def _tutoring_ai_service():
+    from services.ai_service import get_ai_service
+    return get_ai_service()
+
+# Rich tutoring (LLM) runs on a worker pool; /answer/check only hands out a ticket
+TUTORING = TutoringJobs(_tutoring_ai_service,
+                        workers=int(os.environ.get('TUTORING_WORKERS', 4)),
+                        ttl=int(os.environ.get('TUTORING_TICKET_TTL', 600)),
+                        max_pending=int(os.environ.get('TUTORING_MAX_PENDING', 200)))
+
+# XP-ordered index behind /leaderboard; refresh_leaderboard() applies only the
+# progress rows written since its last call (by any worker process). Rewards
+# still in REWARDS show up after the next flush.
+LEADERBOARD = LeaderboardIndex()
+_LEADERBOARD_SYNC = threading.Lock()
+_leaderboard_rev = -1   # nothing loaded yet: the first refresh reads every student
+
+def new_student_progress():
+    """Progress record for a student seen for the first time"""
+    return {
+        'xp': 0,
+        'tokens': 0,
+        'streak': 0,
+        'level': 1,
+        'lessons_completed': {},
+        'subjects_progress': {'science': 0, 'maths': 0},
+        'daily_progress': 0,
+        'last_activity': datetime.now().isoformat(),
+        'achievements': [],
+        'total_questions_answered': 0,
+        'correct_answers': 0
+    }
 
 @duolingo_api.route('/questions/lesson', methods=['POST'])
 def get_lesson_questions():
@@ -95,6 +164,7 @@ def get_lesson_questions():
         for q in questions:
             safe_q = {
                 'id': q['id'],
+                'key': q.get('key'),
                 'text': q['text'],
                 'options': q['options'],
                 'concept': q['concept'],
@@ -133,6 +203,7 @@ def get_subject_questions():
         safe_questions = [
             {
                 'id': q['id'],
+                'key': q.get('key'),
                 'text': q['text'], 
                 'options': q['options'],
                 'concept': q['concept'],
@@ -163,6 +234,7 @@ def get_mixed_questions_api():
         safe_questions = [
             {
                 'id': q['id'],
+                'key': q.get('key'),
                 'text': q['text'],
                 'options': q['options'], 
                 'concept': q['concept'],
@@ -185,95 +257,176 @@ def check_answer():
     """Check if submitted answer is correct (with tracking & progress meta)"""
     try:
         data = request.json
-        question_id = data.get('question_id')
-        lesson_id = data.get('lesson_id')
         selected_option = data.get('selected_option')
         student_id = data.get('student_id', 'default')
-        if question_id is None or selected_option is None:
+        if (data.get('question_id') is None and data.get('question_key') is None) or selected_option is None:
             return jsonify({'success': False, 'error': 'Missing required fields'}), 400
-        # Because question IDs are reused per lesson (id starts at 1 for each lesson),
-        # we must scope lookup to the provided lesson_id first to avoid mismatching concepts.
-        correct_answer = None
-        explanation = ""
-        question_data = None
-        search_order = []
-        if lesson_id and lesson_id in NCERT_QUESTION_DATABASE:
-            search_order.append((lesson_id, NCERT_QUESTION_DATABASE.get(lesson_id, [])))
-        # Fallback global search if not found in specified lesson (robustness for older clients)
-        search_order.extend([(lid, qs) for lid, qs in NCERT_QUESTION_DATABASE.items() if lid != lesson_id])
-        for lesson, questions in search_order:
-            for q in questions:
-                if q.get('id') == question_id:
-                    correct_answer = q.get('correct')
-                    explanation = q.get('explanation')
-                    question_data = q
-                    break
-            if correct_answer is not None:
-                break
-        if correct_answer is None:
-            return jsonify({'success': False, 'error': 'Question not found'}), 404
-        is_correct = selected_option == correct_answer
-        difficulty = question_data.get('difficulty', 'easy')
-        rewards = DIFFICULTY_LEVELS.get(difficulty, DIFFICULTY_LEVELS['easy'])
-        xp_earned = rewards['xp'] if is_correct else 0
-        tokens_earned = rewards['tokens'] if is_correct else 0
+        lesson_id, question_data, response = grade_answer(data, data.get('lesson_id'))
+        if question_data is None:
+            return jsonify(response), 404
+        is_correct = response['correct']
+        xp_earned, tokens_earned = response['xp_earned'], response['tokens_earned']
         if is_correct:
             update_student_progress(student_id, xp_earned, tokens_earned, lesson_id)
         # Track answer for review/adaptive
         if lesson_id:
             try:
-                update_answer_tracking(student_id, lesson_id, question_id, is_correct)
+                update_answer_tracking(student_id, lesson_id, response['question_id'], is_correct)
             except Exception:
                 pass
-        response = {
-            'success': True,
-            'correct': is_correct,
-            'correct_option': correct_answer,
-            'explanation': explanation,
-            'concept': question_data.get('concept', ''),
-            'xp_earned': xp_earned,
-            'tokens_earned': tokens_earned,
-            'difficulty': difficulty
-        }
-        # Provide optional rich tutoring layer
+        # Optional rich tutoring layer: generated in the background, fetched with the ticket
         if data.get('rich_explanation') or str(request.args.get('rich_explanation','')).lower() == 'true':
-            try:
-                from services.ai_service import AIService
-                ai_service = AIService()
-                rich = ai_service.get_rich_hint(question_data, user_attempt=data.get('user_attempt'), selected_option=selected_option)
-                response['rich_tutoring'] = rich
-                if not is_correct and selected_option is not None:
-                    response['wrong_analysis'] = ai_service.get_wrong_answer_analysis(question_data, selected_option)
-            except Exception:
-                pass
+            ticket = TUTORING.submit(question_data, selected_option=selected_option,
+                                     user_attempt=data.get('user_attempt'), is_correct=is_correct)
+            if ticket is None:
+                response['tutoring_busy'] = True   # backlog full; the grade still stands
+            else:
+                response['tutoring_ticket'] = ticket
+                response['tutoring_url'] = f'/api/duolingo/tutoring/{ticket}'
+                response['tutoring_stream_url'] = f'/api/duolingo/tutoring/{ticket}/stream'
         return jsonify(response)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+MAX_BATCH_ANSWERS = 100
+SYNCED_SUBMISSIONS_KEPT = 20   # submission ids remembered per student to ignore resends
+
+def grade_answer(item, lesson_id=None):
+    """Grade one submitted answer: (lesson_id, question, result dict); question is None if unknown"""
+    question_id = item.get('question_id')
+    question_key = item.get('question_key')
+    lesson_id = item.get('lesson_id') or lesson_id
+    selected_option = item.get('selected_option')
+    if (question_id is None and question_key is None) or selected_option is None:
+        return lesson_id, None, {'success': False, 'error': 'Missing required fields'}
+    # Because question IDs are reused per lesson (id starts at 1 for each lesson),
+    # lookup is scoped to (lesson_id, question_id) or the global question_key, with a
+    # fallback to the first lesson holding the id for older clients.
+    found_lesson, question_data = find_question(question_id, lesson_id, key=question_key)
+    if question_data is None or question_data.get('correct') is None:
+        return lesson_id, None, {'success': False, 'error': 'Question not found'}
+    if question_key is not None:
+        lesson_id = found_lesson
+    correct_answer = question_data.get('correct')
+    is_correct = selected_option == correct_answer
+    difficulty = question_data.get('difficulty', 'easy')
+    rewards = DIFFICULTY_LEVELS.get(difficulty, DIFFICULTY_LEVELS['easy'])
+    return lesson_id, question_data, {
+        'success': True,
+        'question_id': question_data['id'],
+        'question_key': question_data.get('key'),
+        'correct': is_correct,
+        'correct_option': correct_answer,
+        'explanation': question_data.get('explanation'),
+        'concept': question_data.get('concept', ''),
+        'xp_earned': rewards['xp'] if is_correct else 0,
+        'tokens_earned': rewards['tokens'] if is_correct else 0,
+        'difficulty': difficulty
+    }
+
+@duolingo_api.route('/answer/check-batch', methods=['POST'])
+def check_answer_batch():
+    """Grade a whole lesson's answers in one request (offline clients sync a lesson in one round trip).
+    Body: student_id, lesson_id, answers: [{question_id | question_key, selected_option}],
+    complete_lesson (default true: also records the lesson as /progress/update does), time_spent,
+    submission_id (optional; a resend with the same id is graded but not applied again)"""
+    try:
+        data = request.json or {}
+        student_id = data.get('student_id', 'default')
+        lesson_id = data.get('lesson_id')
+        answers = data.get('answers')
+        if not isinstance(answers, list) or not answers:
+            return jsonify({'success': False, 'error': 'answers list required'}), 400
+        if len(answers) > MAX_BATCH_ANSWERS:
+            return jsonify({'success': False, 'error': f'at most {MAX_BATCH_ANSWERS} answers per batch'}), 400
+        submission_id = data.get('submission_id')
+        complete_lesson = bool(lesson_id) and data.get('complete_lesson', True)
+        
+        graded = [grade_answer(item if isinstance(item, dict) else {}, lesson_id) for item in answers]
+        results = [result for _, _, result in graded]
+        checked = [result for result in results if result['success']]
+        xp_earned = sum(result['xp_earned'] for result in checked)
+        tokens_earned = sum(result['tokens_earned'] for result in checked)
+        score = sum(1 for result in checked if result['correct'])
+        
+        # XP, lesson completion and achievements: one transaction on the student's row
+        REWARDS.flush()
+        with PROGRESS.transaction(student_id, new_student_progress) as student_data:
+            synced = student_data.setdefault('synced_submissions', [])
+            duplicate = submission_id is not None and submission_id in synced
+            level_up, new_achievements = False, []
+            if not duplicate:
+                old_level = student_data['level']
+                student_data['xp'] += xp_earned
+                student_data['tokens'] += tokens_earned
+                events = {}
+                if complete_lesson and checked:
+                    events = record_lesson_completion(student_data, lesson_id, score, len(checked),
+                                                      data.get('time_spent', 0))
+                student_data['level'] = calculate_level_from_xp(student_data['xp'])
+                level_up = student_data['level'] > old_level
+                new_achievements = record_achievements(student_data, events, {'xp': student_data['xp']})
+                student_data['last_activity'] = datetime.now().isoformat()
+                if submission_id is not None:
+                    synced.append(submission_id)
+                    del synced[:-SYNCED_SUBMISSIONS_KEPT]
+        
+        # Review/adaptive tracking: one record update and one journal entry for the lesson
+        if not duplicate:
+            update_answer_tracking_batch(student_id, [
+                (answer_lesson, question['id'], result['correct'])
+                for answer_lesson, question, result in graded if question is not None and answer_lesson
+            ])
+        
+        return jsonify({
+            'success': True,
+            'results': results,
+            'checked': len(checked),
+            'score': score,
+            'xp_earned': 0 if duplicate else xp_earned,
+            'tokens_earned': 0 if duplicate else tokens_earned,
+            'level_up': level_up,
+            'new_achievements': new_achievements,
+            'duplicate': duplicate,
+            'progress': student_data
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+TUTORING_STREAM_KEEPALIVE = 15   # seconds between SSE comments while a ticket is pending
+
+@duolingo_api.route('/tutoring/<ticket>', methods=['GET'])
+def tutoring_result(ticket):
+    """Poll rich tutoring for a ticket from /answer/check (status: pending | done | error)"""
+    job = TUTORING.get(ticket)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown or expired ticket'}), 404
+    return jsonify({'success': True, 'ticket': ticket, **job}), (202 if job['status'] == 'pending' else 200)
+
+@duolingo_api.route('/tutoring/<ticket>/stream', methods=['GET'])
+def tutoring_stream(ticket):
+    """Server-sent events: keep-alive comments while pending, then one 'done' or 'error' event"""
+    if TUTORING.get(ticket) is None:
+        return jsonify({'success': False, 'error': 'Unknown or expired ticket'}), 404
+    def events():
+        while True:
+            job = TUTORING.wait(ticket, TUTORING_STREAM_KEEPALIVE)
+            if job is None:
+                yield 'event: error\ndata: {"error": "Unknown or expired ticket"}\n\n'
+                return
+            if job['status'] != 'pending':
+                yield f"event: {job['status']}\ndata: {json.dumps({'ticket': ticket, **job})}\n\n"
+                return
+            yield ': pending\n\n'
+    return Response(events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @duolingo_api.route('/progress/student/<student_id>', methods=['GET'])
 def get_student_progress(student_id):
     """Get detailed student progress"""
     try:
-        progress_data = load_data(PROGRESS_DB)
-        
-        if student_id not in progress_data:
-            # Create new student profile
-            progress_data[student_id] = {
-                'xp': 0,
-                'tokens': 0,
-                'streak': 0,
-                'level': 1,
-                'lessons_completed': {},
-                'subjects_progress': {'science': 0, 'maths': 0},
-                'daily_progress': 0,
-                'last_activity': datetime.now().isoformat(),
-                'achievements': [],
-                'total_questions_answered': 0,
-                'correct_answers': 0
-            }
-            save_data(PROGRESS_DB, progress_data)
-        
-        student_data = progress_data[student_id]
+        # Unknown students get a fresh profile; nothing is written until they earn something
+        student_data = read_student_progress(student_id) or new_student_progress()
         
         # Calculate additional stats
         accuracy = 0
@@ -307,51 +460,25 @@ def update_progress():
         total_questions = data.get('total_questions', 10)
         time_spent = data.get('time_spent', 0)
         
-        progress_data = load_data(PROGRESS_DB)
-        
-        if student_id not in progress_data:
-            progress_data[student_id] = {
-                'xp': 0, 'tokens': 0, 'streak': 0, 'level': 1,
-                'lessons_completed': {}, 'subjects_progress': {'science': 0, 'maths': 0},
-                'daily_progress': 0, 'achievements': [],
-                'total_questions_answered': 0, 'correct_answers': 0
-            }
-        
-        student_data = progress_data[student_id]
-        
-        # Update lesson completion
-        if lesson_id:
-            student_data['lessons_completed'][lesson_id] = {
-                'score': score,
-                'total': total_questions,
-                'accuracy': (score / total_questions) * 100,
-                'completed_at': datetime.now().isoformat(),
-                'time_spent': time_spent
-            }
+        # Level-up below must see XP still waiting in the write-behind buffer
+        REWARDS.flush()
+        # One transaction per student: concurrent updates can't overwrite each other
+        with PROGRESS.transaction(student_id, new_student_progress) as student_data:
+            events = record_lesson_completion(student_data, lesson_id, score, total_questions, time_spent)
         
-        # Update question stats
-        student_data['total_questions_answered'] += total_questions
-        student_data['correct_answers'] += score
+            # Check for level up
+            old_level = student_data['level']
+            new_level = calculate_level_from_xp(student_data['xp'])
         
-        # Update daily progress
-        student_data['daily_progress'] += 1
+            level_up = new_level > old_level
+            if level_up:
+                student_data['level'] = new_level
         
-        # Check for level up
-        old_level = student_data['level']
-        new_level = calculate_level_from_xp(student_data['xp'])
+            # Check for new achievements (only the rules on counters this update moved)
+            new_achievements = record_achievements(student_data, events, {'xp': student_data['xp']})
         
-        level_up = new_level > old_level
-        if level_up:
-            student_data['level'] = new_level
-        
-        # Check for new achievements
-        new_achievements = check_achievements(student_data)
-        student_data['achievements'].extend(new_achievements)
-        
-        # Update last activity
-        student_data['last_activity'] = datetime.now().isoformat()
-        
-        save_data(PROGRESS_DB, progress_data)
+            # Update last activity
+            student_data['last_activity'] = datetime.now().isoformat()
         
         return jsonify({
             'success': True,
@@ -367,31 +494,32 @@ def update_progress():
 def get_leaderboard():
     """Get leaderboard with top students"""
     try:
-        progress_data = load_data(PROGRESS_DB)
-        
-        # Create leaderboard from all students
-        leaderboard = []
-        for student_id, data in progress_data.items():
-            leaderboard.append({
-                'student_id': student_id,
-                'xp': data['xp'],
-                'level': data['level'],
-                'streak': data['streak'],
-                'lessons_completed': len(data['lessons_completed']),
-                'accuracy': calculate_accuracy(data)
-            })
-        
-        # Sort by XP (descending)
-        leaderboard.sort(key=lambda x: x['xp'], reverse=True)
-        
-        # Add rank
-        for i, student in enumerate(leaderboard):
-            student['rank'] = i + 1
+        board = refresh_leaderboard()
+        leaderboard = [{'student_id': student_id, **row, 'rank': rank}
+                       for rank, student_id, row in board.top(20)]  # Top 20
         
         return jsonify({
             'success': True,
-            'leaderboard': leaderboard[:20],  # Top 20
-            'total_students': len(leaderboard)
+            'leaderboard': leaderboard,
+            'total_students': len(board)
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@duolingo_api.route('/leaderboard/rank/<student_id>', methods=['GET'])
+def get_leaderboard_rank(student_id):
+    """Get one student's leaderboard position"""
+    try:
+        board = refresh_leaderboard()
+        found = board.rank(student_id)
+        if found is None:
+            return jsonify({'success': False, 'error': 'Student not ranked yet', 'total_students': len(board)}), 404
+        rank, row = found
+        return jsonify({
+            'success': True,
+            'entry': {'student_id': student_id, **row, 'rank': rank},
+            'total_students': len(board)
         })
         
     except Exception as e:
@@ -401,21 +529,11 @@ def get_leaderboard():
 def get_achievements(student_id):
     """Get student achievements"""
     try:
-        achievements_data = load_data(ACHIEVEMENTS_DB)
-        
-        student_achievements = achievements_data.get(student_id, [])
+        student_data = read_student_progress(student_id) or {}
+        student_achievements = student_data.get('achievements', [])
         
         # Define all possible achievements
-        all_achievements = [
-            {'id': 'first_lesson', 'name': 'First Steps', 'description': 'Complete your first lesson', 'icon': '🌟'},
-            {'id': 'science_explorer', 'name': 'Science Explorer', 'description': 'Complete 5 science lessons', 'icon': '🧪'},
-            {'id': 'math_wizard', 'name': 'Math Wizard', 'description': 'Complete 5 math lessons', 'icon': '📊'},
-            {'id': 'perfect_score', 'name': 'Perfectionist', 'description': 'Get 100% in any lesson', 'icon': '💯'},
-            {'id': 'streak_master', 'name': 'Streak Master', 'description': '7 day learning streak', 'icon': '🔥'},
-            {'id': 'xp_collector', 'name': 'XP Collector', 'description': 'Earn 1000 XP', 'icon': '⭐'},
-            {'id': 'knowledge_seeker', 'name': 'Knowledge Seeker', 'description': 'Answer 100 questions', 'icon': '🎯'},
-            {'id': 'class_topper', 'name': 'Class Topper', 'description': 'Rank #1 on leaderboard', 'icon': '🏆'}
-        ]
+        all_achievements = ACHIEVEMENTS.definitions()
         
         return jsonify({
             'success': True,
@@ -460,23 +578,18 @@ def get_ai_hint():
         options = data.get('options', [])
         concept = data.get('concept', '')
         question_id = data.get('question_id')
+        question_key = data.get('question_key')
         mode = (data.get('mode') or request.args.get('mode') or 'simple').lower()
         user_attempt = data.get('user_attempt')
         selected_option = data.get('selected_option')
 
-        from services.ai_service import AIService
-        ai_service = AIService()
+        from services.ai_service import get_ai_service
+        ai_service = get_ai_service()   # shared gateway: pooled connections, capped concurrency
 
         # Retrieve full question record if question_id provided
         record = None
-        if question_id:
-            for lesson, qlist in NCERT_QUESTION_DATABASE.items():
-                for q in qlist:
-                    if q['id'] == question_id:
-                        record = q
-                        break
-                if record:
-                    break
+        if question_id or question_key:
+            record = find_question(question_id, data.get('lesson_id'), key=question_key)[1]
         if not record:
             record = {
                 'question': question_text,
@@ -517,6 +630,7 @@ def get_user_lesson_questions_api():
     safe = [
         {
             'id': q['id'],
+            'key': q.get('key'),
             'text': q['text'],
             'options': q['options'],
             'concept': q.get('concept'),
@@ -539,6 +653,7 @@ def get_user_subject_class_questions_api():
     safe = [
         {
             'id': q['id'],
+            'key': q.get('key'),
             'text': q['text'],
             'options': q['options'],
             'concept': q.get('concept'),
@@ -548,6 +663,55 @@ def get_user_subject_class_questions_api():
     ]
     return jsonify({'success': True, 'user_id': user_id, 'subject': subject, 'class': class_level, 'questions': safe, 'count': len(safe)})
 
+MAX_CLASSROOM_STUDENTS = 200
+
+@duolingo_api.route('/questions/classroom', methods=['POST'])
+def get_classroom_questions_api():
+    """Unique batches for a whole class: one call instead of one per student.
+    Body: student_ids plus lesson_id, or subject + class (mixed pool if neither)."""
+    data = request.json or {}
+    student_ids = data.get('student_ids') or []
+    if not isinstance(student_ids, list) or not student_ids:
+        return jsonify({'success': False, 'error': 'student_ids list required'}), 400
+    if len(student_ids) > MAX_CLASSROOM_STUDENTS:
+        return jsonify({'success': False, 'error': f'at most {MAX_CLASSROOM_STUDENTS} students per call'}), 400
+    student_ids = [str(sid) for sid in student_ids]
+    lesson_id = data.get('lesson_id')
+    subject = data.get('subject')
+    class_level = (data.get('class') or data.get('class_level') or 6) if subject else None
+    difficulties = data.get('difficulties')  # list or comma string
+    if isinstance(difficulties, str):
+        difficulties = [d.strip() for d in difficulties.split(',') if d.strip()]
+    count = int(data.get('count', 10))
+    batches = get_classroom_questions(student_ids, lesson_id=lesson_id, subject=subject,
+                                      class_level=class_level, count=count, difficulties=difficulties)
+    # Students in one lesson mostly draw the same questions: build each
+    # client-safe dict once and share it between the per-student lists
+    safe = {}
+    def client_question(q):
+        item = safe.get(q['key'])
+        if item is None:
+            item = safe[q['key']] = {
+                'id': q['id'],
+                'key': q.get('key'),
+                'text': q['text'],
+                'options': q['options'],
+                'concept': q.get('concept'),
+                'difficulty': q.get('difficulty'),
+                'reward_preview': DIFFICULTY_LEVELS.get(q.get('difficulty', 'easy'), {})
+            }
+        return item
+    body = {
+        'success': True,
+        'lesson_id': lesson_id,
+        'subject': subject,
+        'class': class_level,
+        'count': len(batches),
+        'students': {sid: [client_question(q) for q in qs] for sid, qs in batches.items()}
+    }
+    # json.dumps rather than jsonify: students stay in request order (jsonify sorts keys)
+    return Response(json.dumps(body), mimetype='application/json')
+
 @duolingo_api.route('/questions/user/mixed', methods=['POST'])
 def get_user_mixed_questions_api():
     data = request.json or {}
@@ -557,6 +721,7 @@ def get_user_mixed_questions_api():
     safe = [
         {
             'id': q['id'],
+            'key': q.get('key'),
             'text': q['text'],
             'options': q['options'],
             'concept': q.get('concept'),
@@ -583,25 +748,41 @@ def reset_user_rotations_api():
 
 # Helper Functions
 def update_student_progress(student_id, xp, tokens, lesson_id):
-    """Update student progress after correct answer"""
-    progress_data = load_data(PROGRESS_DB)
-    
-    if student_id not in progress_data:
-        progress_data[student_id] = {
-            'xp': 0, 'tokens': 0, 'streak': 0, 'level': 1,
-            'lessons_completed': {}, 'subjects_progress': {'science': 0, 'maths': 0},
-            'daily_progress': 0, 'achievements': [],
-            'total_questions_answered': 0, 'correct_answers': 0
-        }
-    
-    student_data = progress_data[student_id]
-    student_data['xp'] += xp
-    student_data['tokens'] += tokens
-    
-    # Update level based on XP
-    student_data['level'] = calculate_level_from_xp(student_data['xp'])
-    
-    save_data(PROGRESS_DB, progress_data)
+    """Update student progress after correct answer (buffered; level follows XP on flush)"""
+    REWARDS.add(student_id, xp=xp, tokens=tokens)
+
+def read_student_progress(student_id):
+    """Stored progress plus rewards not flushed yet, or None for an unknown student"""
+    student_data, pending = REWARDS.read(student_id, lambda: PROGRESS.get(student_id))
+    if pending:
+        student_data = student_data or new_student_progress()
+        student_data['xp'] += pending.get('xp', 0)
+        student_data['tokens'] += pending.get('tokens', 0)
+        student_data['level'] = calculate_level_from_xp(student_data['xp'])
+    return student_data
+
+def leaderboard_row(student_data):
+    """Summary shown for a student on the leaderboard"""
+    return {
+        'xp': student_data['xp'],
+        'level': student_data['level'],
+        'streak': student_data['streak'],
+        'lessons_completed': len(student_data['lessons_completed']),
+        'accuracy': calculate_accuracy(student_data)
+    }
+
+def refresh_leaderboard():
+    """Bring LEADERBOARD up to date with the progress store and return it"""
+    global _leaderboard_rev
+    with _LEADERBOARD_SYNC:
+        rev, changed = PROGRESS.changes_since(_leaderboard_rev)
+        if _leaderboard_rev < 0:
+            LEADERBOARD.load((sid, data['xp'], leaderboard_row(data)) for sid, data in changed)
+        else:
+            for student_id, student_data in changed:
+                LEADERBOARD.update(student_id, student_data['xp'], leaderboard_row(student_data))
+        _leaderboard_rev = rev
+    return LEADERBOARD
 
 def calculate_level_from_xp(xp):
     """Calculate level based on XP (100 XP per level)"""
@@ -623,40 +804,71 @@ def calculate_accuracy(student_data):
     correct = student_data.get('correct_answers', 0)
     return round((correct / total * 100), 1) if total > 0 else 0
 
-def check_achievements(student_data):
-    """Check for new achievements"""
-    new_achievements = []
-    current_achievements = student_data.get('achievements', [])
-    
-    # First lesson achievement
-    if len(student_data['lessons_completed']) >= 1 and 'first_lesson' not in current_achievements:
-        new_achievements.append('first_lesson')
-    
-    # Science explorer
-    science_lessons = sum(1 for lesson in student_data['lessons_completed'] if 'science' in lesson)
-    if science_lessons >= 5 and 'science_explorer' not in current_achievements:
-        new_achievements.append('science_explorer')
-    
-    # Math wizard  
-    math_lessons = sum(1 for lesson in student_data['lessons_completed'] if 'math' in lesson)
-    if math_lessons >= 5 and 'math_wizard' not in current_achievements:
-        new_achievements.append('math_wizard')
-    
-    # Perfect score
-    for lesson_data in student_data['lessons_completed'].values():
-        if lesson_data['accuracy'] >= 100 and 'perfect_score' not in current_achievements:
-            new_achievements.append('perfect_score')
-            break
-    
-    # XP milestones
-    if student_data['xp'] >= 1000 and 'xp_collector' not in current_achievements:
-        new_achievements.append('xp_collector')
+def record_lesson_completion(student_data, lesson_id, score, total_questions, time_spent):
+    """Apply a finished lesson to student_data; returns the achievement counter increments"""
+    events = {'questions_answered': total_questions}
+    # Update lesson completion
+    if lesson_id:
+        if lesson_id not in student_data['lessons_completed']:
+            events['lessons_completed'] = 1
+            subject = lesson_subject(lesson_id)
+            if subject:
+                events[f'{subject}_lessons'] = 1
+        if score >= total_questions:
+            events['perfect_lessons'] = 1
+        student_data['lessons_completed'][lesson_id] = {
+            'score': score,
+            'total': total_questions,
+            'accuracy': (score / total_questions) * 100,
+            'completed_at': datetime.now().isoformat(),
+            'time_spent': time_spent
+        }
     
-    # Question milestone
-    if student_data['total_questions_answered'] >= 100 and 'knowledge_seeker' not in current_achievements:
-        new_achievements.append('knowledge_seeker')
+    # Update question stats
+    student_data['total_questions_answered'] += total_questions
+    student_data['correct_answers'] += score
     
-    return new_achievements
+    # Update daily progress
+    student_data['daily_progress'] += 1
+    return events
+
+def lesson_subject(lesson_id):
+    """'science' or 'maths' for a lesson id (None if unknown)"""
+    if lesson_id in SCIENCE_QUESTIONS:
+        return 'science'
+    if lesson_id in MATHEMATICS_QUESTIONS:
+        return 'maths'
+    if 'science' in lesson_id:
+        return 'science'
+    if 'math' in lesson_id:
+        return 'maths'
+    return None
+
+def _progress_counters(student_data):
+    """Achievement counters implied by a student's progress record"""
+    lessons = student_data['lessons_completed']
+    subjects = [lesson_subject(lesson_id) for lesson_id in lessons]
+    return {
+        'lessons_completed': len(lessons),
+        'science_lessons': subjects.count('science'),
+        'maths_lessons': subjects.count('maths'),
+        'perfect_lessons': sum(1 for lesson in lessons.values() if lesson['accuracy'] >= 100),
+        'streak': student_data['streak'],
+        'xp': student_data['xp'],
+        'questions_answered': student_data['total_questions_answered']
+    }
+
+def record_achievements(student_data, increments=None, values=None):
+    """Apply a progress event (counter increments / new values) that has already
+    been applied to student_data; returns newly earned achievement ids"""
+    earned = student_data.setdefault('achievements', [])
+    counters = student_data.get('achievement_counters')
+    if counters is None:
+        # First event for this student: start from the progress so far (which
+        # already includes this event), awarding anything it qualifies for
+        counters = student_data['achievement_counters'] = {}
+        return ACHIEVEMENTS.record(counters, earned, values=_progress_counters(student_data))
+    return ACHIEVEMENTS.record(counters, earned, increments, values)
 
 def generate_fallback_questions(lesson_id, count):
     """Generate basic questions when database is empty"""
@@ -731,7 +943,7 @@ def get_user_lesson_filtered():
         return jsonify({'success': False, 'error': 'lesson_id required'}), 400
     qs, status_obj = fetch_user_lesson_questions(user_id, lesson_id, count, difficulties)
     safe = [{
-        'id': q['id'], 'text': q['text'], 'options': q['options'],
+        'id': q['id'], 'key': q.get('key'), 'text': q['text'], 'options': q['options'],
         'concept': q.get('concept'), 'difficulty': q.get('difficulty'),
         'reward_preview': DIFFICULTY_LEVELS.get(q.get('difficulty','easy'), {})
     } for q in qs]
@@ -751,7 +963,7 @@ def get_user_subject_filtered():
         return jsonify({'success': False, 'error': 'subject required'}), 400
     qs, status_obj = fetch_user_subject_class_questions(user_id, subject, class_level, count, difficulties)
     safe = [{
-        'id': q['id'], 'text': q['text'], 'options': q['options'],
+        'id': q['id'], 'key': q.get('key'), 'text': q['text'], 'options': q['options'],
         'concept': q.get('concept'), 'difficulty': q.get('difficulty'),
         'reward_preview': DIFFICULTY_LEVELS.get(q.get('difficulty','easy'), {})
     } for q in qs]
@@ -767,12 +979,22 @@ def get_user_mixed_filtered():
     count = int(data.get('count', 10))
     qs, status_obj = fetch_user_mixed_questions(user_id, count, difficulties)
     safe = [{
-        'id': q['id'], 'text': q['text'], 'options': q['options'],
+        'id': q['id'], 'key': q.get('key'), 'text': q['text'], 'options': q['options'],
         'concept': q.get('concept'), 'difficulty': q.get('difficulty'),
         'reward_preview': DIFFICULTY_LEVELS.get(q.get('difficulty','easy'), {})
     } for q in qs]
     return jsonify({'success': True, 'questions': safe, 'status': status_obj})
 
+@duolingo_api.route('/review/due', methods=['GET'])
+def review_due():
+    """Next spaced-repetition cards due for a student (most overdue first)."""
+    student_id = request.args.get('student_id')
+    if not student_id:
+        return jsonify({'success': False, 'error': 'student_id required'}), 400
+    count = int(request.args.get('count', 10))
+    items, next_due = get_due_reviews(student_id, count)
+    return jsonify({'success': True, 'count': len(items), 'items': items, 'next_due_at': next_due})
+
 @duolingo_api.route('/review/<student_id>', methods=['GET'])
 def review_all(student_id):
     wrong_only = request.args.get('wrong_only', 'false').lower() == 'true'
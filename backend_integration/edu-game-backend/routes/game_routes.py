@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from services.game_mechanics import GameMechanics
+from services.achievement_engine import AchievementEngine
 from utils.data_loader import DataLoader
 import json
 import uuid
@@ -11,6 +12,23 @@ data_loader = DataLoader()
 # In-memory game sessions (in production, use Redis or database)
 game_sessions = {}
 
+GAME_ACHIEVEMENTS = AchievementEngine()
+# Score-based achievements
+GAME_ACHIEVEMENTS.rule('getting_started', 'score', 100, group='score',
+                       name='Getting Started', description='Scored 100+ points', icon='🥉', rarity='bronze')
+GAME_ACHIEVEMENTS.rule('good_player', 'score', 500, group='score',
+                       name='Good Player', description='Scored 500+ points', icon='🥈', rarity='silver')
+GAME_ACHIEVEMENTS.rule('high_scorer', 'score', 1000, group='score',
+                       name='High Scorer', description='Scored 1000+ points', icon='🏆', rarity='gold')
+# Streak-based achievements
+GAME_ACHIEVEMENTS.rule('on_fire', 'correct_streak', 5, group='streak',
+                       name='On Fire', description='5+ correct answers in a row', icon='⚡', rarity='epic')
+GAME_ACHIEVEMENTS.rule('unstoppable', 'correct_streak', 10, group='streak',
+                       name='Unstoppable', description='10+ correct answers in a row', icon='🔥', rarity='legendary')
+# Questions-based achievements
+GAME_ACHIEVEMENTS.rule('knowledge_seeker', 'questions_answered', 50,
+                       name='Knowledge Seeker', description='Answered 50+ questions', icon='📚', rarity='rare')
+
 @game_bp.route('/start', methods=['POST'])
 def start_game():
     """
@@ -250,59 +268,13 @@ def get_achievements(session_id):
         
         session = game_sessions[session_id]['session']
         
-        # Calculate achievements
-        achievements = []
-        
-        # Score-based achievements
         score = session.get('score', 0)
-        if score >= 1000:
-            achievements.append({
-                'name': 'High Scorer',
-                'description': 'Scored 1000+ points',
-                'icon': '🏆',
-                'rarity': 'gold'
-            })
-        elif score >= 500:
-            achievements.append({
-                'name': 'Good Player',
-                'description': 'Scored 500+ points', 
-                'icon': '🥈',
-                'rarity': 'silver'
-            })
-        elif score >= 100:
-            achievements.append({
-                'name': 'Getting Started',
-                'description': 'Scored 100+ points',
-                'icon': '🥉', 
-                'rarity': 'bronze'
-            })
-        
-        # Streak-based achievements
         streak = session.get('correct_streak', 0)
-        if streak >= 10:
-            achievements.append({
-                'name': 'Unstoppable',
-                'description': '10+ correct answers in a row',
-                'icon': '🔥',
-                'rarity': 'legendary'
-            })
-        elif streak >= 5:
-            achievements.append({
-                'name': 'On Fire',
-                'description': '5+ correct answers in a row',
-                'icon': '⚡',
-                'rarity': 'epic'
-            })
-        
-        # Questions-based achievements
         questions = session.get('questions_answered', 0)
-        if questions >= 50:
-            achievements.append({
-                'name': 'Knowledge Seeker',
-                'description': 'Answered 50+ questions',
-                'icon': '📚',
-                'rarity': 'rare'
-            })
+        
+        # Only the best score and streak tier is shown
+        achievements = GAME_ACHIEVEMENTS.evaluate(
+            {'score': score, 'correct_streak': streak, 'questions_answered': questions}, highest_only=True)
         
         return jsonify({
             "success": True,
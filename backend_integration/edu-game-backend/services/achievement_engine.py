@@ -0,0 +1,106 @@
+"""
+Shared achievement engine.
+
+Achievements are threshold rules on named counters ("xp >= 1000",
+"science_lessons >= 5"). Rules are indexed by counter and sorted by
+threshold, so an event only looks at the rules of the counters it changed:
+when a counter moves from old to new, exactly the rules with
+old < threshold <= new fire (found by bisection), whatever the total number
+of definitions.
+
+    ACHIEVEMENTS = AchievementEngine()
+    ACHIEVEMENTS.rule('xp_collector', 'xp', 1000, name='XP Collector', icon='⭐')
+    ACHIEVEMENTS.record(counters, earned, values={'xp': 1040})   # -> ['xp_collector']
+
+record() is for stored progress (counters only grow). evaluate() answers
+"what does this stats snapshot qualify for" for callers without stored
+counters (quiz and game sessions).
+"""
+from bisect import bisect_right
+
+
+class _Rule:
+    __slots__ = ('id', 'counter', 'threshold', 'group', 'info', 'order')
+
+    def __init__(self, achievement_id, counter, threshold, group, info, order):
+        self.id = achievement_id
+        self.counter = counter
+        self.threshold = threshold
+        self.group = group
+        self.info = info
+        self.order = order
+
+
+class AchievementEngine:
+    def __init__(self):
+        self._definitions = {}   # achievement_id -> info, in registration order
+        self._by_counter = {}    # counter -> ([thresholds], [rules]) sorted by threshold
+        self._count = 0
+
+    def define(self, achievement_id, **info):
+        """List an achievement that is awarded outside the engine (no rule)."""
+        self._definitions[achievement_id] = info
+        return info
+
+    def rule(self, achievement_id, counter, threshold, group=None, **info):
+        """Award achievement_id once counter reaches threshold.
+
+        group: rules sharing a group are tiers; evaluate(highest_only=True)
+        keeps only the highest tier reached in each group."""
+        self.define(achievement_id, **info)
+        rule = _Rule(achievement_id, counter, threshold, group, info, self._count)
+        self._count += 1
+        thresholds, rules = self._by_counter.setdefault(counter, ([], []))
+        at = bisect_right(thresholds, threshold)
+        thresholds.insert(at, threshold)
+        rules.insert(at, rule)
+        return rule
+
+    def definitions(self):
+        """[{'id': ..., **info}] for every known achievement, in registration order."""
+        return [{'id': achievement_id, **info} for achievement_id, info in self._definitions.items()]
+
+    def _crossed(self, counter, old, new):
+        entry = self._by_counter.get(counter)
+        if entry is None or new <= old:
+            return []
+        thresholds, rules = entry
+        return rules[bisect_right(thresholds, old):bisect_right(thresholds, new)]
+
+    def record(self, counters, earned, increments=None, values=None):
+        """Apply one event to a student's counters and award what it unlocks.
+
+        counters: the student's stored {counter: value} (updated in place)
+        earned: list of achievement ids already awarded (appended in place)
+        increments: {counter: amount to add}; values: {counter: new value}
+        Returns the newly awarded ids. Only rules on the changed counters,
+        and only thresholds between the old and new value, are examined."""
+        changes = []
+        for counter, amount in (increments or {}).items():
+            changes.append((counter, counters.get(counter, 0) + amount))
+        for counter, value in (values or {}).items():
+            changes.append((counter, value))
+        awarded = []
+        for counter, new in changes:
+            old = counters.get(counter, 0)
+            counters[counter] = new
+            for rule in self._crossed(counter, old, new):
+                if rule.id not in earned:
+                    earned.append(rule.id)
+                    awarded.append(rule.id)
+        return awarded
+
+    def evaluate(self, stats, highest_only=False):
+        """Info dicts of every rule a stats snapshot ({counter: value}) satisfies,
+        in registration order."""
+        matched = []
+        for counter, value in stats.items():
+            matched.extend(self._crossed(counter, float('-inf'), value or 0))
+        if highest_only:
+            best = {}
+            for rule in matched:
+                key = rule.group if rule.group is not None else ('', rule.id)
+                if key not in best or rule.threshold > best[key].threshold:
+                    best[key] = rule
+            matched = list(best.values())
+        return [dict(rule.info) for rule in sorted(matched, key=lambda r: r.order)]
@@ -0,0 +1,212 @@
+"""
+Shared HTTP client for the LLM provider (Groq / OpenAI chat completions).
+
+One AIGateway serves the whole process:
+- a keep-alive connection pool (requests.Session), so only the first call
+  on each connection pays for the TCP/TLS handshake;
+- a semaphore capping concurrent upstream calls; callers that cannot get a
+  slot before their deadline fail fast instead of piling up threads;
+- a per-call deadline covering queueing, every attempt and the backoff
+  sleeps between them;
+- bounded retries on connection errors, timeouts, 429 and 5xx, with
+  exponential backoff and full jitter (Retry-After is honoured when it fits
+  in the deadline);
+- single-flight coalescing: concurrent calls with the same normalised
+  request (model, parameters, messages with whitespace collapsed) share one
+  upstream call, so a class asking for the same hint at once costs one call.
+
+chat() never raises: it returns {'success': True, 'content': str} or
+{'success': False, 'error': str}, and callers fall back to local content.
+stream_chat() relays the provider's token stream (stream=true) as text
+deltas for server-sent-event endpoints.
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.single_flight import SingleFlight
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class AIGatewayError(Exception):
+    """A streamed call failed (chat() reports failures in its result instead)."""
+
+
+class AIGateway:
+    def __init__(self, url, api_key, model, max_concurrency=8, pool_size=16,
+                 connect_timeout=3.05, deadline=20.0, retries=2, backoff=0.25):
+        """
+        url: chat completions endpoint
+        max_concurrency: upstream calls in flight at once
+        pool_size: keep-alive connections kept open
+        connect_timeout: seconds to open a connection
+        deadline: default seconds a whole call may take, retries included
+        retries: extra attempts after a retryable failure
+        backoff: base seconds of the jittered exponential backoff
+        """
+        self.url = url
+        self.api_key = api_key
+        self.model = model
+        self.connect_timeout = connect_timeout
+        self.deadline = deadline
+        self.retries = retries
+        self.backoff = backoff
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._flights = SingleFlight()
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+        self._session.headers.update({
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json',
+        })
+
+    def chat(self, messages, max_tokens=500, temperature=0.7, json_mode=False, deadline=None):
+        """One chat completion; returns {'success', 'content'} or {'success', 'error'}."""
+        if not self.api_key:
+            return {'success': False, 'error': 'AI API key not configured'}
+        payload = {
+            'model': self.model,
+            'messages': messages,
+            'max_tokens': max_tokens,
+            'temperature': temperature,
+        }
+        if json_mode:
+            payload['response_format'] = {'type': 'json_object'}
+        until = time.monotonic() + (deadline or self.deadline)
+        try:
+            result, _ = self._flights.do(self._flight_key(payload), lambda: self._call(payload, until),
+                                         timeout=max(until - time.monotonic(), 0))
+        except TimeoutError:
+            return {'success': False, 'error': 'AI deadline exceeded'}
+        return dict(result)
+
+    @staticmethod
+    def _flight_key(payload):
+        normalised = dict(payload, messages=[
+            dict(message, content=' '.join(str(message.get('content', '')).split()))
+            for message in payload['messages']
+        ])
+        blob = json.dumps(normalised, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+    def _call(self, payload, until):
+        if not self._slots.acquire(timeout=max(until - time.monotonic(), 0)):
+            return {'success': False, 'error': 'AI gateway busy'}
+        try:
+            return self._post(payload, until)
+        finally:
+            self._slots.release()
+
+    def _post(self, payload, until):
+        try:
+            response = self._request(payload, until)
+            content = response.json()['choices'][0]['message']['content']
+        except AIGatewayError as e:
+            return {'success': False, 'error': str(e)}
+        except (ValueError, KeyError, IndexError, TypeError):
+            return {'success': False, 'error': 'Malformed AI response'}
+        return {'success': True, 'content': content}
+
+    def _request(self, payload, until, stream=False):
+        """POST with retries until a 200 arrives; raises AIGatewayError otherwise."""
+        error = 'AI request failed'
+        for attempt in range(self.retries + 1):
+            remaining = until - time.monotonic()
+            if remaining <= 0:
+                raise AIGatewayError('AI deadline exceeded')
+            retry_after = None
+            try:
+                response = self._session.post(
+                    self.url, json=payload, stream=stream,
+                    timeout=(min(self.connect_timeout, remaining), remaining))
+                if response.status_code == 200:
+                    return response
+                response.close()
+                error = f'AI API returned {response.status_code}'
+                if response.status_code not in RETRY_STATUSES:
+                    raise AIGatewayError(error)
+                retry_after = response.headers.get('Retry-After')
+            except requests.RequestException as e:
+                error = f'AI request failed: {e.__class__.__name__}'
+            if attempt == self.retries:
+                break
+            delay = random.uniform(0, self.backoff * 2 ** attempt)
+            try:
+                delay = max(delay, float(retry_after))
+            except (TypeError, ValueError):
+                pass
+            if time.monotonic() + delay >= until:
+                break
+            time.sleep(delay)
+        raise AIGatewayError(error)
+
+    def stream_chat(self, messages, max_tokens=500, temperature=0.7, deadline=None):
+        """Yield the completion's text deltas as the provider streams them.
+
+        Holds a concurrency slot until the stream ends or the consumer closes
+        the generator. Retries only happen before the first delta, and
+        streams are not coalesced. Raises AIGatewayError on failure."""
+        if not self.api_key:
+            raise AIGatewayError('AI API key not configured')
+        payload = {
+            'model': self.model,
+            'messages': messages,
+            'max_tokens': max_tokens,
+            'temperature': temperature,
+            'stream': True,
+        }
+        until = time.monotonic() + (deadline or self.deadline)
+        if not self._slots.acquire(timeout=max(until - time.monotonic(), 0)):
+            raise AIGatewayError('AI gateway busy')
+        try:
+            with self._request(payload, until, stream=True) as response:
+                for line in response.iter_lines():
+                    if time.monotonic() > until:
+                        raise AIGatewayError('AI deadline exceeded')
+                    if not line.startswith(b'data:'):
+                        continue   # blank separators, comments, event names
+                    data = line[5:].strip()
+                    if data == b'[DONE]':
+                        return
+                    try:
+                        delta = json.loads(data)['choices'][0].get('delta', {}).get('content')
+                    except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+                        raise AIGatewayError('Malformed AI stream')
+                    if delta:
+                        yield delta
+        except requests.RequestException as e:
+            raise AIGatewayError(f'AI stream failed: {e.__class__.__name__}')
+        finally:
+            self._slots.release()
+
+    def close(self):
+        self._session.close()
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    """The process-wide gateway, built from Config on first use."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                from config import Config
+                _gateway = AIGateway(
+                    Config.GROQ_API_URL, Config.GROQ_API_KEY, Config.GROQ_MODEL,
+                    max_concurrency=Config.AI_MAX_CONCURRENCY,
+                    pool_size=Config.AI_POOL_SIZE,
+                    deadline=Config.AI_DEADLINE,
+                    retries=Config.AI_RETRIES,
+                )
+    return _gateway
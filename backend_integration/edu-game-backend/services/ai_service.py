@@ -1,14 +1,160 @@
-import requests
 import json
+import threading
 from config import Config
 from typing import List, Dict, Any, Optional
+from services.ai_gateway import AIGatewayError, get_gateway
+from utils.response_cache import ResponseCache
 
 class AIService:
-    def __init__(self):
-        self.groq_api_key = Config.GROQ_API_KEY
-        self.groq_url = Config.GROQ_API_URL
+    def __init__(self, gateway=None, cache=None):
+        self.gateway = gateway or get_gateway()
+        self.cache = cache if cache is not None else get_response_cache()
+        self.groq_api_key = self.gateway.api_key
+        self.groq_url = self.gateway.url
         self.ncert_context = Config.NCERT_CONTEXT
 
+    # ---------------- Provider Calls -----------------
+    def _call_ai_api(self, prompt: str, expect_json: bool = False, max_tokens: int = 500, temperature: float = 0.7) -> Dict[str, Any]:
+        """Send one prompt through the shared gateway.
+
+        Returns {'success': True, 'content': text (or dict when expect_json)} or
+        {'success': False, 'error': ...} (no 'content', so callers' defaults apply).
+        """
+        messages = [
+            {'role': 'system', 'content': self.ncert_context},
+            {'role': 'user', 'content': prompt},
+        ]
+        result = self.gateway.chat(messages, max_tokens=max_tokens, temperature=temperature, json_mode=expect_json)
+        if not result.get('success') or not expect_json:
+            return result
+        content = result['content'].strip()
+        if content.startswith('```'):
+            content = content.strip('`')
+            content = content[content.find('{'):] if '{' in content else content
+        try:
+            return {'success': True, 'content': json.loads(content)}
+        except ValueError:
+            return {'success': False, 'error': 'AI response was not valid JSON'}
+
+    def _text_or_fallback(self, prompt: str, fallback: str, max_tokens: int = 200) -> Dict[str, Any]:
+        result = self._call_ai_api(prompt, max_tokens=max_tokens)
+        if result.get('success') and result.get('content'):
+            return {'success': True, 'content': result['content'].strip(), 'source': 'ai'}
+        return {'success': False, 'content': fallback, 'source': 'fallback', 'error': result.get('error')}
+
+    def tutoring_key(self, kind: str, question_data: Dict[str, Any], selected_option: Optional[int] = None, user_attempt: Optional[str] = None) -> str:
+        """Response-cache key of get_rich_hint ('rich_hint') or get_wrong_answer_analysis
+        ('wrong_analysis') for these inputs under the current model."""
+        inputs = {k: question_data.get(k) for k in ('question', 'text', 'options', 'correct', 'explanation', 'concept')}
+        inputs.update(user_attempt=user_attempt, selected_option=selected_option)
+        return self.cache.key(kind, self.gateway.model, inputs)
+
+    def _cached(self, key: str, generate) -> Dict[str, Any]:
+        """Serve key from the response cache, generating on a miss.
+        Only AI-sourced results are stored; fallbacks are cheap and should not
+        hide a later successful call."""
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        result = generate()
+        if result.get('source') == 'ai':
+            self.cache.put(key, result)
+        return result
+
+    # ---------------- Short Free-Text Helpers -----------------
+    def get_hint(self, question_data: Dict[str, Any], user_attempt: Optional[str] = None) -> Dict[str, Any]:
+        """Free-text hint (<=60 words) that does not reveal the answer."""
+        return self._text_or_fallback(*self._hint_request(question_data, user_attempt))
+
+    def _hint_request(self, question_data: Dict[str, Any], user_attempt: Optional[str]):
+        question = question_data.get('question') or question_data.get('text') or ''
+        concept = question_data.get('concept') or question_data.get('chapter') or 'this concept'
+        prompt = f"""
+Give a student a hint for this question without revealing the answer (<=60 words, encouraging).
+Question: {question}
+Options: {question_data.get('options', [])}
+Concept: {concept}
+Student Attempt: {user_attempt or ''}
+"""
+        return prompt, self._fallback_hint_sentence(str(concept), question), 200
+
+    def get_mnemonic(self, question_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Short memory aid for the question's concept."""
+        concept = question_data.get('concept') or 'Concept'
+        prompt = f"""
+Create one catchy mnemonic (<=25 words) to remember this concept.
+Concept: {concept}
+Question: {question_data.get('question') or question_data.get('text') or ''}
+"""
+        return self._text_or_fallback(prompt, self._mnemonic_from_options(question_data.get('options', []), concept), max_tokens=100)
+
+    def get_step_by_step_solution(self, question_data: Dict[str, Any]) -> Dict[str, Any]:
+        """3-4 short solving steps that stop short of the final answer."""
+        return self._text_or_fallback(*self._steps_request(question_data))
+
+    def _steps_request(self, question_data: Dict[str, Any]):
+        concept = question_data.get('concept') or 'Concept'
+        question = question_data.get('question') or question_data.get('text') or ''
+        prompt = f"""
+Break this question into 3-4 short solving steps (<=20 words each), without stating the final answer.
+Question: {question}
+Options: {question_data.get('options', [])}
+Concept: {concept}
+"""
+        return prompt, '\n'.join(self._fallback_steps(concept, question, question_data.get('options', []))), 250
+
+    def get_gamified_encouragement(self, question_data: Dict[str, Any], is_correct: bool) -> Dict[str, Any]:
+        """One game-themed line of praise or encouragement."""
+        return self._text_or_fallback(*self._encouragement_request(question_data, is_correct))
+
+    def _encouragement_request(self, question_data: Dict[str, Any], is_correct: bool):
+        concept = question_data.get('concept') or 'this concept'
+        outcome = 'answered correctly' if is_correct else 'answered incorrectly'
+        prompt = f"""
+The student {outcome} a question on {concept}. Reply with one game-themed, encouraging line (<=30 words).
+"""
+        fallback = f"Level up! You've mastered {concept}!" if is_correct else self._encouragement_line()
+        return prompt, fallback, 80
+
+    # ---------------- Streaming (server-sent events) -----------------
+    def stream_hint(self, question_data: Dict[str, Any], user_attempt: Optional[str] = None):
+        """get_hint as a stream of (event, data) frames; see _stream_text."""
+        return self._stream_text(question_data, *self._hint_request(question_data, user_attempt), user_attempt=user_attempt)
+
+    def stream_step_by_step_solution(self, question_data: Dict[str, Any]):
+        """get_step_by_step_solution as a stream of (event, data) frames."""
+        return self._stream_text(question_data, *self._steps_request(question_data))
+
+    def stream_gamified_encouragement(self, question_data: Dict[str, Any], is_correct: bool):
+        """get_gamified_encouragement as a stream of (event, data) frames."""
+        return self._stream_text(question_data, *self._encouragement_request(question_data, is_correct))
+
+    def _stream_text(self, question_data: Dict[str, Any], prompt: str, fallback: str, max_tokens: int, user_attempt: Optional[str] = None):
+        """Yield ('fallback', local tutoring) at once, then ('token', {'text'}) per provider
+        delta, then ('done', {'text', 'source'}) or ('error', {'error', 'text'})."""
+        options = question_data.get('options', [])
+        local = self._fallback_rich_hint(question_data.get('question') or question_data.get('text') or '', options,
+                                         question_data.get('correct'), question_data.get('concept') or 'Concept',
+                                         question_data.get('explanation') or '', user_attempt, None)
+        yield 'fallback', {'text': fallback, **local}
+        if not self.groq_api_key:
+            yield 'done', {'text': fallback, 'source': 'fallback'}
+            return
+        messages = [
+            {'role': 'system', 'content': self.ncert_context},
+            {'role': 'user', 'content': prompt},
+        ]
+        parts = []
+        try:
+            for delta in self.gateway.stream_chat(messages, max_tokens=max_tokens):
+                parts.append(delta)
+                yield 'token', {'text': delta}
+        except AIGatewayError as e:
+            yield 'error', {'error': str(e), 'text': ''.join(parts) or fallback}
+            return
+        text = ''.join(parts).strip()
+        yield 'done', {'text': text or fallback, 'source': 'ai' if text else 'fallback'}
+
     # ---------------- Rich Hint & Explanation Layer -----------------
     def get_rich_hint(self, question_data: Dict[str, Any], user_attempt: Optional[str] = None, selected_option: Optional[int] = None) -> Dict[str, Any]:
         """Return a structured multi-layer tutoring hint.
@@ -16,7 +162,12 @@ class AIService:
         question_data expected keys: text/question, options, correct, explanation, concept, difficulty
         Returns dict with: hint, concept_recap, misconception, steps (list), mnemonic, encouragement,
         wrong_option_explanation (if attempt wrong), answer_explanation, source ('ai'|'fallback').
+        Repeat requests for the same inputs are served from the response cache.
         """
+        return self._cached(self.tutoring_key('rich_hint', question_data, selected_option, user_attempt),
+                            lambda: self._generate_rich_hint(question_data, user_attempt, selected_option))
+
+    def _generate_rich_hint(self, question_data: Dict[str, Any], user_attempt: Optional[str], selected_option: Optional[int]) -> Dict[str, Any]:
         base_question = question_data.get('question') or question_data.get('text') or ''
         options = question_data.get('options', [])
         correct_index = question_data.get('correct')
@@ -100,7 +251,11 @@ Rules:
         return self._fallback_rich_hint(base_question, options, correct_index, concept, explanation, user_attempt, selected_option)
 
     def get_wrong_answer_analysis(self, question_data: Dict[str, Any], selected_option: int) -> Dict[str, Any]:
-        """Return targeted explanation for a wrong selected option."""
+        """Return targeted explanation for a wrong selected option (cached like get_rich_hint)."""
+        return self._cached(self.tutoring_key('wrong_analysis', question_data, selected_option),
+                            lambda: self._generate_wrong_answer_analysis(question_data, selected_option))
+
+    def _generate_wrong_answer_analysis(self, question_data: Dict[str, Any], selected_option: int) -> Dict[str, Any]:
         options = question_data.get('options', [])
         correct_index = question_data.get('correct')
         concept = question_data.get('concept') or 'Concept'
@@ -214,12 +369,38 @@ Keep each value <=60 words and do not restate entire question.
             return text.strip()
         return ' '.join(words[:max_words]).rstrip(',.;:') + '…'
 
+_shared_service = None
+_shared_lock = threading.RLock()   # get_ai_service() builds the cache while holding it
+_response_cache = None
+
+def get_response_cache():
+    """Process-wide cache of generated tutoring content, built from Config on first use
+    (with the precomputed tutoring artifact loaded in front of it)."""
+    global _response_cache
+    if _response_cache is None:
+        with _shared_lock:
+            if _response_cache is None:
+                cache = ResponseCache(Config.HINT_CACHE_DB, max_entries=Config.HINT_CACHE_SIZE,
+                                      ttl=Config.HINT_CACHE_TTL, version=Config.HINT_CACHE_VERSION)
+                cache.load_artifact(Config.TUTORING_ARTIFACT)
+                _response_cache = cache
+    return _response_cache
+
+def get_ai_service():
+    """Process-wide AIService on the shared gateway (for routes and the helpers below)."""
+    global _shared_service
+    if _shared_service is None:
+        with _shared_lock:
+            if _shared_service is None:
+                _shared_service = AIService()
+    return _shared_service
+
 # Global function for easy access
 def get_ai_hint(question, options):
     """
     Simple function to get AI hint for a question with options
     """
-    ai_service = AIService()
+    ai_service = get_ai_service()
     
     # Create simplified question data for hint generation
     question_data = {
@@ -252,7 +433,7 @@ def get_step_by_step_guidance(question, subject, student_level="beginner"):
     """
     Get detailed step-by-step guidance for solving a problem
     """
-    ai_service = AIService()
+    ai_service = get_ai_service()
     
     prompt = f"""
     As a friendly AI tutor, provide step-by-step guidance for this {subject} question:
@@ -283,7 +464,7 @@ def get_memory_technique(concept, subject, grade_level):
     """
     Generate fun memory techniques and mnemonics for learning concepts
     """
-    ai_service = AIService()
+    ai_service = get_ai_service()
     
     prompt = f"""
     Create a fun, memorable learning technique for this concept:
@@ -319,7 +500,7 @@ def get_gamified_explanation(question, correct_answer, subject):
     """
     Explain the answer in a fun, game-themed way
     """
-    ai_service = AIService()
+    ai_service = get_ai_service()
     
     prompt = f"""
     Explain this {subject} answer like you're a game character giving a quest reward explanation:
@@ -1,5 +1,18 @@
 import re
 from difflib import SequenceMatcher
+from services.achievement_engine import AchievementEngine
+
+QUIZ_ACHIEVEMENTS = AchievementEngine()
+# Score-based achievements
+QUIZ_ACHIEVEMENTS.rule('scholar', 'total_score', 1000,
+                       name='Scholar', description='Earned 1000+ points', icon='🎓')
+# Streak-based achievements
+QUIZ_ACHIEVEMENTS.rule('on_fire', 'current_streak', 5,
+                       name='On Fire', description='5+ correct answers in a row', icon='🔥')
+# Subject mastery
+for _subject in ['Science', 'Mathematics', 'History']:
+    QUIZ_ACHIEVEMENTS.rule(f'{_subject.lower()}_expert', f'{_subject.lower()}_score', 500,
+                           name=f'{_subject} Expert', description=f'500+ points in {_subject}', icon='🏆')
 
 class QuizService:
     def __init__(self):
@@ -129,32 +142,4 @@ class QuizService:
         """
         Check for achievements based on user statistics
         """
-        achievements = []
-        
-        # Score-based achievements
-        if user_stats.get('total_score', 0) >= 1000:
-            achievements.append({
-                'name': 'Scholar',
-                'description': 'Earned 1000+ points',
-                'icon': '🎓'
-            })
-        
-        # Streak-based achievements
-        if user_stats.get('current_streak', 0) >= 5:
-            achievements.append({
-                'name': 'On Fire',
-                'description': '5+ correct answers in a row',
-                'icon': '🔥'
-            })
-        
-        # Subject mastery
-        for subject in ['Science', 'Mathematics', 'History']:
-            subject_score = user_stats.get(f'{subject.lower()}_score', 0)
-            if subject_score >= 500:
-                achievements.append({
-                    'name': f'{subject} Expert',
-                    'description': f'500+ points in {subject}',
-                    'icon': '🏆'
-                })
-        
-        return achievements
+        return QUIZ_ACHIEVEMENTS.evaluate(user_stats)
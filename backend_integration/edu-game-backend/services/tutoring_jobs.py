@@ -0,0 +1,121 @@
+"""
+Background generation of rich tutoring content.
+
+The answer check only grades; when rich tutoring is requested it calls
+submit(), which queues the LLM work on a small thread pool and returns a
+ticket at once. Clients poll get(ticket) or block on wait(ticket) (the SSE
+endpoint) for the result:
+
+    {'status': 'pending' | 'done' | 'error', 'rich_tutoring': {...},
+     'wrong_analysis': {...} (wrong answers only), 'error': '...'}
+
+Tickets live in memory for ttl seconds after they finish, and at most
+max_tickets are kept (oldest dropped first). Once max_pending jobs are
+queued or running, submit() sheds new requests instead of growing the
+queue. With several worker processes a ticket is only known to the process
+that issued it.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TutoringJobs:
+    def __init__(self, ai_service_factory, workers=4, ttl=600, max_tickets=10000, max_pending=None):
+        """
+        ai_service_factory: builds the AIService the workers share (called on first job)
+        workers: concurrent LLM generations
+        ttl: seconds a finished ticket stays readable
+        max_tickets: tickets kept in memory at most
+        max_pending: jobs queued or running at most (default 50 per worker)
+        """
+        self.ai_service_factory = ai_service_factory
+        self.ttl = ttl
+        self.max_tickets = max_tickets
+        self.max_pending = 50 * workers if max_pending is None else max_pending
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tutoring')
+        self._jobs = OrderedDict()       # ticket -> job dict (plus '_done' event, '_finished' time)
+        self._finished = OrderedDict()   # ticket -> monotonic finish time, in finishing order
+        self._pending = 0
+        self._lock = threading.Lock()
+        # building the service loads the artifact; that must not hold up
+        # submit()/get() on _lock, so it has a lock of its own
+        self._service_lock = threading.Lock()
+        self._ai_service = None
+
+    def _service(self):
+        if self._ai_service is None:
+            with self._service_lock:
+                if self._ai_service is None:
+                    self._ai_service = self.ai_service_factory()
+        return self._ai_service
+
+    def _expire(self, now):
+        """Drop finished tickets past the TTL, oldest first, stopping at the
+        first one still readable; then the oldest beyond max_tickets."""
+        while self._finished:
+            ticket, finished = next(iter(self._finished.items()))
+            if now - finished <= self.ttl:
+                break
+            del self._finished[ticket]
+            del self._jobs[ticket]
+        while len(self._jobs) >= self.max_tickets:   # room for the ticket being added
+            ticket, _ = self._jobs.popitem(last=False)
+            self._finished.pop(ticket, None)
+
+    def submit(self, question_data, selected_option=None, user_attempt=None, is_correct=None):
+        """Queue rich tutoring for one answered question; returns the ticket id,
+        or None when max_pending jobs are already waiting (load shedding)."""
+        ticket = uuid.uuid4().hex
+        job = {'status': 'pending', '_done': threading.Event(), '_finished': None}
+        with self._lock:
+            if self._pending >= self.max_pending:
+                return None
+            self._expire(time.monotonic())
+            self._jobs[ticket] = job
+            self._pending += 1
+        self._pool.submit(self._run, ticket, job, question_data, selected_option, user_attempt, is_correct)
+        return ticket
+
+    def _run(self, ticket, job, question_data, selected_option, user_attempt, is_correct):
+        result = {}
+        try:
+            ai_service = self._service()
+            result['rich_tutoring'] = ai_service.get_rich_hint(
+                question_data, user_attempt=user_attempt, selected_option=selected_option)
+            if not is_correct and selected_option is not None:
+                result['wrong_analysis'] = ai_service.get_wrong_answer_analysis(question_data, selected_option)
+            status = 'done'
+        except Exception as e:
+            result['error'] = str(e)
+            status = 'error'
+        with self._lock:
+            job.update(result)
+            job['status'] = status
+            job['_finished'] = time.monotonic()
+            self._pending -= 1
+            if ticket in self._jobs:   # not already dropped for max_tickets
+                self._finished[ticket] = job['_finished']
+        job['_done'].set()
+
+    @staticmethod
+    def _public(job):
+        return {k: v for k, v in job.items() if not k.startswith('_')}
+
+    def get(self, ticket):
+        """Current state of a ticket, or None if it is unknown or expired."""
+        with self._lock:
+            job = self._jobs.get(ticket)
+            return None if job is None else self._public(job)
+
+    def wait(self, ticket, timeout=None):
+        """Like get(), but first waits up to timeout seconds for the job to finish."""
+        with self._lock:
+            job = self._jobs.get(ticket)
+        if job is None:
+            return None
+        job['_done'].wait(timeout)
+        with self._lock:
+            return self._public(job)
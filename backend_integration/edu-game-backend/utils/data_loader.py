@@ -1,11 +1,32 @@
 import json
 import os
+import random
 import sys
+from collections.abc import Sequence
+
+class _FormattedQuestions(Sequence):
+    """Bank questions in DataLoader's format, converted when accessed"""
+    def __init__(self, loader, records):
+        self._loader = loader
+        self._records = records
+    
+    def __len__(self):
+        return len(self._records)
+    
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return self._loader._format_question(i, self._records[i])
 
 class DataLoader:
     def __init__(self):
         self.questions_data = None
+        self._ncert = None
+        self._questions_by_id = {}
         self.load_questions()
+        self._index_questions()
     
     def load_questions(self):
         """Load questions from NCERT question database"""
@@ -14,52 +35,13 @@ class DataLoader:
             data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
             sys.path.insert(0, data_dir)
             
-            # Import NCERT questions
-            from ncert_questions import SCIENCE_QUESTIONS, MATHEMATICS_QUESTIONS
-            
-            # Convert NCERT questions to our format
-            self.questions_data = []
-            question_id = 1
-            
-            # Process Science questions
-            for topic, questions in SCIENCE_QUESTIONS.items():
-                for q in questions:
-                    formatted_q = {
-                        'id': question_id,
-                        'class': self._extract_class_from_source(q.get('source', '')),
-                        'subject': 'Science',
-                        'chapter': q.get('concept', topic.replace('-', ' ').title()),
-                        'question': q['text'],
-                        'type': 'mcq',
-                        'difficulty': q.get('difficulty', 'medium'),
-                        'options': q['options'],
-                        'correct_answer': q['options'][q['correct']],
-                        'correct_index': q['correct'],
-                        'explanation': q.get('explanation', ''),
-                        'gamify': q.get('concept', '')
-                    }
-                    self.questions_data.append(formatted_q)
-                    question_id += 1
+            # Import NCERT questions (memory-mapped bank, decoded on access)
+            import ncert_questions
             
-            # Process Math questions
-            for topic, questions in MATHEMATICS_QUESTIONS.items():
-                for q in questions:
-                    formatted_q = {
-                        'id': question_id,
-                        'class': self._extract_class_from_source(q.get('source', '')),
-                        'subject': 'Maths',
-                        'chapter': q.get('concept', topic.replace('-', ' ').title()),
-                        'question': q['text'],
-                        'type': 'mcq',
-                        'difficulty': q.get('difficulty', 'medium'),
-                        'options': q['options'],
-                        'correct_answer': q['options'][q['correct']],
-                        'correct_index': q['correct'],
-                        'explanation': q.get('explanation', ''),
-                        'gamify': q.get('concept', '')
-                    }
-                    self.questions_data.append(formatted_q)
-                    question_id += 1
+            # Questions are converted to our format on access; ids are the
+            # 1-based position in the bank (science lessons first, then maths)
+            self._ncert = ncert_questions
+            self.questions_data = _FormattedQuestions(self, ncert_questions.QUESTION_RECORDS)
             
             print(f"Loaded {len(self.questions_data)} questions from NCERT dataset")
             
@@ -71,6 +53,24 @@ class DataLoader:
             print(f"Error loading NCERT questions: {e}")
             self._load_json_fallback()
     
+    def _format_question(self, idx, q):
+        """Convert an NCERT bank question to our format"""
+        lesson_id = self._ncert.QUESTION_BANK.lesson_of(idx)
+        return {
+            'id': idx + 1,
+            'class': self._extract_class_from_source(q.get('source', '')),
+            'subject': 'Science' if lesson_id in self._ncert.SCIENCE_QUESTIONS else 'Maths',
+            'chapter': q.get('concept', lesson_id.replace('-', ' ').title()),
+            'question': q['text'],
+            'type': 'mcq',
+            'difficulty': q.get('difficulty', 'medium'),
+            'options': q['options'],
+            'correct_answer': q['options'][q['correct']],
+            'correct_index': q['correct'],
+            'explanation': q.get('explanation', ''),
+            'gamify': q.get('concept', '')
+        }
+    
     def _extract_class_from_source(self, source):
         """Extract class number from source string"""
         if 'Class 6' in source:
@@ -97,14 +97,20 @@ class DataLoader:
             print(f"Error loading fallback questions: {e}")
             self.questions_data = []
     
+    def _index_questions(self):
+        """Build the id -> question map used by get_question_by_id (JSON fallback
+        only; bank ids are positions, so they need no map)"""
+        self._questions_by_id = {}
+        if self._ncert is None:
+            for question in self.questions_data or []:
+                self._questions_by_id.setdefault(question.get('id'), question)
+    
     def get_question_by_id(self, question_id):
         """Get a specific question by ID"""
-        if not self.questions_data:
-            return None
-        
-        for question in self.questions_data:
-            if question.get('id') == question_id:
-                return question
+        if self._ncert is None:
+            return self._questions_by_id.get(question_id)
+        if isinstance(question_id, int) and 1 <= question_id <= len(self.questions_data):
+            return self.questions_data[question_id - 1]
         return None
     
     def get_questions_by_class(self, class_num):
@@ -112,27 +118,38 @@ class DataLoader:
         if not self.questions_data:
             return []
         
-        return [q for q in self.questions_data if q.get('class') == class_num]
+        return self.get_filtered_questions(class_num=class_num)
     
     def get_questions_by_subject(self, subject):
         """Get all questions for a specific subject"""
         if not self.questions_data:
             return []
         
-        return [q for q in self.questions_data if q.get('subject', '').lower() == subject.lower()]
+        return self.get_filtered_questions(subject=subject)
     
     def get_questions_by_difficulty(self, difficulty):
         """Get all questions for a specific difficulty level"""
         if not self.questions_data:
             return []
         
-        return [q for q in self.questions_data if q.get('difficulty', '').lower() == difficulty.lower()]
+        return self.get_filtered_questions(difficulty=difficulty)
     
     def get_filtered_questions(self, class_num=None, subject=None, difficulty=None, limit=None):
         """Get questions with multiple filters"""
         if not self.questions_data:
             return []
         
+        if self._ncert is not None:
+            # Filter on the bank's catalog, then convert only the matches
+            indices = self._ncert.catalog_indices(
+                subject=subject or None,
+                class_level=class_num or None,
+                difficulty=difficulty.lower() if difficulty else None
+            )
+            if limit:
+                indices = indices[:limit]
+            return [self.questions_data[i] for i in indices]
+        
         filtered = self.questions_data
         
         if class_num:
@@ -151,7 +168,10 @@ class DataLoader:
     
     def get_random_questions(self, count=5, class_num=None, subject=None):
         """Get random questions for quiz generation"""
-        import random
+        if self._ncert is not None:
+            indices = self._ncert.catalog_indices(subject=subject or None, class_level=class_num or None)
+            picked = random.sample(indices, count) if len(indices) > count else indices
+            return [self.questions_data[i] for i in picked]
         
         filtered = self.get_filtered_questions(class_num=class_num, subject=subject)
         
@@ -0,0 +1,168 @@
+"""
+Incrementally maintained leaderboard.
+
+Students are kept in an indexable skiplist ordered by (-xp, student_id):
+every forward link also stores how many entries it skips, so the position of
+any entry is the sum of the widths walked to reach it. Updating a student's
+XP is a remove + insert, O(log n); top-K walks the bottom level, O(K); and a
+student's rank is a single descent, O(log n). After the initial load nothing
+is re-sorted.
+
+Ties on XP are ordered by student id, so every student has a distinct rank.
+"""
+import random
+import threading
+
+_MAX_LEVEL = 32
+
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+
+    def __init__(self, key, levels):
+        self.key = key
+        self.next = [None] * levels
+        self.width = [1] * levels
+
+
+class RankedSkipList:
+    """Sorted keys with O(log n) insert / remove / rank and O(K) prefix walks."""
+
+    def __init__(self, sorted_keys=(), seed=None):
+        self._head = _Node(None, _MAX_LEVEL)
+        self._size = 0
+        self._levels = 1   # levels in use; the head links above them lead nowhere
+        self._random = random.Random(seed)
+        self._bulk_load(sorted_keys)
+
+    def _bulk_load(self, sorted_keys):
+        """Link already sorted keys in one pass, O(n)."""
+        last = [self._head] * _MAX_LEVEL
+        last_pos = [0] * _MAX_LEVEL
+        pos = 0
+        for key in sorted_keys:
+            pos += 1
+            node = _Node(key, self._level())
+            for level in range(len(node.next)):
+                last[level].next[level] = node
+                last[level].width[level] = pos - last_pos[level]
+                last[level], last_pos[level] = node, pos
+            self._levels = max(self._levels, len(node.next))
+        for level in range(_MAX_LEVEL):
+            last[level].width[level] = pos + 1 - last_pos[level]
+        self._size = pos
+
+    def __len__(self):
+        return self._size
+
+    def _level(self):
+        level = 1
+        while level < _MAX_LEVEL and self._random.random() < 0.5:
+            level += 1
+        return level
+
+    def _predecessors(self, key):
+        """Last node before key on every level, and the position of each."""
+        chain = [self._head] * _MAX_LEVEL
+        positions = [0] * _MAX_LEVEL
+        node, pos = self._head, 0
+        for level in reversed(range(self._levels)):
+            nxt = node.next[level]
+            while nxt is not None and nxt.key < key:
+                pos += node.width[level]
+                node, nxt = nxt, nxt.next[level]
+            chain[level] = node
+            positions[level] = pos
+        return chain, positions
+
+    def insert(self, key):
+        chain, positions = self._predecessors(key)
+        pos = positions[0] + 1  # where the new node lands
+        node = _Node(key, self._level())
+        self._levels = max(self._levels, len(node.next))
+        for level in range(len(node.next)):
+            prev = chain[level]
+            skipped = pos - positions[level]
+            node.next[level] = prev.next[level]
+            node.width[level] = prev.width[level] - skipped + 1
+            prev.next[level] = node
+            prev.width[level] = skipped
+        for level in range(len(node.next), _MAX_LEVEL):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key):
+        chain, _ = self._predecessors(key)
+        node = chain[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+        for level in range(len(node.next)):
+            prev = chain[level]
+            prev.width[level] += node.width[level] - 1
+            prev.next[level] = node.next[level]
+        for level in range(len(node.next), _MAX_LEVEL):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+    def rank(self, key):
+        """1-based position of key, or None if it is not present."""
+        chain, positions = self._predecessors(key)
+        node = chain[0].next[0]
+        if node is None or node.key != key:
+            return None
+        return positions[0] + 1
+
+    def first(self, k):
+        """The k smallest keys, in order."""
+        keys = []
+        node = self._head.next[0]
+        while node is not None and len(keys) < k:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+class LeaderboardIndex:
+    """Students ordered by XP, each carrying the summary row the API returns."""
+
+    def __init__(self):
+        self._order = RankedSkipList()
+        self._entries = {}   # student_id -> (key, row)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self, entries):
+        """Replace the contents with [(student_id, xp, row)] in one O(n log n) sort."""
+        entries = {student_id: ((-xp, student_id), row) for student_id, xp, row in entries}
+        order = RankedSkipList(sorted(key for key, _ in entries.values()))
+        with self._lock:
+            self._order, self._entries = order, entries
+
+    def update(self, student_id, xp, row):
+        """Insert or move a student; row is the summary returned by top() and rank()."""
+        key = (-xp, student_id)
+        with self._lock:
+            old = self._entries.get(student_id)
+            if old is None or old[0] != key:
+                if old is not None:
+                    self._order.remove(old[0])
+                self._order.insert(key)
+            self._entries[student_id] = (key, row)
+
+    def top(self, k):
+        """[(rank, student_id, row)] for the k highest-XP students."""
+        with self._lock:
+            return [(i + 1, sid, self._entries[sid][1]) for i, (_, sid) in enumerate(self._order.first(k))]
+
+    def rank(self, student_id):
+        """(rank, row) for student_id, or None if the student is not ranked."""
+        with self._lock:
+            entry = self._entries.get(student_id)
+            if entry is None:
+                return None
+            return self._order.rank(entry[0]), entry[1]
+
+    def clear(self):
+        self.load(())
@@ -0,0 +1,164 @@
+"""
+Per-student progress storage.
+
+One row per student in a SQLite file (WAL mode), so answering a question
+reads and rewrites that student's row only instead of the whole progress
+file. transaction() holds SQLite's write lock (BEGIN IMMEDIATE) for the
+read-modify-write, so concurrent requests (threads or worker processes)
+can no longer overwrite each other's XP. Readers never block on writers.
+
+Every write stamps the row with a store-wide revision number, so in-memory
+views (the leaderboard index) can catch up on exactly the rows changed
+since they last looked, whichever process wrote them.
+
+A legacy student_progress.json is imported once, the first time the store
+is opened with an empty table.
+"""
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class ProgressStore:
+    def __init__(self, path, legacy_json=None, timeout=30.0):
+        """
+        path: SQLite file holding one progress document per student
+        legacy_json: old {student_id: progress} JSON file to import once
+        timeout: seconds a transaction waits for another writer
+        """
+        self.path = path
+        self.legacy_json = legacy_json
+        self.timeout = timeout
+        self._local = threading.local()  # one connection per thread
+        self._init_lock = threading.Lock()
+        self._ready = False
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            with self._init_lock:
+                if not self._ready:
+                    self._create(conn)
+                    self._ready = True
+        return conn
+
+    def _create(self, conn):
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS student_progress ('
+                'student_id TEXT PRIMARY KEY, doc TEXT NOT NULL, rev INTEGER NOT NULL DEFAULT 0)'
+            )
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(student_progress)')}
+            if 'rev' not in columns:
+                conn.execute('ALTER TABLE student_progress ADD COLUMN rev INTEGER NOT NULL DEFAULT 0')
+            conn.execute('CREATE INDEX IF NOT EXISTS student_progress_rev ON student_progress (rev)')
+            conn.execute('CREATE TABLE IF NOT EXISTS progress_meta (version INTEGER NOT NULL)')
+            if conn.execute('SELECT 1 FROM progress_meta').fetchone() is None:
+                conn.execute('INSERT INTO progress_meta (version) VALUES (0)')
+            empty = conn.execute('SELECT 1 FROM student_progress LIMIT 1').fetchone() is None
+            if empty and self.legacy_json and os.path.exists(self.legacy_json):
+                try:
+                    with open(self.legacy_json, 'r') as f:
+                        legacy = json.load(f)
+                except (OSError, ValueError):
+                    legacy = {}
+                conn.executemany(
+                    'INSERT OR IGNORE INTO student_progress (student_id, doc) VALUES (?, ?)',
+                    [(sid, json.dumps(doc)) for sid, doc in legacy.items() if isinstance(doc, dict)]
+                )
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def get(self, student_id):
+        """Committed progress for student_id, or None if the student is unknown."""
+        return self._read(self._conn(), student_id)
+
+    def _read(self, conn, student_id):
+        row = conn.execute(
+            'SELECT doc FROM student_progress WHERE student_id = ?', (student_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _write(self, conn, docs):
+        """Store {student_id: progress} under one new revision (caller holds the write lock)."""
+        rev = conn.execute(
+            'UPDATE progress_meta SET version = version + 1 RETURNING version'
+        ).fetchone()[0]
+        conn.executemany(
+            'INSERT INTO student_progress (student_id, doc, rev) VALUES (?, ?, ?) '
+            'ON CONFLICT(student_id) DO UPDATE SET doc = excluded.doc, rev = excluded.rev',
+            [(student_id, json.dumps(doc, separators=(',', ':')), rev) for student_id, doc in docs.items()]
+        )
+
+    @contextmanager
+    def transaction(self, student_id, factory=None):
+        """Yield the student's progress for an atomic read-modify-write.
+
+        A missing student is created with factory(), or yielded as None when
+        there is no factory. The yielded dict is written back on exit; an
+        exception rolls the change back."""
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            doc = self._read(conn, student_id)
+            if doc is None and factory is not None:
+                doc = factory()
+            yield doc
+            if doc is not None:
+                self._write(conn, {student_id: doc})
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def update_many(self, student_ids, update, factory):
+        """Apply update(student_id, progress) to several students in one
+        transaction (missing students are created with factory())."""
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            docs = {}
+            for student_id in student_ids:
+                doc = self._read(conn, student_id) or factory()
+                update(student_id, doc)
+                docs[student_id] = doc
+            if docs:
+                self._write(conn, docs)
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def items(self):
+        """(student_id, progress) for every student."""
+        for student_id, doc in self._conn().execute('SELECT student_id, doc FROM student_progress'):
+            yield student_id, json.loads(doc)
+
+    def changes_since(self, rev):
+        """(latest revision, [(student_id, progress)] written after rev).
+
+        Both come from one read snapshot, so passing the returned revision
+        back in later never skips or repeats a write."""
+        conn = self._conn()
+        conn.execute('BEGIN')
+        try:
+            latest = conn.execute('SELECT version FROM progress_meta').fetchone()[0]
+            rows = [] if latest == rev else conn.execute(
+                'SELECT student_id, doc FROM student_progress WHERE rev > ? ORDER BY rev', (rev,)
+            ).fetchall()
+        finally:
+            conn.execute('COMMIT')
+        return latest, [(student_id, json.loads(doc)) for student_id, doc in rows]
+
+    def __len__(self):
+        return self._conn().execute('SELECT COUNT(*) FROM student_progress').fetchone()[0]
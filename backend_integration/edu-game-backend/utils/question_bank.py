@@ -0,0 +1,294 @@
+"""
+Compiled, memory-mappable question bank.
+
+File layout (version 1, native byte order recorded in the metadata):
+
+    magic 'NCQBANK\\0' | u32 version | u32 meta length | meta JSON | columns
+
+The JSON metadata holds the small per-lesson table (lesson id, subject and
+the [start, end) range of its questions), the difficulty code table and the
+offset/length/typecode of every column. Columns are flat arrays with one
+entry per question, in lesson order:
+
+    id, difficulty (code), correct (-1 = missing), text, explanation,
+    concept, source, extra (string ids), options_start (N+1 offsets into
+    options, which holds string ids), str_offsets (S+1 offsets into str_heap)
+
+Strings are stored once in a UTF-8 heap (concepts and sources repeat a lot).
+Opening a bank only parses the metadata and maps the file; a question is
+decoded into a dict when it is accessed, so resident memory does not grow
+with the size of the bank and worker processes share the mapped pages.
+"""
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+
+MAGIC = b'NCQBANK\0'
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<8sII')
+_NONE = 0xFFFFFFFF  # string id of a missing field
+_STRING_FIELDS = ('text', 'explanation', 'concept', 'source')
+_KNOWN_FIELDS = {'id', 'difficulty', 'correct', 'options'} | set(_STRING_FIELDS)
+
+
+def compile_question_bank(lessons, source=None):
+    """Serialise lessons into the binary format and return the bytes.
+
+    lessons: iterable of (lesson_id, subject, questions) in bank order
+    source: JSON-serialisable stamp of the source the bank was built from
+    """
+    strings, heap, str_offsets = {}, bytearray(), array('I', [0])
+
+    def intern(value):
+        if value is None:
+            return _NONE
+        sid = strings.get(value)
+        if sid is None:
+            sid = strings[value] = len(strings)
+            heap.extend(value.encode('utf-8'))
+            str_offsets.append(len(heap))
+        return sid
+
+    difficulties, lesson_table = [], []
+    cols = {
+        'id': array('I'), 'difficulty': array('B'), 'correct': array('b'),
+        **{field: array('I') for field in _STRING_FIELDS},
+        'extra': array('I'), 'options_start': array('I', [0]), 'options': array('I'),
+    }
+    for lesson_id, subject, questions in lessons:
+        start = len(cols['id'])
+        for q in questions:
+            difficulty = q.get('difficulty', 'easy')
+            if difficulty not in difficulties:
+                difficulties.append(difficulty)
+            cols['id'].append(q['id'])
+            cols['difficulty'].append(difficulties.index(difficulty))
+            cols['correct'].append(q['correct'] if q.get('correct') is not None else -1)
+            for field in _STRING_FIELDS:
+                cols[field].append(intern(q.get(field)))
+            extra = {k: v for k, v in q.items() if k not in _KNOWN_FIELDS and k != 'key'}
+            cols['extra'].append(intern(json.dumps(extra, sort_keys=True)) if extra else _NONE)
+            cols['options'].extend(intern(option) for option in q.get('options', []))
+            cols['options_start'].append(len(cols['options']))
+        lesson_table.append([lesson_id, subject, start, len(cols['id'])])
+    cols['str_offsets'] = str_offsets
+    cols['str_heap'] = array('B', bytes(heap))
+
+    # Columns are 8-byte aligned relative to the start of the column area
+    blobs, layout, offset = [], {}, 0
+    for name, col in cols.items():
+        data = col.tobytes()
+        layout[name] = [offset, len(data), col.typecode]
+        pad = -len(data) % 8
+        blobs.append(data + b'\0' * pad)
+        offset += len(data) + pad
+    meta = {
+        'count': len(cols['id']),
+        'byteorder': sys.byteorder,
+        'source': source,
+        'lessons': lesson_table,
+        'difficulties': difficulties,
+        'columns': layout,
+    }
+    meta_bytes = json.dumps(meta, separators=(',', ':')).encode('utf-8')
+    meta_bytes += b' ' * (-(len(meta_bytes) + _HEADER.size) % 8)
+    return b''.join([_HEADER.pack(MAGIC, FORMAT_VERSION, len(meta_bytes)), meta_bytes] + blobs)
+
+
+def write_question_bank(lessons, path, source=None):
+    """Compile lessons to path atomically (safe with several workers building at once)."""
+    data = compile_question_bank(lessons, source)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class QuestionBank(Sequence):
+    """Read-only view of a compiled bank; bank[i] decodes question i."""
+
+    def __init__(self, buffer, mapped=None):
+        self._mapped = mapped
+        view = memoryview(buffer)
+        magic, version, meta_len = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError('not a compiled question bank')
+        if version != FORMAT_VERSION:
+            raise ValueError(f'unsupported question bank version {version}')
+        meta_end = _HEADER.size + meta_len
+        self.meta = json.loads(bytes(view[_HEADER.size:meta_end]))
+        if self.meta['byteorder'] != sys.byteorder:
+            raise ValueError('question bank was compiled for another byte order')
+        columns = view[meta_end:]
+        self._cols = {
+            name: columns[offset:offset + length].cast(typecode)
+            for name, (offset, length, typecode) in self.meta['columns'].items()
+        }
+        self._count = self.meta['count']
+        self.difficulties = tuple(self.meta['difficulties'])
+        self.lessons = {lesson_id: (subject, start, end)
+                        for lesson_id, subject, start, end in self.meta['lessons']}
+        self._lesson_ids = [entry[0] for entry in self.meta['lessons']]
+        self._lesson_starts = [entry[2] for entry in self.meta['lessons']]
+
+    @classmethod
+    def open(cls, path):
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls(mapped, mapped)
+        except Exception:
+            mapped.close()
+            raise
+
+    # ---- columns -------------------------------------------------------
+
+    def string(self, sid):
+        if sid == _NONE:
+            return None
+        offsets = self._cols['str_offsets']
+        return str(self._cols['str_heap'][offsets[sid]:offsets[sid + 1]], 'utf-8')
+
+    def question_id(self, idx):
+        return self._cols['id'][idx]
+
+    def difficulty(self, idx):
+        return self.difficulties[self._cols['difficulty'][idx]]
+
+    def concept_sid(self, idx):
+        """String id of the question's concept (equal concepts share an id)."""
+        return self._cols['concept'][idx]
+
+    def lesson_of(self, idx):
+        return self._lesson_ids[bisect.bisect_right(self._lesson_starts, idx) - 1]
+
+    def lesson_range(self, lesson_id):
+        entry = self.lessons.get(lesson_id)
+        return range(entry[1], entry[2]) if entry else range(0)
+
+    def position(self, lesson_id, question_id):
+        """Global index of (lesson_id, question_id), or None."""
+        span = self.lesson_range(lesson_id)
+        if not span or not isinstance(question_id, int):
+            return None
+        ids = self._cols['id']
+        guess = span.start + question_id - 1  # ids usually run 1..n within a lesson
+        if guess in span and ids[guess] == question_id:
+            return guess
+        for idx in span:
+            if ids[idx] == question_id:
+                return idx
+        return None
+
+    # ---- layout --------------------------------------------------------
+    # Global indices depend on the lesson order and on every lesson's question
+    # ids and difficulties. State stored by index (answer bitmaps, rotations)
+    # records these digests to notice when a rebuilt bank moved questions.
+
+    def lesson_ids(self, lesson_id):
+        """Question ids of a lesson, in bank order."""
+        span = self.lesson_range(lesson_id)
+        return self._cols['id'][span.start:span.stop]
+
+    def lesson_digest(self, lesson_id):
+        """64-bit digest of a lesson's question ids and difficulties, in order."""
+        span = self.lesson_range(lesson_id)
+        h = hashlib.blake2b(lesson_id.encode('utf-8'), digest_size=8)
+        h.update(self._cols['id'][span.start:span.stop].tobytes())
+        h.update(self._cols['difficulty'][span.start:span.stop].tobytes())
+        h.update(json.dumps(self.difficulties).encode('utf-8'))
+        return int.from_bytes(h.digest(), 'little')
+
+    def layout_fingerprint(self):
+        """64-bit digest of the whole layout; changes whenever any question's
+        global index or difficulty does."""
+        h = hashlib.blake2b(digest_size=8)
+        for lesson_id in self._lesson_ids:
+            h.update(self.lesson_digest(lesson_id).to_bytes(8, 'little'))
+        return int.from_bytes(h.digest(), 'little')
+
+    # ---- decoding ------------------------------------------------------
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(self._count))]
+        if idx < 0:
+            idx += self._count
+        if not 0 <= idx < self._count:
+            raise IndexError('question index out of range')
+        cols = self._cols
+        lesson_id = self.lesson_of(idx)
+        q = {'id': cols['id'][idx]}
+        for field in ('text', 'options', 'correct', 'explanation', 'concept', 'difficulty', 'source'):
+            if field == 'options':
+                start, end = cols['options_start'][idx], cols['options_start'][idx + 1]
+                q['options'] = [self.string(sid) for sid in cols['options'][start:end]]
+            elif field == 'correct':
+                if cols['correct'][idx] >= 0:
+                    q['correct'] = cols['correct'][idx]
+            elif field == 'difficulty':
+                q['difficulty'] = self.difficulty(idx)
+            else:
+                value = self.string(cols[field][idx])
+                if value is not None:
+                    q[field] = value
+        extra = self.string(cols['extra'][idx])
+        if extra:
+            q.update(json.loads(extra))
+        q['key'] = f"{lesson_id}:{q['id']}"
+        return q
+
+    def lesson_map(self, subject=None):
+        """Mapping lesson_id -> that lesson's questions (decoded on access),
+        optionally restricted to one subject."""
+        return _LessonMap(self, subject)
+
+    def close(self):
+        self._cols = {}
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+
+
+class _LessonQuestions(Sequence):
+    def __init__(self, bank, span):
+        self._bank, self._span = bank, span
+
+    def __len__(self):
+        return len(self._span)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._bank[idx] for idx in self._span[i]]
+        return self._bank[self._span[i]]
+
+
+class _LessonMap(Mapping):
+    def __init__(self, bank, subject=None):
+        self._bank = bank
+        self._ids = [lesson_id for lesson_id, (subj, _, _) in bank.lessons.items()
+                     if subject is None or subj == subject]
+        self._members = set(self._ids)
+
+    def __getitem__(self, lesson_id):
+        if lesson_id not in self._members:
+            raise KeyError(lesson_id)
+        return _LessonQuestions(self._bank, self._bank.lesson_range(lesson_id))
+
+    def __contains__(self, lesson_id):
+        return lesson_id in self._members
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __len__(self):
+        return len(self._ids)
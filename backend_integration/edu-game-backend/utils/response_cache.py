@@ -0,0 +1,149 @@
+"""
+Content-addressed cache for generated tutoring content.
+
+Entries are keyed by a hash of everything that shapes the output (the prompt
+inputs, the model id and a cache version), so equal requests from any
+student share one entry and a new model or prompt revision never sees stale
+content. Two tiers:
+
+- an in-process LRU of the most recently used entries (lookups are a dict
+  hit plus json.loads, microseconds);
+- a shared SQLite file (WAL), so every worker process and restarts reuse
+  what any of them generated.
+
+Entries expire ttl seconds after they were stored. Bumping version drops
+everything stored under an older one (rows are purged on open).
+
+load_artifact() adds a read-only tier in front of both: entries generated
+ahead of time for the whole question bank (data/precompute_tutoring.py),
+written with write_artifact() as one gzipped JSON file.
+"""
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    def __init__(self, path, max_entries=4096, ttl=30 * 86400, version=1):
+        """
+        path: SQLite file shared by all processes (None keeps the cache in memory only)
+        max_entries: entries kept in the in-process LRU
+        ttl: seconds an entry stays valid
+        version: cache generation; entries from other versions are ignored and purged
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = version
+        self._lru = OrderedDict()   # key -> (json text, expires)
+        self._fixed = {}            # key -> json text, from load_artifact()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._ready = False
+
+    def key(self, *parts):
+        """Stable hash of JSON-serialisable parts (plus the cache version)."""
+        blob = json.dumps([self.version, *parts], sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            with self._init_lock:
+                if not self._ready:
+                    conn.execute(
+                        'CREATE TABLE IF NOT EXISTS response_cache ('
+                        'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                        'expires REAL NOT NULL, version INTEGER NOT NULL)'
+                    )
+                    conn.execute('DELETE FROM response_cache WHERE version != ? OR expires <= ?',
+                                 (self.version, time.time()))
+                    self._ready = True
+        return conn
+
+    def _remember(self, key, text, expires):
+        with self._lock:
+            self._lru[key] = (text, expires)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def load_artifact(self, path):
+        """Serve the entries of a precomputed artifact from memory; returns how
+        many were loaded (none if the file is missing or from another version)."""
+        artifact = read_artifact(path)
+        if artifact is None or artifact['version'] != self.version:
+            return 0
+        fixed = {key: json.dumps(value, separators=(',', ':')) for key, value in artifact['entries'].items()}
+        self._fixed = fixed
+        return len(fixed)
+
+    def get(self, key):
+        """Cached value for key, or None on a miss (or an expired entry)."""
+        text = self._fixed.get(key)
+        if text is not None:
+            return json.loads(text)
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._lru.move_to_end(key)
+                    return json.loads(entry[0])
+                del self._lru[key]
+        if self.path is None:
+            return None
+        row = self._conn().execute(
+            'SELECT value, expires FROM response_cache WHERE key = ? AND version = ? AND expires > ?',
+            (key, self.version, now)
+        ).fetchone()
+        if row is None:
+            return None
+        self._remember(key, row[0], row[1])
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        text = json.dumps(value, separators=(',', ':'))
+        expires = time.time() + self.ttl
+        self._remember(key, text, expires)
+        if self.path is not None:
+            self._conn().execute(
+                'INSERT OR REPLACE INTO response_cache (key, value, expires, version) VALUES (?, ?, ?, ?)',
+                (key, text, expires, self.version)
+            )
+
+    def __len__(self):
+        if self.path is None:
+            return len(self._lru)
+        return self._conn().execute(
+            'SELECT COUNT(*) FROM response_cache WHERE version = ? AND expires > ?', (self.version, time.time())
+        ).fetchone()[0]
+
+
+def write_artifact(path, entries, version, model):
+    """Write {key: value} as a precomputed artifact (atomically replaces path)."""
+    tmp = path + '.tmp'
+    with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+        json.dump({'version': version, 'model': model, 'generated_at': time.time(), 'entries': entries},
+                  f, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def read_artifact(path):
+    """{'version', 'model', 'generated_at', 'entries'} from path, or None if it is missing or unreadable."""
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
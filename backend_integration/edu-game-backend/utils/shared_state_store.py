@@ -0,0 +1,86 @@
+"""
+Cross-process rotation state.
+
+One SQLite file (WAL mode) shared by every worker process. Each document is
+a small JSON blob addressed by (kind, key): a global rotation state or a whole
+student record. transaction() holds SQLite's write lock (BEGIN IMMEDIATE) for
+the read-modify-write, so popping a batch from a rotation is atomic across
+processes and two workers can never serve the same question in one cycle.
+"""
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class SharedStateStore:
+    def __init__(self, path, timeout=30.0, dumps=None, loads=json.loads):
+        """
+        path: SQLite file shared by all workers
+        timeout: seconds a transaction waits for another worker's write lock
+        dumps/loads: document codec (compact JSON unless given)
+        """
+        self.path = path
+        self.timeout = timeout
+        self.dumps = dumps or (lambda doc: json.dumps(doc, separators=(',', ':')))
+        self.loads = loads
+        self._local = threading.local()  # one connection per thread
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS shared_state ('
+                'kind TEXT NOT NULL, key TEXT NOT NULL, doc TEXT NOT NULL, '
+                'PRIMARY KEY (kind, key))'
+            )
+            self._local.conn = conn
+        return conn
+
+    def _row_doc(self, row):
+        return self.loads(row[0]) if row else None
+
+    def read(self, kind, key):
+        """Committed document or None; takes no write lock."""
+        row = self._conn().execute(
+            'SELECT doc FROM shared_state WHERE kind = ? AND key = ?', (kind, key)
+        ).fetchone()
+        return self._row_doc(row)
+
+    @contextmanager
+    def transaction(self, kind, key, factory=None):
+        """Yield the document for an atomic read-modify-write.
+
+        A missing document is created with factory(), or yielded as None when
+        there is no factory. Whatever the caller leaves in the yielded dict is
+        written back on exit; an exception rolls everything back."""
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT doc FROM shared_state WHERE kind = ? AND key = ?', (kind, key)
+            ).fetchone()
+            doc = self._row_doc(row)
+            if doc is None and factory is not None:
+                doc = factory()
+            yield doc
+            if doc is not None:
+                conn.execute(
+                    'INSERT INTO shared_state (kind, key, doc) VALUES (?, ?, ?) '
+                    'ON CONFLICT(kind, key) DO UPDATE SET doc = excluded.doc',
+                    (kind, key, self.dumps(doc))
+                )
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def delete(self, kind, key=None):
+        """Remove one document, or every document of a kind when key is None."""
+        if key is None:
+            self._conn().execute('DELETE FROM shared_state WHERE kind = ?', (kind,))
+        else:
+            self._conn().execute('DELETE FROM shared_state WHERE kind = ? AND key = ?', (kind, key))
@@ -0,0 +1,55 @@
+"""
+Single-flight call coalescing.
+
+do(key, fn) runs fn once for every group of concurrent callers that use the
+same key: the first caller (the leader) runs it, everyone arriving while it
+is in flight waits and gets the same result (or the same exception). Once
+the call finishes the key is forgotten, so this deduplicates bursts without
+caching anything.
+"""
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, timeout=None):
+        """fn() shared with concurrent callers of the same key.
+
+        Returns (result, shared): shared is True when another caller ran fn.
+        Raises TimeoutError if a waiter gives up after timeout seconds (the
+        leader always runs fn to completion)."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        elif not call.done.wait(timeout):
+            raise TimeoutError(key)
+        if call.error is not None:
+            raise call.error
+        return call.result, not leader
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
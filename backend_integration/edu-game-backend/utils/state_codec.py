@@ -0,0 +1,281 @@
+"""
+Typed binary encoding for rotation state.
+
+Replaces JSON for rotation states, student records and the global snapshot.
+Every blob starts with a format version, so old files can still be read
+after the layout changes. Encoding is exact: 64-bit seeds, cursors and
+subsets, SM-2 cards and arbitrarily large answered/wrong bitmaps all
+round-trip unchanged. (JSON refuses to write ints over 4300 digits, so a
+large bank broke it.) Bitmaps are stored as raw little-endian bytes, which
+keeps encoding and decoding linear in their size.
+
+    blob      = u8 version | u8 type | body
+    rotation  = u64 seed | u32 cycle | map(str -> u32) cursors
+                | u8 has_subset [map(str -> u32 list) subset]
+    user      = map(str -> rotation) lesson | map(str -> rotation) subject_class
+                | u8 has_mixed [rotation] | bytes answered | bytes wrong
+                | u8 has_srs [u32 n, n * (u32 idx, f64 ease, u32 interval,
+                  u32 reps, f64 due) | u32 m, m * (f64 due, u32 idx)]
+                | u8 has_bank [u64 bank]
+    snapshot  = magic | u8 version | map(str -> rotation) lesson
+                | map(str -> rotation) subject_class | u8 has_mixed [rotation]
+                | u8 has_layout [u64 bank | u32 n, n * (str lesson_id,
+                  u64 digest, u32 list ids)]
+
+'bank' is the question bank layout fingerprint the indices were written
+against (see QuestionBank.layout_fingerprint); the snapshot keeps that
+layout so state from an older bank can be remapped.
+
+Strings are u32 length + UTF-8 (u16 length in version 1 blobs) and maps are
+u32 count + entries, all little-endian. Versions 1 and 2 are still read;
+they carry no bank stamp or layout.
+"""
+import json
+import struct
+
+CODEC_VERSION = 3
+_READABLE_VERSIONS = (1, 2, 3)
+SNAPSHOT_MAGIC = b'NCQSNAP\0'
+_TYPE_ROTATION = 1
+_TYPE_USER = 2
+
+_U8 = struct.Struct('<B')
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_U64 = struct.Struct('<Q')
+_ROTATION_HEAD = struct.Struct('<QI')
+_CARD = struct.Struct('<IdIId')
+_QUEUE_ENTRY = struct.Struct('<dI')
+
+
+class _Writer:
+    def __init__(self):
+        self.parts = []
+
+    def u8(self, value):
+        self.parts.append(_U8.pack(value))
+
+    def u32(self, value):
+        self.parts.append(_U32.pack(value))
+
+    def u64(self, value):
+        self.parts.append(_U64.pack(value))
+
+    def str(self, value):
+        data = value.encode('utf-8')
+        self.parts.append(_U32.pack(len(data)))
+        self.parts.append(data)
+
+    def raw(self, data):
+        self.u32(len(data))
+        self.parts.append(data)
+
+    def getvalue(self):
+        return b''.join(self.parts)
+
+
+class _Reader:
+    def __init__(self, data, offset=0):
+        self.view = memoryview(data)
+        self.pos = offset
+        self.str_length = _U32
+        self.version = CODEC_VERSION
+
+    def read_version(self):
+        """Read the format version and adapt to its layout."""
+        version = self.u8()
+        if version not in _READABLE_VERSIONS:
+            raise ValueError(f'unsupported state codec version {version}')
+        if version == 1:
+            self.str_length = _U16
+        self.version = version
+        return version
+
+    def unpack(self, fmt):
+        values = fmt.unpack_from(self.view, self.pos)
+        self.pos += fmt.size
+        return values
+
+    def u8(self):
+        return self.unpack(_U8)[0]
+
+    def u32(self):
+        return self.unpack(_U32)[0]
+
+    def u64(self):
+        return self.unpack(_U64)[0]
+
+    def str(self):
+        length = self.unpack(self.str_length)[0]
+        self.pos += length
+        return str(self.view[self.pos - length:self.pos], 'utf-8')
+
+    def raw(self):
+        length = self.u32()
+        self.pos += length
+        return self.view[self.pos - length:self.pos]
+
+
+def _write_rotation(w, state):
+    w.parts.append(_ROTATION_HEAD.pack(state['seed'], state['cycle']))
+    cursors = state['cursors']
+    w.u32(len(cursors))
+    for difficulty, served in cursors.items():
+        w.str(difficulty)
+        w.u32(served)
+    subset = state.get('subset')
+    w.u8(subset is not None)
+    if subset is not None:
+        w.u32(len(subset))
+        for difficulty, positions in subset.items():
+            w.str(difficulty)
+            w.u32(len(positions))
+            w.parts.append(struct.pack(f'<{len(positions)}I', *positions))
+
+
+def _read_rotation(r):
+    seed, cycle = r.unpack(_ROTATION_HEAD)
+    cursors = {}
+    for _ in range(r.u32()):
+        difficulty = r.str()
+        cursors[difficulty] = r.u32()
+    state = {'seed': seed, 'cycle': cycle, 'cursors': cursors}
+    if r.u8():
+        subset = {}
+        for _ in range(r.u32()):
+            difficulty = r.str()
+            n = r.u32()
+            subset[difficulty] = list(r.unpack(struct.Struct(f'<{n}I')))
+        state['subset'] = subset
+    return state
+
+
+def _write_rotation_map(w, rotations):
+    w.u32(len(rotations))
+    for key, state in rotations.items():
+        w.str(key)
+        _write_rotation(w, state)
+
+
+def _read_rotation_map(r):
+    rotations = {}
+    for _ in range(r.u32()):
+        key = r.str()
+        rotations[key] = _read_rotation(r)
+    return rotations
+
+
+def _write_optional_rotation(w, state):
+    w.u8(bool(state))
+    if state:
+        _write_rotation(w, state)
+
+
+def _write_bitmap(w, mask):
+    w.raw(mask.to_bytes((mask.bit_length() + 7) // 8, 'little'))
+
+
+def _write_user(w, record):
+    _write_rotation_map(w, record['lesson'])
+    _write_rotation_map(w, record['subject_class'])
+    _write_optional_rotation(w, record['mixed'])
+    _write_bitmap(w, record['answered'])
+    _write_bitmap(w, record['wrong'])
+    w.u8('srs' in record)
+    if 'srs' in record:
+        cards = record['srs']
+        w.u32(len(cards))
+        for idx, (ease, interval, reps, due) in cards.items():
+            w.parts.append(_CARD.pack(int(idx), ease, interval, reps, due))
+        queue = record.get('srs_queue', [])
+        w.u32(len(queue))
+        for due, idx in queue:
+            w.parts.append(_QUEUE_ENTRY.pack(due, idx))
+    w.u8(record.get('bank') is not None)
+    if record.get('bank') is not None:
+        w.u64(record['bank'])
+
+
+def _read_user(r):
+    record = {
+        'lesson': _read_rotation_map(r),
+        'subject_class': _read_rotation_map(r),
+        'mixed': _read_rotation(r) if r.u8() else None,
+        'answered': int.from_bytes(r.raw(), 'little'),
+        'wrong': int.from_bytes(r.raw(), 'little'),
+    }
+    if r.u8():
+        cards = {}
+        for _ in range(r.u32()):
+            idx, ease, interval, reps, due = r.unpack(_CARD)
+            cards[str(idx)] = [ease, interval, reps, due]
+        record['srs'] = cards
+        record['srs_queue'] = [list(r.unpack(_QUEUE_ENTRY)) for _ in range(r.u32())]
+    if r.version >= 3 and r.u8():
+        record['bank'] = r.u64()
+    return record
+
+
+def dumps(doc):
+    """Encode a rotation state or a student record."""
+    w = _Writer()
+    w.u8(CODEC_VERSION)
+    if 'answered' in doc:
+        w.u8(_TYPE_USER)
+        _write_user(w, doc)
+    else:
+        w.u8(_TYPE_ROTATION)
+        _write_rotation(w, doc)
+    return w.getvalue()
+
+
+def loads(data):
+    """Decode a blob written by dumps(). Text rows written before the binary
+    format (JSON) are still accepted."""
+    if isinstance(data, str):
+        return json.loads(data)
+    r = _Reader(data)
+    r.read_version()
+    kind = r.u8()
+    return _read_user(r) if kind == _TYPE_USER else _read_rotation(r)
+
+
+def dumps_snapshot(lesson_rotations, subject_class_rotations, mixed_rotation, layout=None):
+    """layout: (bank, [(lesson_id, digest, question ids)]) the state refers to."""
+    w = _Writer()
+    w.parts.append(SNAPSHOT_MAGIC)
+    w.u8(CODEC_VERSION)
+    _write_rotation_map(w, lesson_rotations)
+    _write_rotation_map(w, subject_class_rotations)
+    _write_optional_rotation(w, mixed_rotation)
+    w.u8(layout is not None)
+    if layout is not None:
+        bank, lessons = layout
+        w.u64(bank)
+        w.u32(len(lessons))
+        for lesson_id, digest, ids in lessons:
+            w.str(lesson_id)
+            w.u64(digest)
+            w.u32(len(ids))
+            w.parts.append(struct.pack(f'<{len(ids)}I', *ids))
+    return w.getvalue()
+
+
+def loads_snapshot(data):
+    """(lesson_rotations, subject_class_rotations, mixed_rotation or None,
+    layout or None)."""
+    if data[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        raise ValueError('not a rotation snapshot')
+    r = _Reader(data, len(SNAPSHOT_MAGIC))
+    r.read_version()
+    rotations = _read_rotation_map(r), _read_rotation_map(r), (_read_rotation(r) if r.u8() else None)
+    layout = None
+    if r.version >= 3 and r.u8():
+        bank = r.u64()
+        lessons = []
+        for _ in range(r.u32()):
+            lesson_id, digest = r.str(), r.u64()
+            n = r.u32()
+            lessons.append((lesson_id, digest, list(r.unpack(struct.Struct(f'<{n}I')))))
+        layout = (bank, lessons)
+    return rotations + (layout,)
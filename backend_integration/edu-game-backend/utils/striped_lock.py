@@ -0,0 +1,30 @@
+"""
+Striped re-entrant locks.
+
+A fixed array of RLocks indexed by hash(key), so work on different keys
+(students, lessons) rarely contends while memory stays constant no matter
+how many keys exist. Code that needs several stripes must take them through
+all() (ascending order) to stay deadlock-free.
+"""
+import threading
+from contextlib import ExitStack, contextmanager
+
+
+class StripedLock:
+    def __init__(self, stripes=64):
+        self._locks = [threading.RLock() for _ in range(max(1, int(stripes)))]
+
+    def __len__(self):
+        return len(self._locks)
+
+    def for_key(self, key):
+        """The lock guarding key; use it as a context manager."""
+        return self._locks[hash(key) % len(self._locks)]
+
+    @contextmanager
+    def all(self):
+        """Hold every stripe, e.g. for a consistent snapshot or a global reset."""
+        with ExitStack() as stack:
+            for lock in self._locks:
+                stack.enter_context(lock)
+            yield
@@ -0,0 +1,211 @@
+"""
+Bounded per-student state cache.
+
+Keeps the most recently used student records in memory and evicts the
+least recently used ones to a SQLite file once the resident budget is
+exceeded. Evicted students are reloaded transparently on their next request,
+so resident memory stays flat no matter how many distinct students show up.
+
+Callers that mutate a record across several statements wrap the work in
+hold(user_id); held records are never evicted, so another thread loading a
+different student cannot orphan (or serialise) a record mid-update.
+
+The store's lock only covers memory: evicted records are serialised under it
+and written to SQLite after it is released, so a slow disk write never stalls
+requests for students that are already resident.
+"""
+import json
+import sqlite3
+import threading
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+
+
+class UserStateStore:
+    def __init__(self, path, max_resident=5000, factory=dict, dumps=json.dumps, loads=json.loads):
+        """
+        path: SQLite file that holds evicted (and flushed) records
+        max_resident: how many student records may stay in memory
+        factory: builds an empty record for a student seen for the first time
+        dumps/loads: record codec (JSON unless given; bytes are stored as BLOBs)
+        """
+        self.path = path
+        self.max_resident = max(1, int(max_resident))
+        self.factory = factory
+        self.dumps = dumps
+        self.loads = loads
+        self._resident = OrderedDict()
+        self._dirty = set()
+        self._pins = Counter()
+        # Evicted or flushed records serialised but not yet committed:
+        # user_id -> (record, blob). Reads consult it before the database.
+        self._pending = {}
+        # _lock guards the in-memory state above and is never held across a
+        # database write; _write_lock orders writes (take it before _lock)
+        self._lock = threading.RLock()
+        self._write_lock = threading.RLock()
+        self._db = None
+        self._read_db = None
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=NORMAL')
+        db.execute('CREATE TABLE IF NOT EXISTS user_state (user_id TEXT PRIMARY KEY, state TEXT NOT NULL)')
+        return db
+
+    def _conn(self):
+        """Write connection; callers hold _write_lock."""
+        if self._db is None:
+            self._db = self._connect()
+        return self._db
+
+    def _load(self, user_id):
+        """Committed record; callers hold _lock (the read connection is its own)."""
+        if self._read_db is None:
+            self._read_db = self._connect()
+        row = self._read_db.execute(
+            'SELECT state FROM user_state WHERE user_id = ?', (user_id,)
+        ).fetchone()
+        return self.loads(row[0]) if row else None
+
+    def _upsert(self, rows):
+        db = self._conn()
+        with db:
+            db.executemany(
+                'INSERT INTO user_state (user_id, state) VALUES (?, ?) '
+                'ON CONFLICT(user_id) DO UPDATE SET state = excluded.state',
+                rows
+            )
+
+    def _stage(self, user_id):
+        """Serialise a modified record into _pending; callers hold _lock."""
+        record = self._resident[user_id]
+        self._pending[user_id] = (record, self.dumps(record))
+        self._dirty.discard(user_id)
+
+    def _evict_overflow(self):
+        """Drop the least recently used unpinned records; returns True when a
+        modified one was staged and the caller should _write_pending()."""
+        overflow = len(self._resident) - self.max_resident
+        if overflow <= 0:
+            return False
+        victims = []
+        for uid in self._resident:
+            if len(victims) >= overflow:
+                break
+            if uid not in self._pins:
+                victims.append(uid)
+        staged = False
+        for uid in victims:
+            if uid in self._dirty:
+                self._stage(uid)
+                staged = True
+            del self._resident[uid]
+        return staged
+
+    def _write_pending(self):
+        """Commit staged records outside _lock. Writers queue on _write_lock,
+        so a newer blob for a student is always committed after an older one."""
+        if not self._pending:
+            return
+        with self._write_lock:
+            with self._lock:
+                batch = dict(self._pending)
+            if not batch:
+                return
+            self._upsert([(uid, blob) for uid, (_, blob) in batch.items()])
+            with self._lock:
+                for uid, entry in batch.items():
+                    if self._pending.get(uid) is entry:
+                        del self._pending[uid]
+
+    def _fetch(self, user_id, create):
+        record = self._resident.get(user_id)
+        if record is not None:
+            self._resident.move_to_end(user_id)
+            return record
+        staged = self._pending.get(user_id)
+        record = staged[0] if staged else self._load(user_id)
+        if record is None:
+            if not create:
+                return None
+            record = self.factory()
+        self._resident[user_id] = record
+        return record
+
+    @contextmanager
+    def hold(self, user_id):
+        """Pin user_id's record in memory for the duration of the block."""
+        with self._lock:
+            self._pins[user_id] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._pins[user_id] -= 1
+                if self._pins[user_id] <= 0:
+                    del self._pins[user_id]
+                staged = self._evict_overflow()
+            if staged:
+                self._write_pending()
+
+    def get(self, user_id):
+        """Record for user_id (loaded or created) that the caller may mutate."""
+        with self._lock:
+            record = self._fetch(user_id, create=True)
+            self._dirty.add(user_id)
+            staged = self._evict_overflow()
+        if staged:
+            self._write_pending()
+        return record
+
+    def peek(self, user_id):
+        """Record for user_id for reading only, or None if the student is unknown."""
+        with self._lock:
+            record = self._fetch(user_id, create=False)
+            staged = self._evict_overflow()
+        if staged:
+            self._write_pending()
+        return record
+
+    def flush(self):
+        """Persist every modified resident record in one transaction."""
+        with self._write_lock:
+            with self._lock:
+                for uid in list(self._dirty):
+                    self._stage(uid)
+            self._write_pending()
+
+    def rewrite_all(self, batch=1000):
+        """Re-encode every stored record through loads/dumps, e.g. once loads
+        migrates records to a new meaning. Modified resident records are
+        flushed first; work is done in batches of rows."""
+        with self._write_lock:
+            self.flush()
+            db = self._conn()
+            last = 0
+            while True:
+                rows = db.execute(
+                    'SELECT rowid, user_id, state FROM user_state WHERE rowid > ? ORDER BY rowid LIMIT ?',
+                    (last, batch)
+                ).fetchall()
+                if not rows:
+                    return
+                last = rows[-1][0]
+                with db:
+                    db.executemany('UPDATE user_state SET state = ? WHERE user_id = ?',
+                                   [(self.dumps(self.loads(state)), uid) for _, uid, state in rows])
+
+    def resident_count(self):
+        return len(self._resident)
+
+    def clear(self):
+        """Drop all records, resident and on disk."""
+        with self._write_lock, self._lock:
+            self._resident.clear()
+            self._dirty.clear()
+            self._pending.clear()
+            db = self._conn()
+            with db:
+                db.execute('DELETE FROM user_state')
@@ -0,0 +1,114 @@
+"""
+Write-behind buffer for additive counters.
+
+add() folds a delta ({'xp': 10, 'tokens': 1}) into the student's pending
+entry in memory and returns immediately; a background thread writes every
+pending entry in one batch when the flush interval elapses or when
+max_pending students are waiting, and flush() can be called at any time
+(e.g. at shutdown). Ten answers in a minute become one row write.
+
+Readers get read-your-writes through read(): it pairs the stored record
+with the student's pending deltas so that an increment is never counted
+twice or missed while a flush is writing it. Only that student's reader
+waits, and only while their own entry is being written; everything else
+reads without touching the flush lock. The buffer is per process: another
+worker sees a student's new rewards only after they are flushed, i.e. up to
+the flush interval late. Deltas not yet flushed are lost if the process
+dies; the window is the same.
+"""
+import threading
+
+
+def _merge(into, deltas):
+    for field, value in deltas.items():
+        into[field] = into.get(field, 0) + value
+
+
+class WriteBehindBuffer:
+    def __init__(self, apply_batch, flush_interval=2.0, max_pending=500, name='write-behind'):
+        """
+        apply_batch: callable({key: {field: delta}}) that persists one batch
+        flush_interval: seconds between background flushes
+        max_pending: pending keys that trigger an early flush
+        """
+        self.apply_batch = apply_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.name = name
+        self._pending = {}
+        self._inflight = {}    # the batch a flush is writing right now
+        self._taken = 0        # batches taken so far; read() retries when it moves
+        self._lock = threading.Lock()            # guards the three above
+        self._commit_lock = threading.RLock()    # one flush at a time
+        self._wake = threading.Event()
+        self._thread = None
+
+    def add(self, key, **deltas):
+        with self._lock:
+            _merge(self._pending.setdefault(key, {}), deltas)
+            due = len(self._pending) >= self.max_pending
+        self._start()
+        if due:
+            self._wake.set()
+
+    def flush(self):
+        """Persist everything buffered so far; returns the number of keys written."""
+        with self._commit_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                if not batch:
+                    return 0
+                self._inflight = batch
+                self._taken += 1
+            try:
+                self.apply_batch(batch)
+            except Exception:
+                with self._lock:
+                    # put the deltas back in front of anything added meanwhile
+                    for key, deltas in self._pending.items():
+                        _merge(batch.setdefault(key, {}), deltas)
+                    self._pending = batch
+                    self._inflight = {}
+                raise
+            with self._lock:
+                self._inflight = {}
+            return len(batch)
+
+    def read(self, key, load):
+        """Return (load(), unflushed deltas for key) as one consistent pair:
+        add the deltas on top of the stored record. load() runs without any
+        buffer lock held; if a flush took key's entry meanwhile it runs again."""
+        while True:
+            with self._lock:
+                busy = key in self._inflight
+                taken = self._taken
+                deltas = dict(self._pending.get(key, ()))
+            if busy:
+                with self._commit_lock:   # wait for key's batch to land
+                    pass
+                continue
+            value = load()
+            with self._lock:
+                if not deltas or self._taken == taken:
+                    return value, deltas
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                pass  # deltas were put back; the next round retries
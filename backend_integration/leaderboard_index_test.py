@@ -0,0 +1,75 @@
+import sys, os, tempfile, random, time
+sys.path.append('edu-game-backend')
+from utils.leaderboard_index import RankedSkipList
+
+# 1. Skiplist ranks and prefixes match a sorted list under random churn
+rng = random.Random(7)
+skiplist, model = RankedSkipList(seed=1), []
+for step in range(20000):
+    if model and rng.random() < 0.4:
+        key = model.pop(rng.randrange(len(model)))
+        skiplist.remove(key)
+    else:
+        key = (rng.randrange(-500, 0), f's{step}')
+        skiplist.insert(key)
+        model.append(key)
+    if step % 500 == 0:
+        model.sort()
+        assert len(skiplist) == len(model)
+        assert skiplist.first(25) == model[:25]
+        for key in rng.sample(model, min(50, len(model))):
+            assert skiplist.rank(key) == model.index(key) + 1
+model.sort()
+assert all(skiplist.rank(key) == i + 1 for i, key in enumerate(model))
+bulk = RankedSkipList(model, seed=2)
+bulk.insert((-250, 'late')); bulk.remove(model[0])
+model = sorted(model[1:] + [(-250, 'late')])
+assert bulk.first(len(model)) == model and all(bulk.rank(key) == i + 1 for i, key in enumerate(model))
+print('skiplist matches sorted order after 20000 random updates')
+
+# 2. The route serves the same board the old full sort produced
+tmp = tempfile.mkdtemp(prefix='leaderboard_')
+os.environ['PROGRESS_DB'] = os.path.join(tmp, 'student_progress.db')
+sys.path.append('edu-game-backend/data')
+from app import create_app
+from routes import duolingo_api as api
+client = create_app().test_client()
+STUDENTS = 100000
+conn = api.PROGRESS._conn()
+conn.execute('BEGIN')
+conn.executemany('INSERT INTO student_progress (student_id, doc, rev) VALUES (?, ?, 0)', (
+    (f'bulk{i}', api.json.dumps(dict(api.new_student_progress(), xp=rng.randrange(0, 5000))))
+    for i in range(STUDENTS)))
+conn.execute('COMMIT')
+t = time.perf_counter()
+api.refresh_leaderboard()
+print(f'index built for {STUDENTS} students in {time.perf_counter() - t:.2f}s')
+
+for i in range(300):
+    api.update_student_progress(f'bulk{rng.randrange(STUDENTS)}', rng.choice([10, 15, 25]), 1, None)
+api.update_student_progress('newcomer', 25, 3, None)
+api.REWARDS.flush()
+# A write from another process only shows up in the store, never in this index directly
+other = api.ProgressStore(api.PROGRESS_DB)
+with other.transaction('elsewhere', api.new_student_progress) as doc:
+    doc['xp'] = 99999
+
+everyone = sorted(((-d['xp'], sid) for sid, d in api.PROGRESS.items()))
+r = client.get('/api/duolingo/leaderboard')
+assert r.json['total_students'] == len(api.PROGRESS) == len(everyone), r.json['total_students']
+assert [(e['rank'], e['student_id']) for e in r.json['leaderboard']] == [(i + 1, sid) for i, (_, sid) in enumerate(everyone[:20])]
+assert r.json['leaderboard'][0]['student_id'] == 'elsewhere'
+position = {sid: i + 1 for i, (_, sid) in enumerate(everyone)}
+for sid in ['newcomer', 'elsewhere'] + [f'bulk{rng.randrange(STUDENTS)}' for _ in range(50)]:
+    r = client.get(f'/api/duolingo/leaderboard/rank/{sid}')
+    assert r.json['entry']['rank'] == position[sid], (sid, r.json)
+assert client.get('/api/duolingo/leaderboard/rank/nobody').status_code == 404
+
+def per_request(path, n=200):
+    t = time.perf_counter()
+    for _ in range(n):
+        client.get(path)
+    return (time.perf_counter() - t) / n
+print(f'{STUDENTS} students: top-20 {per_request("/api/duolingo/leaderboard") * 1000:.2f} ms, '
+      f'my rank {per_request("/api/duolingo/leaderboard/rank/newcomer") * 1000:.2f} ms per request')
+print('Leaderboard OK')
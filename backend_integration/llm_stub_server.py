@@ -0,0 +1,126 @@
+"""
+Local stand-in for the Groq/OpenAI chat completions API, for the AI tests.
+
+    stub = LLMStub(delay=0.05).start()
+    gateway = AIGateway(stub.url, 'test-key', 'stub-model')
+    ...
+    stub.stop()
+
+Replies are built by reply(payload) -> content string (JSON for
+response_format json_object requests by default); "stream": true requests
+get the reply word by word as chat.completion.chunk events, token_delay
+seconds apart. The stub counts requests,
+TCP connections and the peak number of requests in flight; fail_next(n)
+makes the next n requests return status (503 by default).
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def default_reply(payload):
+    prompt = payload['messages'][-1]['content']
+    if payload.get('response_format', {}).get('type') == 'json_object':
+        return json.dumps({'hint': 'stub hint', 'wrong_option_explanation': 'stub analysis',
+                           'contrast_with_correct': 'stub contrast', 'prompt_chars': len(prompt)})
+    return 'stub reply (%d chars)' % len(prompt)
+
+
+class LLMStub:
+    def __init__(self, delay=0.0, reply=default_reply, token_delay=0.0):
+        self.delay = delay
+        self.token_delay = token_delay
+        self.reply = reply
+        self.requests = 0
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.payloads = []
+        self._failures = []
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:%d/v1/chat/completions' % self._server.server_address[1]
+
+    def fail_next(self, count, status=503, retry_after=None):
+        with self._lock:
+            self._failures.extend([(status, retry_after)] * count)
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'   # keep-alive
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with stub._lock:
+                    stub.requests += 1
+                    stub.payloads.append(payload)
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    failure = stub._failures.pop(0) if stub._failures else None
+                try:
+                    time.sleep(stub.delay)
+                    if failure is None and payload.get('stream'):
+                        self._stream(stub.reply(payload))
+                        return
+                    if failure:
+                        status, retry_after = failure
+                        body = b'{"error": "stub failure"}'
+                        self.send_response(status)
+                        if retry_after is not None:
+                            self.send_header('Retry-After', str(retry_after))
+                    else:
+                        body = json.dumps({'choices': [{'message': {
+                            'role': 'assistant', 'content': stub.reply(payload)}}]}).encode()
+                        self.send_response(200)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass   # the client gave up (deadline tests)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def _stream(self, reply):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                words = reply.split(' ')
+                frames = [{'choices': [{'delta': {'role': 'assistant'}}]}]
+                frames += [{'choices': [{'delta': {'content': word + (' ' if i < len(words) - 1 else '')}}]}
+                           for i, word in enumerate(words)]
+                for i, frame in enumerate(frames):
+                    if i > 1:
+                        time.sleep(stub.token_delay)
+                    self._chunk(('data: %s\n\n' % json.dumps(frame)).encode())
+                self._chunk(b'data: [DONE]\n\n')
+                self._chunk(b'')
+
+            def _chunk(self, data):
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+                self.wfile.flush()
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,61 @@
+import sys, os, tempfile, time
+sys.path.append('edu-game-backend')
+from llm_stub_server import LLMStub
+from services.ai_gateway import AIGateway
+from services.ai_service import AIService
+from utils.response_cache import ResponseCache
+
+tmp = tempfile.mkdtemp(prefix='response_cache_')
+db = os.path.join(tmp, 'ai_cache.db')
+stub = LLMStub(delay=0.05).start()
+gateway = AIGateway(stub.url, 'test-key', 'stub-model')
+question = {'text': 'What is the boiling point of water?', 'options': ['50 C', '100 C', '0 C', '25 C'],
+            'correct': 1, 'concept': 'Heat', 'explanation': 'Water boils at 100 C at sea level.'}
+
+# 1. First request calls the LLM; every repeat (any student, any AIService) is a cache hit
+service = AIService(gateway, cache=ResponseCache(db))
+first = service.get_rich_hint(question, selected_option=0)
+assert first['source'] == 'ai' and stub.requests == 1
+other = AIService(gateway, cache=service.cache)
+start = time.perf_counter()
+for _ in range(1000):
+    assert other.get_rich_hint(question, selected_option=0) == first
+hit_us = (time.perf_counter() - start) / 1000 * 1e6
+assert stub.requests == 1
+hit = other.get_rich_hint(question, selected_option=0)
+hit['steps'].append('mutated')
+assert other.get_rich_hint(question, selected_option=0) == first   # callers get their own copy
+
+# 2. Different inputs or a different model are different entries
+service.get_rich_hint(question, selected_option=2)
+service.get_wrong_answer_analysis(question, 0)
+assert stub.requests == 3
+service.get_wrong_answer_analysis(question, 0)
+assert stub.requests == 3
+AIService(AIGateway(stub.url, 'test-key', 'other-model'), cache=service.cache).get_rich_hint(question, selected_option=0)
+assert stub.requests == 4
+
+# 3. Another process (new cache on the same file) is served from the SQLite tier
+fresh = AIService(gateway, cache=ResponseCache(db))
+assert fresh.get_rich_hint(question, selected_option=0) == first and fresh.get_wrong_answer_analysis(question, 0)['source'] == 'ai'
+assert stub.requests == 4 and len(fresh.cache) == 4
+
+# 4. A version bump or an expired entry means a new LLM call
+bumped = AIService(gateway, cache=ResponseCache(db, version=2))
+bumped.get_rich_hint(question, selected_option=0)
+assert stub.requests == 5
+assert len(ResponseCache(db, version=2)) == 1   # version 1 rows purged on open
+short = AIService(gateway, cache=ResponseCache(None, ttl=0.05))
+short.get_rich_hint(question, selected_option=0)
+time.sleep(0.1)
+short.get_rich_hint(question, selected_option=0)
+assert stub.requests == 7
+
+# 5. Fallbacks are not cached: the next request tries the LLM again
+stub.fail_next(1, status=400)
+cold = AIService(gateway, cache=ResponseCache(None))
+assert cold.get_rich_hint(question, selected_option=3)['source'] == 'fallback'
+assert cold.get_rich_hint(question, selected_option=3)['source'] == 'ai'
+assert stub.requests == 9
+stub.stop()
+print('Response cache OK: repeat rich hint %.1f us without an LLM call (LLM %d ms)' % (hit_us, stub.delay * 1000))
@@ -0,0 +1,122 @@
+import sys, os, tempfile, threading, time
+sys.path.append('edu-game-backend')
+sys.path.append('edu-game-backend/data')
+tmp = tempfile.mkdtemp(prefix='rich_tutoring_')
+os.environ['PROGRESS_DB'] = os.path.join(tmp, 'student_progress.db')
+import ncert_questions as nq
+nq.STATE_FILE = os.path.join(tmp, 'question_state.snap')
+nq.JOURNAL_FILE = os.path.join(tmp, 'question_state.journal')
+nq.LEGACY_STATE_FILE = os.path.join(tmp, 'question_state.json')
+nq.USER_STATE = nq._open_user_state(os.path.join(tmp, 'user_state.db'), 100)
+from app import create_app
+from routes import duolingo_api as api
+from services.tutoring_jobs import TutoringJobs
+client = create_app().test_client()
+
+LLM_DELAY = 0.5   # seconds per call; both calls are serial for a wrong answer
+class SlowAIService:
+    def get_rich_hint(self, question_data, user_attempt=None, selected_option=None):
+        time.sleep(LLM_DELAY)
+        return {'hint': 'think about ' + question_data['concept']}
+    def get_wrong_answer_analysis(self, question_data, selected_option):
+        time.sleep(LLM_DELAY)
+        return {'why_wrong': 'option %d' % selected_option}
+
+api.TUTORING = TutoringJobs(SlowAIService, workers=4)
+
+LESSON = 'heat-class7'
+question = nq.find_question(1, LESSON)[1]
+def check(student, wrong=True):
+    return client.post('/api/duolingo/answer/check', json={
+        'student_id': student, 'lesson_id': LESSON, 'question_id': question['id'],
+        'selected_option': (question['correct'] + 1) % 4 if wrong else question['correct'],
+        'rich_explanation': True})
+
+# 1. The grade comes back at once with a ticket, while the LLM is still working
+latencies = []
+tickets = []
+for i in range(40):
+    start = time.perf_counter()
+    r = client.post('/api/duolingo/answer/check', json={
+        'student_id': 'async-%d' % i, 'lesson_id': LESSON, 'question_id': question['id'],
+        'selected_option': question['correct'], 'rich_explanation': True})
+    latencies.append(time.perf_counter() - start)
+    assert r.status_code == 200 and r.json['correct'] and 'rich_tutoring' not in r.json, r.json
+    tickets.append(r.json['tutoring_ticket'])
+latencies.sort()
+p99 = latencies[int(len(latencies) * 0.99) - 1]
+assert p99 < LLM_DELAY / 10, p99
+
+# 2. Polling: 202 while pending, then the tutoring content
+r = check('poller')
+ticket = r.json['tutoring_ticket']
+assert r.json['tutoring_url'] == '/api/duolingo/tutoring/' + ticket
+r = client.get('/api/duolingo/tutoring/' + ticket)
+assert r.status_code == 202 and r.json['status'] == 'pending', r.json
+deadline = time.time() + 30
+while r.status_code == 202 and time.time() < deadline:
+    time.sleep(0.05)
+    r = client.get('/api/duolingo/tutoring/' + ticket)
+assert r.status_code == 200 and r.json['status'] == 'done', r.json
+assert r.json['rich_tutoring'] == {'hint': 'think about ' + question['concept']}
+assert 'why_wrong' in r.json['wrong_analysis']
+
+# 3. SSE: one 'done' event once the job finishes
+r = client.get('/api/duolingo/tutoring/' + check('streamer').json['tutoring_ticket'] + '/stream')
+assert r.mimetype == 'text/event-stream'
+body = r.get_data(as_text=True)
+assert body.startswith('event: done\n') and '"rich_tutoring"' in body and '"wrong_analysis"' in body, body
+
+# 4. Correct answers skip the wrong-answer analysis; failures are reported, not raised
+for t in tickets:
+    job = api.TUTORING.wait(t, 30)
+    assert job['status'] == 'done' and 'wrong_analysis' not in job, job
+class BrokenAIService:
+    def get_rich_hint(self, *args, **kwargs):
+        raise RuntimeError('LLM unavailable')
+api.TUTORING = TutoringJobs(BrokenAIService, workers=1)
+ticket = check('broken').json['tutoring_ticket']
+assert api.TUTORING.wait(ticket, 5) == {'status': 'error', 'error': 'LLM unavailable'}
+assert client.get('/api/duolingo/tutoring/' + ticket).status_code == 200
+assert client.get('/api/duolingo/tutoring/unknown').status_code == 404
+assert client.get('/api/duolingo/tutoring/unknown/stream').status_code == 404
+
+# 5. Finished tickets expire after the TTL; the table is bounded
+jobs = TutoringJobs(SlowAIService, workers=1, ttl=0, max_tickets=3)
+first = jobs.submit(question, is_correct=True)
+jobs.wait(first, 5)
+time.sleep(0.01)
+for _ in range(5):
+    jobs.submit(question, is_correct=True)
+assert jobs.get(first) is None and len(jobs._jobs) == 3
+
+# 6. Past max_pending queued jobs, new requests are shed instead of queued
+jobs = TutoringJobs(SlowAIService, workers=1, max_pending=2)
+queued = [jobs.submit(question, is_correct=True) for _ in range(3)]
+assert queued[0] and queued[1] and queued[2] is None
+for t in queued[:2]:
+    jobs.wait(t, 5)
+assert jobs.submit(question, is_correct=True)
+api.TUTORING = TutoringJobs(SlowAIService, workers=1, max_pending=0)
+r = check('shed')
+assert r.status_code == 200 and r.json['tutoring_busy'] and 'tutoring_ticket' not in r.json, r.json
+
+# 7. A slow service build (artifact load) does not hold up submit() or get()
+loading, loaded = threading.Event(), threading.Event()
+def slow_factory():
+    loading.set()
+    loaded.wait(10)
+    return SlowAIService()
+jobs = TutoringJobs(slow_factory, workers=1)
+first = jobs.submit(question, is_correct=True)
+assert loading.wait(5)
+tickets = []
+submitter = threading.Thread(target=lambda: tickets.append(jobs.submit(question, is_correct=True)))
+submitter.start()
+submitter.join(1)
+assert tickets, 'submit() waited for the service build'
+second = tickets[0]
+assert jobs.get(first)['status'] == 'pending' and jobs.get(second)['status'] == 'pending'
+loaded.set()
+assert jobs.wait(first, 5)['status'] == jobs.wait(second, 5)['status'] == 'done'
+print('Rich tutoring OK: answer check p99 %.1f ms while the LLM takes %d ms per call' % (p99 * 1000, LLM_DELAY * 1000))
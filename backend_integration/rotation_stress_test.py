@@ -0,0 +1,126 @@
+import sys, os, tempfile, threading
+sys.path.append('edu-game-backend')
+sys.path.append('edu-game-backend/data')
+import ncert_questions as nq
+
+# Keep the stress run away from the real state files
+tmp = tempfile.mkdtemp(prefix='rotation_stress_')
+nq.STATE_FILE = os.path.join(tmp, 'question_state.snap')
+nq.JOURNAL_FILE = os.path.join(tmp, 'question_state.journal')
+nq.LEGACY_STATE_FILE = os.path.join(tmp, 'question_state.json')
+# Small resident budget so students are evicted and reloaded while others run
+nq.USER_STATE = nq._open_user_state(os.path.join(tmp, 'user_state.db'), 8)
+nq.reset_question_rotations()
+sys.setswitchinterval(1e-5)  # force frequent thread switches
+
+MIXED_TOTAL = nq.get_mixed_status()['total']
+STUDENTS = 24
+SHARED_THREADS = 8
+errors = []
+
+def run(fn, *args):
+    try:
+        fn(*args)
+    except Exception as e:
+        errors.append(repr(e))
+
+def drain(fetch):
+    seen = []
+    while True:
+        batch = fetch()
+        if not batch:
+            return seen
+        seen.extend(q['key'] for q in batch)
+
+# 1. One thread per student: full no-repeat cycle plus answer tracking
+per_student = {}
+def student_worker(uid):
+    seen = drain(lambda: nq.get_user_mixed_questions(uid, 3))
+    for key in seen[:10]:
+        lesson_id, qid = key.rsplit(':', 1)
+        nq.update_answer_tracking(uid, lesson_id, int(qid), int(qid) % 2 == 0)
+    per_student[uid] = seen
+
+# 2. Several threads drawing from the same student's rotation
+shared = []
+def shared_worker():
+    shared.extend(drain(lambda: nq.get_user_mixed_questions('shared', 2)))
+
+# 3. Several threads drawing from one global lesson rotation
+lesson_seen = []
+def lesson_worker():
+    lesson_seen.extend(drain(lambda: nq.get_questions_by_lesson('light-class6', 1)))
+
+# 4. Compaction running concurrently with everything above
+stop = threading.Event()
+def compactor():
+    while not stop.is_set():
+        nq.save_question_state()
+
+threads = [threading.Thread(target=run, args=(student_worker, f'stress{i}')) for i in range(STUDENTS)]
+threads += [threading.Thread(target=run, args=(shared_worker,)) for _ in range(SHARED_THREADS)]
+threads += [threading.Thread(target=run, args=(lesson_worker,)) for _ in range(4)]
+bg = threading.Thread(target=run, args=(compactor,))
+bg.start()
+for t in threads:
+    t.start()
+for t in threads:
+    t.join()
+stop.set()
+bg.join()
+
+assert not errors, errors
+for uid, seen in per_student.items():
+    assert len(seen) == len(set(seen)) == MIXED_TOTAL, (uid, len(seen), len(set(seen)))
+    assert nq.get_user_mixed_status(uid)['exhausted'], uid
+    assert len(nq.get_review_items(uid)) == 10, (uid, len(nq.get_review_items(uid)))
+assert len(shared) == len(set(shared)) == MIXED_TOTAL, (len(shared), len(set(shared)))
+assert len(lesson_seen) == len(set(lesson_seen)) == 7, lesson_seen
+assert nq.USER_STATE.resident_count() <= 8, nq.USER_STATE.resident_count()
+
+# 5. State written under load restores to the same per-student progress
+nq.save_question_state()
+nq.USER_STATE = nq._open_user_state(os.path.join(tmp, 'user_state.db'), 8)
+nq.load_question_state()
+for uid in per_student:
+    assert nq.get_user_mixed_status(uid)['remaining'] == 0, uid
+    assert len(nq.get_review_items(uid)) == 10, uid
+
+# 6. A slow SQLite write while evicting never blocks students already in
+# memory, and the evicted record is kept staged until it is committed
+from utils.user_state_store import UserStateStore
+store = UserStateStore(os.path.join(tmp, 'slow_disk.db'), 2)
+store.get('a')['n'] = 1
+store.get('b')['n'] = 2
+upsert, writing, release = store._upsert, threading.Event(), threading.Event()
+def slow_upsert(rows):
+    writing.set()
+    release.wait(5)
+    upsert(rows)
+store._upsert = slow_upsert
+evictor = threading.Thread(target=store.get, args=('c',))   # evicts 'a'
+evictor.start()
+assert writing.wait(5)
+reader = threading.Thread(target=lambda: store.get('b').update(n=3))
+reader.start(); reader.join(1)
+assert not reader.is_alive() and store._pending['a'][0] == {'n': 1}
+release.set(); evictor.join()
+assert not store._pending and UserStateStore(store.path).peek('a') == {'n': 1}
+
+# 7. Resetting an exhausted lesson only takes that lesson's stripe
+stripe = nq._ROTATION_LOCKS.for_key(('lesson', 'heat-class7'))
+busy = next(nq._ROTATION_LOCKS.for_key(('lesson', lid)) for lid in nq.NCERT_QUESTION_DATABASE
+            if nq._ROTATION_LOCKS.for_key(('lesson', lid)) is not stripe)
+held, release = threading.Event(), threading.Event()
+def holder():
+    with busy:
+        held.set()
+        release.wait(5)
+t = threading.Thread(target=holder); t.start(); held.wait(5)
+resetter = threading.Thread(target=nq.reset_question_rotations, kwargs={'scope': 'lesson', 'lesson_id': 'heat-class7'})
+resetter.start(); resetter.join(1)
+assert not resetter.is_alive()
+release.set(); t.join()
+
+print('Stress OK:', STUDENTS, 'students,', SHARED_THREADS, 'threads on one student,',
+      len(per_student) * MIXED_TOTAL + len(shared) + len(lesson_seen), 'questions served, no repeats')
@@ -0,0 +1,49 @@
+import sys, os, tempfile, multiprocessing
+# Several worker processes on one SQLite rotation store must never serve a
+# question twice within a cycle, whichever worker handles the request.
+sys.path.append('edu-game-backend')
+sys.path.append('edu-game-backend/data')
+
+WORKERS = 4
+
+def worker(n, start, out):
+    import ncert_questions as nq
+    start.wait()  # all workers imported; now race for the same rotations
+    served = {'student': [], 'lesson': []}
+    while True:
+        student = nq.get_user_mixed_questions('shared-student', 2)
+        lesson = nq.get_questions_by_lesson('light-class6', 1)
+        if not student and not lesson:
+            break
+        served['student'] += [q['key'] for q in student]
+        served['lesson'] += [q['key'] for q in lesson]
+    if n == 0:
+        nq.update_answer_tracking('shared-student', 'light-class6', 1, False)
+    out.put(served)
+
+if __name__ == '__main__':
+    # Set before any import of ncert_questions; spawned workers inherit it
+    os.environ['ROTATION_BACKEND'] = 'sqlite'
+    os.environ['SHARED_STATE_DB'] = os.path.join(tempfile.mkdtemp(prefix='shared_rotation_'), 'shared_state.db')
+    ctx = multiprocessing.get_context('spawn')
+    out, start = ctx.Queue(), ctx.Barrier(WORKERS)
+    procs = [ctx.Process(target=worker, args=(n, start, out)) for n in range(WORKERS)]
+    for p in procs:
+        p.start()
+    results = [out.get() for _ in procs]
+    for p in procs:
+        p.join()
+    import ncert_questions as nq
+    student = [k for r in results for k in r['student']]
+    lesson = [k for r in results for k in r['lesson']]
+    print('Per worker:', [len(r['student']) for r in results])
+    assert len(student) == len(set(student)) == nq.get_mixed_status()['total'], len(student)
+    assert len(lesson) == len(set(lesson)) == 7, lesson
+    assert nq.get_user_mixed_status('shared-student')['exhausted']
+    assert nq.get_lesson_status('light-class6')['exhausted']
+    assert [r['was_wrong'] for r in nq.get_review_items('shared-student')] == [True]
+    nq.reset_user_rotations('shared-student')
+    nq.reset_question_rotations('lesson', lesson_id='light-class6')
+    assert nq.get_user_mixed_status('shared-student')['remaining'] == len(student)
+    assert nq.get_lesson_status('light-class6')['remaining'] == 7
+    print('Shared rotation OK:', WORKERS, 'processes,', len(student) + len(lesson), 'questions, no repeats')
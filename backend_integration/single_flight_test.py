@@ -0,0 +1,67 @@
+import sys, os, tempfile, threading, time
+sys.path.append('edu-game-backend')
+sys.path.append('edu-game-backend/data')
+from llm_stub_server import LLMStub
+stub = LLMStub(delay=0.3).start()
+tmp = tempfile.mkdtemp(prefix='single_flight_')
+os.environ.update(PROGRESS_DB=os.path.join(tmp, 'student_progress.db'), HINT_CACHE_DB=os.path.join(tmp, 'ai_cache.db'),
+                  TUTORING_ARTIFACT=os.path.join(tmp, 'none.json.gz'),
+                  GROQ_API_URL=stub.url, GROQ_API_KEY='test-key', GROQ_MODEL='stub-model')
+from services.ai_gateway import AIGateway
+from utils.single_flight import SingleFlight
+from app import create_app
+client = create_app().test_client()
+
+def burst(n, fn):
+    results = [None] * n
+    def run(i):
+        results[i] = fn(i)
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    return results
+
+# 1. A class of 40 asking for the same hint at once: one upstream call per endpoint
+hint = {'lesson_id': 'heat-class7', 'question_id': 3}
+before = stub.requests
+results = burst(40, lambda i: client.post('/api/duolingo/hint/ai', json=hint).json)
+assert all(r['success'] and r['source'] == 'ai' for r in results) and len({r['hint'] for r in results}) == 1
+assert stub.requests - before == 1, stub.requests - before
+before = stub.requests
+results = burst(40, lambda i: client.post('/api/ai/hint', json={'question_id': 1}).json)
+assert all(r['success'] for r in results) and stub.requests - before == 1, stub.requests - before
+before = stub.requests
+results = burst(40, lambda i: client.post('/api/duolingo/hint/ai', json=dict(hint, mode='rich', selected_option=0)).json)
+assert all(r['source'] == 'ai' for r in results) and stub.requests - before == 1
+
+# 2. Gateway: whitespace-only differences coalesce, different prompts do not, nothing is cached
+gateway = AIGateway(stub.url, 'test-key', 'stub-model', max_concurrency=8)
+before = stub.requests
+results = burst(20, lambda i: gateway.chat([{'role': 'user', 'content': 'explain  heat' + ' \n' * (i % 3)}]))
+assert all(r['success'] for r in results) and stub.requests - before == 1
+before = stub.requests
+burst(6, lambda i: gateway.chat([{'role': 'user', 'content': 'question %d' % (i % 3)}]))
+assert stub.requests - before == 3
+before = stub.requests
+gateway.chat([{'role': 'user', 'content': 'explain heat'}])
+assert stub.requests - before == 1
+
+# 3. Failures are shared too, and a waiter still honours its own deadline
+stub.fail_next(1, status=400)
+results = burst(10, lambda i: gateway.chat([{'role': 'user', 'content': 'will fail'}]))
+assert all(r == {'success': False, 'error': 'AI API returned 400'} for r in results), results
+results = burst(2, lambda i: (time.sleep(0.05 * i), gateway.chat([{'role': 'user', 'content': 'slow'}], deadline=[5, 0.1][i]))[1])
+assert results[0]['success'] and results[1] == {'success': False, 'error': 'AI deadline exceeded'}, results
+
+# 4. SingleFlight on its own
+flights = SingleFlight()
+calls = []
+def work():
+    calls.append(1)
+    time.sleep(0.1)
+    return 'value'
+results = burst(10, lambda i: flights.do('k', work))
+assert len(calls) == 1 and sorted(shared for _, shared in results) == [False] + [True] * 9
+assert flights.in_flight() == 0
+stub.stop()
+print('Single-flight OK: 40 concurrent identical hint requests -> 1 upstream call per endpoint')
@@ -0,0 +1,71 @@
+import sys, os, copy, struct, tempfile, time
+sys.path.append('edu-game-backend')
+sys.path.append('edu-game-backend/data')
+import ncert_questions as nq
+from utils import state_codec
+
+tmp = tempfile.mkdtemp(prefix='snapshot_restore_')
+nq.STATE_FILE = os.path.join(tmp, 'question_state.snap')
+nq.JOURNAL_FILE = os.path.join(tmp, 'question_state.journal')
+nq.LEGACY_STATE_FILE = os.path.join(tmp, 'question_state.json')
+DB = os.path.join(tmp, 'user_state.db')
+nq.USER_STATE = nq._open_user_state(DB, 60000)
+nq.reset_question_rotations()
+USERS = 50000
+
+# Every scope: global lesson/subject/mixed, per-user lesson, subject/class
+# (incl. adaptive subsets), mixed, answer bitmaps and SM-2 cards
+t = time.time()
+nq.fetch_lesson_questions('light-class6', 3, ['easy'])
+nq.get_questions_by_subject_class('maths', 7, 4)
+nq.get_mixed_questions(5)
+for i in range(USERS):
+    uid = f'u{i}'
+    nq.get_user_mixed_questions(uid, 1 + i % 4)
+    if i % 3 == 0:
+        nq.get_user_subject_class_questions(uid, 'science', 6 + i % 5, 2)
+    if i % 5 == 0:
+        nq.get_user_lesson_questions(uid, 'heat-class7', 2)
+        nq.update_answer_tracking(uid, 'heat-class7', 1 + i % 5, i % 2 == 0)
+        nq.update_answer_tracking(uid, 'heat-class7', 2, False)
+        nq.adaptive_reset_user_lesson(uid, 'heat-class7')
+print(f'built {USERS} users in {time.time() - t:.1f}s')
+
+expected_users = {f'u{i}': copy.deepcopy(nq.USER_STATE.peek(f'u{i}')) for i in range(0, USERS, 97)}
+expected_global = (copy.deepcopy(dict(nq._LESSON_ROTATIONS)), copy.deepcopy(dict(nq._SUBJECT_CLASS_ROTATIONS)),
+                   copy.deepcopy(dict(nq._MIXED_ROTATION)))
+t = time.time()
+nq.save_question_state()
+print(f'saved in {time.time() - t:.2f}s, snapshot {os.path.getsize(nq.STATE_FILE)} bytes, '
+      f'user db {os.path.getsize(DB)} bytes')
+
+# Cold start: fresh process state, restore, then touch students on demand
+nq._LESSON_ROTATIONS.clear(); nq._SUBJECT_CLASS_ROTATIONS.clear(); nq._MIXED_ROTATION.clear()
+nq.USER_STATE = nq._open_user_state(DB, 5000)
+t = time.time()
+nq.load_question_state()
+restore = time.time() - t
+t = time.time()
+for uid, record in expected_users.items():
+    assert nq.USER_STATE.peek(uid) == record, uid
+touch = (time.time() - t) / len(expected_users)
+assert (dict(nq._LESSON_ROTATIONS), dict(nq._SUBJECT_CLASS_ROTATIONS), dict(nq._MIXED_ROTATION)) == expected_global
+assert restore < 1.0, restore
+print(f'restore {restore * 1000:.1f} ms for {USERS} users; first access {touch * 1e6:.0f} us/student')
+
+# Exact round trip of values JSON could not carry (huge bitmaps, 64-bit seeds)
+record = nq._new_user_record()
+record['answered'] = (1 << 200000) | 12345
+record['wrong'] = 1 << 199999
+record['mixed'] = {'seed': (1 << 64) - 1, 'cycle': 7, 'cursors': {'easy': 3}, 'subset': {'easy': [4, 1]}}
+assert state_codec.loads(state_codec.dumps(record)) == record
+
+# Keys longer than 64 KiB encode too (u16 lengths used to break eviction)
+record['subject_class']['x' * 70000] = {'seed': 1, 'cycle': 0, 'cursors': {'easy': 1}}
+assert state_codec.loads(state_codec.dumps(record)) == record
+snapshot = state_codec.dumps_snapshot({'y' * 70000: record['mixed']}, {}, None)
+assert state_codec.loads_snapshot(snapshot) == ({'y' * 70000: record['mixed']}, {}, None, None)
+# Version 1 blobs (u16 string lengths) are still readable
+v1 = bytes([1, 1]) + struct.pack('<QII', 9, 2, 1) + struct.pack('<H', 4) + b'easy' + struct.pack('<IB', 3, 0)
+assert state_codec.loads(v1) == {'seed': 9, 'cycle': 2, 'cursors': {'easy': 3}}
+print('Snapshot OK: every scope round-trips exactly')
@@ -0,0 +1,47 @@
+import sys, os, json, subprocess, tempfile
+# A crash after a student's record was evicted to SQLite leaves answer events
+# in the journal that the record already reflects. Replaying them on restart
+# (once or several times) must not reschedule the SM-2 cards again.
+sys.path.append('edu-game-backend')
+sys.path.append('edu-game-backend/data')
+import ncert_questions as nq
+
+def use_state_dir(tmp):
+    nq.STATE_FILE = os.path.join(tmp, 'question_state.snap')
+    nq.JOURNAL_FILE = os.path.join(tmp, 'question_state.journal')
+    nq.LEGACY_STATE_FILE = os.path.join(tmp, 'question_state.json')
+    nq._LESSON_ROTATIONS.clear(); nq._SUBJECT_CLASS_ROTATIONS.clear(); nq._MIXED_ROTATION.clear()
+    nq.USER_STATE = nq._open_user_state(os.path.join(tmp, 'user_state.db'), 1)
+
+def snapshot(uid):
+    record = nq.USER_STATE.peek(uid)
+    return json.loads(json.dumps([record['srs'], record['answered'], record['wrong']]))
+
+if len(sys.argv) > 1:
+    # Child: answer, let eviction persist the records, then die without compacting
+    use_state_dir(sys.argv[1])
+    nq.update_answer_tracking('s1', 'light-class6', 1, False)
+    nq.update_answer_tracking_batch('s2', [('heat-class7', 1, False), ('heat-class7', 2, True), ('heat-class7', 1, True)])
+    nq.get_user_mixed_questions('s3', 1)   # resident budget is 1: s1 and s2 are written to SQLite
+    nq.USER_STATE.flush()
+    print(json.dumps({uid: snapshot(uid) for uid in ('s1', 's2')}))
+    sys.stdout.flush()
+    os._exit(0)
+
+tmp = tempfile.mkdtemp(prefix='srs_replay_')
+out = subprocess.run([sys.executable, __file__, tmp], capture_output=True, text=True, check=True).stdout
+expected = json.loads(out.strip().splitlines()[-1])
+assert os.path.getsize(os.path.join(tmp, 'question_state.journal')) > 0   # nothing was compacted
+
+for restart in range(3):
+    use_state_dir(tmp)
+    nq.load_question_state()
+    for uid, state in expected.items():
+        assert snapshot(uid) == state, (restart, uid, snapshot(uid), state)
+        queue = nq.USER_STATE.peek(uid)['srs_queue']
+        assert len(queue) == len(set(map(tuple, queue))), (uid, queue)   # no duplicate heap entries
+    items, _ = nq.get_due_reviews('s1', 10, now=expected['s1'][0]['%d' % nq.question_position('light-class6', 1)][3])
+    assert len(items) == 1, items
+    nq.USER_STATE.flush()   # the replayed records reach SQLite; the journal is replayed again next time
+
+print("SRS replay OK: journal replayed 3 times over persisted records, cards unchanged")
@@ -0,0 +1,71 @@
+import sys, os, tempfile, json, time
+sys.path.append('edu-game-backend')
+sys.path.append('edu-game-backend/data')
+from llm_stub_server import LLMStub
+stub = LLMStub(delay=0.8, token_delay=0.02).start()   # provider: 800 ms to first token
+tmp = tempfile.mkdtemp(prefix='streaming_hint_')
+os.environ.update(PROGRESS_DB=os.path.join(tmp, 'student_progress.db'), HINT_CACHE_DB=os.path.join(tmp, 'ai_cache.db'),
+                  TUTORING_ARTIFACT=os.path.join(tmp, 'none.json.gz'),
+                  GROQ_API_URL=stub.url, GROQ_API_KEY='test-key', GROQ_MODEL='stub-model')
+from services.ai_gateway import AIGateway, AIGatewayError
+from services.ai_service import AIService
+from utils.response_cache import ResponseCache
+from app import create_app
+client = create_app().test_client()
+
+def frames(url, payload):
+    """[(event, data, seconds since request)] read from an unbuffered SSE response"""
+    start = time.perf_counter()
+    r = client.post(url, json=payload, buffered=False)
+    assert r.status_code == 200 and r.mimetype == 'text/event-stream', r.status_code
+    out = []
+    for chunk in r.response:
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        event, data = chunk.strip().split('\n')
+        out.append((event[len('event: '):], json.loads(data[len('data: '):]), time.perf_counter() - start))
+    r.close()
+    return out
+
+# 1. The local tutoring frame arrives at once; the model's tokens follow as they are generated
+start = time.perf_counter()
+blocking = client.post('/api/ai/hint', json={'question_id': 1}).json
+blocking_s = time.perf_counter() - start
+got = frames('/api/ai/hint/stream', {'question_id': 1})
+(event, first, ttfb), tokens, (last_event, last, _) = got[0], got[1:-1], got[-1]
+assert event == 'fallback' and first['text'] and first['hint'] and first['source'] == 'fallback', first
+assert ttfb < 0.05, ttfb
+assert tokens and all(e == 'token' for e, _, _ in tokens) and tokens[0][2] > 0.5
+assert last_event == 'done' and last['source'] == 'ai' and last['text'] == ''.join(d['text'] for _, d, _ in tokens).strip()
+assert last['text'] == blocking['hint']
+
+# 2. The other streaming endpoints use the same frames
+for url, payload in (('/api/ai/solution-steps/stream', {'question_id': 1}),
+                     ('/api/ai/encouragement/stream', {'question_id': 1, 'is_correct': True})):
+    got = frames(url, payload)
+    assert got[0][0] == 'fallback' and got[-1][0] == 'done' and got[-1][1]['source'] == 'ai', got
+assert client.post('/api/ai/hint/stream', json={'question_id': 10 ** 6}).status_code == 404
+assert client.post('/api/ai/hint/stream', json={}).status_code == 400
+
+# 3. Upstream failures end the stream with an error frame that keeps the fallback text
+stub.fail_next(1, status=400)
+got = frames('/api/ai/hint/stream', {'question_id': 1})
+assert [e for e, _, _ in got] == ['fallback', 'error'] and got[1][1]['text'] == got[0][1]['text'], got
+question = {'text': 'What is heat?', 'options': ['Energy', 'Mass'], 'correct': 0, 'concept': 'Heat', 'explanation': ''}
+offline = AIService(AIGateway(stub.url, None, 'stub-model'), cache=ResponseCache(None))
+assert [e for e, _ in offline.stream_hint(question)] == ['fallback', 'done']
+
+# 4. A client that goes away frees its upstream slot
+stub.delay = 0
+gateway = AIGateway(stub.url, 'test-key', 'stub-model', max_concurrency=1)
+stream = gateway.stream_chat([{'role': 'user', 'content': 'long answer'}])
+next(stream)
+stream.close()
+assert next(gateway.stream_chat([{'role': 'user', 'content': 'again'}], deadline=0.5))
+try:
+    list(AIGateway(stub.url, None, 'stub-model').stream_chat([{'role': 'user', 'content': 'x'}]))
+    assert False
+except AIGatewayError:
+    pass
+stub.stop()
+print('Streaming hints OK: first SSE frame in %.1f ms, first model token at %.0f ms (blocking /hint: %.0f ms)'
+      % (ttfb * 1000, tokens[0][2] * 1000, blocking_s * 1000))
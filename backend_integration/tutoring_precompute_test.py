@@ -0,0 +1,58 @@
+import sys, os, tempfile
+sys.path.append('edu-game-backend')
+sys.path.append('edu-game-backend/data')
+tmp = tempfile.mkdtemp(prefix='tutoring_precompute_')
+out = os.path.join(tmp, 'tutoring_precomputed.json.gz')
+os.environ.update(PROGRESS_DB=os.path.join(tmp, 'student_progress.db'), HINT_CACHE_DB=os.path.join(tmp, 'ai_cache.db'),
+                  TUTORING_ARTIFACT=out, GROQ_MODEL='stub-model', GROQ_API_KEY='')
+import ncert_questions as nq
+nq.STATE_FILE = os.path.join(tmp, 'question_state.snap')
+nq.JOURNAL_FILE = os.path.join(tmp, 'question_state.journal')
+nq.LEGACY_STATE_FILE = os.path.join(tmp, 'question_state.json')
+nq.USER_STATE = nq._open_user_state(os.path.join(tmp, 'user_state.db'), 100)
+from llm_stub_server import LLMStub
+from services.ai_gateway import AIGateway
+from services.ai_service import AIService
+from utils.response_cache import ResponseCache, read_artifact
+from precompute_tutoring import precompute, tutoring_tasks, bank_questions
+
+stub = LLMStub().start()
+service = AIService(AIGateway(stub.url, 'test-key', 'stub-model', max_concurrency=4),
+                    cache=ResponseCache(None, max_entries=0))
+questions = list(bank_questions())
+total = len(set(key for key, *_ in tutoring_tasks(service, questions)))
+assert total == sum(1 + 2 * len(q['options']) - 1 for q in questions)   # no selection, every option, every wrong option
+
+# 1. A run with failing calls keeps what succeeded and reports the rest
+stub.fail_next(25, status=400)
+generated, failed, count = precompute(out, service, questions, concurrency=4)
+assert count == total and failed == 25 and generated == total - 25, (generated, failed)
+assert os.path.exists(out + '.partial') and len(read_artifact(out)['entries']) == total - 25
+
+# 2. A crash mid-run loses nothing already checkpointed: the rerun only generates what is missing
+with open(out + '.partial', 'a') as f:
+    f.write('["torn-li')
+before = stub.requests
+generated, failed, count = precompute(out, service, questions, concurrency=4)
+assert (generated, failed) == (25, 0) and stub.requests - before == 25
+assert not os.path.exists(out + '.partial')
+before = stub.requests
+assert precompute(out, service, questions)[:2] == (0, 0) and stub.requests == before
+
+# 3. The API loads the artifact at startup: hints for bank questions are lookups
+from app import create_app
+from routes import duolingo_api as api
+client = create_app().test_client()
+before = stub.requests
+question = api.find_question(3, 'heat-class7')[1]
+r = client.post('/api/duolingo/hint/ai', json={'lesson_id': 'heat-class7', 'question_id': 3, 'mode': 'rich', 'selected_option': 0})
+assert r.json['source'] == 'ai' and r.json['hint'] == 'stub hint', r.json
+wrong = (question['correct'] + 1) % len(question['options'])
+r = client.post('/api/duolingo/answer/check', json={'student_id': 'pre', 'lesson_id': 'heat-class7', 'question_id': 3,
+                                                    'selected_option': wrong, 'rich_explanation': True})
+job = api.TUTORING.wait(r.json['tutoring_ticket'], 10)
+assert job['status'] == 'done' and job['rich_tutoring']['source'] == 'ai' and job['wrong_analysis']['source'] == 'ai', job
+assert stub.requests == before   # no LLM traffic (and no API key configured)
+stub.stop()
+print('Tutoring precompute OK: %d payloads for %d questions, resumed after failures, served without LLM calls'
+      % (total, len(questions)))
@@ -0,0 +1,108 @@
+import sys, os, tempfile, threading, subprocess
+sys.path.append('edu-game-backend')
+sys.path.append('edu-game-backend/data')
+tmp = tempfile.mkdtemp(prefix='write_behind_')
+os.environ['PROGRESS_DB'] = os.path.join(tmp, 'student_progress.db')
+os.environ['PROGRESS_FLUSH_INTERVAL'] = '0.05'
+import ncert_questions as nq
+nq.STATE_FILE = os.path.join(tmp, 'question_state.snap')
+nq.JOURNAL_FILE = os.path.join(tmp, 'question_state.journal')
+nq.LEGACY_STATE_FILE = os.path.join(tmp, 'question_state.json')
+nq.USER_STATE = nq._open_user_state(os.path.join(tmp, 'user_state.db'), 100)
+from app import create_app
+from routes import duolingo_api as api
+from utils.progress_store import ProgressStore
+from utils.write_behind import WriteBehindBuffer
+client = create_app().test_client()
+
+def revision():
+    return api.PROGRESS.changes_since(10 ** 9)[0]
+
+def answer(student_id, qid=1):
+    # light-class6 question 1 is easy: 10 XP, 1 token when correct
+    found = api.find_question(qid, 'light-class6')[1]
+    r = client.post('/api/duolingo/answer/check', json={
+        'student_id': student_id, 'lesson_id': 'light-class6', 'question_id': qid,
+        'selected_option': found['correct']})
+    assert r.json['correct'], r.json
+    return r.json['xp_earned'], r.json['tokens_earned']
+
+# 1. Read-your-writes: every answer is visible at once, before any flush
+api.REWARDS.flush_interval = 3600
+before = revision()
+xp = tokens = 0
+for i in range(10):
+    dxp, dtok = answer('fast')
+    xp, tokens = xp + dxp, tokens + dtok
+    progress = client.get('/api/duolingo/progress/student/fast').json['progress']
+    assert (progress['xp'], progress['tokens'], progress['level']) == (xp, tokens, xp // 100 + 1), progress
+assert revision() == before and api.PROGRESS.get('fast') is None  # nothing written yet
+# 2. Ten answers coalesce into one row write
+assert api.REWARDS.flush() == 1 and revision() == before + 1
+assert api.PROGRESS.get('fast')['xp'] == xp
+# 3. Lesson completion sees buffered XP when checking level-up
+for i in range(2):
+    answer('leveler')
+r = client.post('/api/duolingo/progress/update', json={'student_id': 'leveler', 'lesson_id': 'light-class6', 'score': 2, 'total_questions': 2})
+assert r.json['progress']['xp'] == 20 and api.REWARDS.pending_count() == 0, r.json
+
+# 4. Background flushes racing with readers never double count or lose XP
+api.REWARDS.flush_interval = 0.001
+stop = threading.Event()
+errors = []
+def reader():
+    last = 0
+    while not stop.is_set():
+        seen = api.read_student_progress('racer')
+        seen = seen['xp'] if seen else 0
+        if seen < last or seen % 10:
+            errors.append((last, seen))
+        last = seen
+readers = [threading.Thread(target=reader) for _ in range(3)]
+for t in readers:
+    t.start()
+writers = [threading.Thread(target=lambda: [api.update_student_progress('racer', 10, 1, None) for _ in range(500)])
+           for _ in range(4)]
+for t in writers:
+    t.start()
+for t in writers:
+    t.join()
+stop.set()
+for t in readers:
+    t.join()
+assert not errors, errors[:5]
+assert api.read_student_progress('racer')['xp'] == 4 * 500 * 10
+
+# 5. A slow flush only holds up readers of the students it is writing
+rows, release = {}, threading.Event()
+def slow_apply(batch):
+    release.wait(10)
+    for key, deltas in batch.items():
+        rows[key] = rows.get(key, 0) + deltas['xp']
+slow = WriteBehindBuffer(slow_apply, flush_interval=3600)
+slow.add('stuck', xp=10)
+flusher = threading.Thread(target=slow.flush)
+flusher.start()
+while not slow._inflight:
+    pass
+slow.add('other', xp=20)
+assert slow.read('other', lambda: rows.get('other', 0)) == (0, {'xp': 20})   # does not wait for the flush
+seen = []
+waiter = threading.Thread(target=lambda: seen.append(slow.read('stuck', lambda: rows.get('stuck', 0))))
+waiter.start()
+waiter.join(0.2)
+assert waiter.is_alive() and not seen   # 'stuck' is half-written: wait for it
+release.set()
+flusher.join(); waiter.join()
+assert seen == [(10, {})], seen
+
+# 6. Buffered rewards are flushed when the process exits
+script = (
+    "import sys; sys.path.append('edu-game-backend'); sys.path.append('edu-game-backend/data')\n"
+    "from routes import duolingo_api as api\n"
+    "for _ in range(7): api.update_student_progress('leaving', 10, 1, None)\n"
+)
+env = dict(os.environ, PROGRESS_FLUSH_INTERVAL='3600')
+subprocess.run([sys.executable, '-c', script], check=True, env=env, capture_output=True)
+assert ProgressStore(api.PROGRESS_DB).get('leaving')['xp'] == 70
+print('Write-behind OK: 10 answers -> 1 row write, reads see buffered XP, flush on exit')